@@ -0,0 +1,266 @@
+"""
+Threshold alert rules over poll results.
+
+Rules come from the ``alert_rules`` setting and are evaluated on every
+poll for every monitored host. Each rule keeps its own sliding-window
+state, so a poll costs constant work per rule however long the windows
+are. A rule fires once its condition held for ``for`` seconds and
+resolves when the condition no longer holds; both transitions run the
+rule's actions: a notification, a JSON POST to a webhook and/or a shell
+command.
+"""
+
+import operator
+import os
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from sliding import SlidingCount, SlidingStat
+
+OPERATORS = {
+    '>': operator.gt, '>=': operator.ge, '<': operator.lt, '<=': operator.le,
+    '==': operator.eq, '!=': operator.ne
+}
+# Metrics read from one poll; the event metrics count models per window
+SAMPLE_METRICS = {
+    'up', 'latency', 'models_loaded', 'vram_share', 'vram_gb',
+    'ollama_cpu', 'ollama_rss_gb'
+}
+EVENT_METRICS = {'loads', 'evictions'}
+GB = 1024 ** 3
+
+
+class AlertRule:
+    """One configured condition and the actions to run when it changes."""
+
+    def __init__(self, config: dict):
+        """
+        Args:
+            config: Entry of ``alert_rules``
+
+        Raises:
+            ValueError: If the rule is incomplete or names an unknown
+                metric, operator or statistic
+        """
+        self.metric = config.get('metric')
+        if self.metric not in SAMPLE_METRICS | EVENT_METRICS:
+            raise ValueError(f"Unknown metric: {self.metric}")
+        op = config.get('op', '>')
+        if op not in OPERATORS:
+            raise ValueError(f"Unknown operator: {op}")
+        if 'value' not in config:
+            raise ValueError("Missing threshold 'value'")
+        self.op = op
+        self.compare = OPERATORS[op]
+        self.threshold = float(config['value'])
+        self.stat = config.get('stat', 'count' if self.metric in EVENT_METRICS else 'last')
+        self.window = float(config.get('window', 60))
+        self.hold = float(config.get('for', 0))
+        self.model = config.get('model')
+        self.notify = config.get('notify', True)
+        self.webhook = config.get('webhook')
+        self.command = config.get('command')
+        self.name = config.get('name') or f"{self.describe()} {op} {config['value']}"
+        # Fail on a bad statistic now rather than on the first poll
+        self.new_window()
+
+    def describe(self) -> str:
+        """Metric, statistic and window, e.g. ``latency p95 (300 s)``."""
+        text = self.metric
+        if self.model:
+            text += f" of {self.model}"
+        if self.stat not in ('last', 'count'):
+            text += f" {self.stat}"
+        if self.stat != 'last':
+            text += f" ({self.window:.0f} s)"
+        return text
+
+    def new_window(self):
+        """Fresh sliding-window state for one host, None for ``last``."""
+        if self.metric in EVENT_METRICS:
+            return SlidingCount(self.window)
+        if self.stat == 'last':
+            return None
+        return SlidingStat(self.window, self.stat)
+
+
+class _RuleState:
+    """Evaluation state of one rule for one host."""
+
+    __slots__ = ('window', 'since', 'firing', 'value')
+
+    def __init__(self, window):
+        self.window = window
+        self.since = None
+        self.firing = False
+        self.value = None
+
+
+class AlertEngine:
+    """Evaluate alert rules incrementally and run their actions."""
+
+    def __init__(self, rules: List[dict], notify: Callable[[str, str], None],
+                 logger=None):
+        """
+        Args:
+            rules: Entries of the ``alert_rules`` setting; invalid ones are
+                logged and skipped
+            notify: Called with (message, key) for rules that notify
+            logger: Logger for alerts and rule errors
+        """
+        self.notify = notify
+        self.logger = logger
+        self.rules: List[AlertRule] = []
+        for config in rules:
+            try:
+                self.rules.append(AlertRule(config))
+            except (ValueError, TypeError, AttributeError) as e:
+                self._log('error', f"Ignoring alert rule {config!r}: {str(e)}")
+        self.fired = 0
+        self._states: Dict[tuple, _RuleState] = {}
+        self._models: Dict[str, frozenset] = {}
+        self._executor = None
+
+    def evaluate(self, hosts: list, host_sample=None, now: Optional[float] = None):
+        """
+        Feed one poll result to every rule.
+
+        Args:
+            hosts: (endpoint, up, latency, models) per monitored host
+            host_sample: Readings of the local Ollama processes, if sampled
+            now: Current ``time.time()``
+        """
+        now = time.time() if now is None else now
+        several = len(hosts) > 1
+        for host, up, latency, models in hosts:
+            sample = self._sample(up, latency, models, host_sample if not several else None)
+            names = frozenset(m.get('name', '') for m in models)
+            previous = self._models.get(host)
+            if up:
+                self._models[host] = names
+            loaded = names - previous if up and previous is not None else frozenset()
+            evicted = previous - names if up and previous is not None else frozenset()
+            for index, rule in enumerate(self.rules):
+                key = (index, host)
+                state = self._states.get(key)
+                if state is None:
+                    state = self._states[key] = _RuleState(rule.new_window())
+                if rule.metric in EVENT_METRICS:
+                    events = loaded if rule.metric == 'loads' else evicted
+                    count = len(events) if rule.model is None else int(rule.model in events)
+                    if count:
+                        state.window.add(now, count)
+                    value = state.window.value(now)
+                else:
+                    value = sample.get(rule.metric)
+                    if state.window is not None:
+                        if value is not None:
+                            state.window.add(now, value)
+                        value = state.window.value(now)
+                state.value = value
+                self._update(rule, state, host if several else None, value, now)
+
+    @staticmethod
+    def _sample(up: bool, latency: Optional[float], models: List[dict],
+                host_sample) -> dict:
+        """Values of the per-poll metrics; missing ones are left out."""
+        size = sum(m.get('size', 0) for m in models)
+        size_vram = sum(m.get('size_vram', 0) for m in models)
+        sample = {'up': 1.0 if up else 0.0}
+        if up:
+            sample['models_loaded'] = len(models)
+            sample['vram_share'] = size_vram / size if size else 0.0
+            sample['vram_gb'] = size_vram / GB
+            if latency is not None:
+                sample['latency'] = latency
+        if host_sample is not None:
+            sample['ollama_cpu'] = host_sample.cpu_percent
+            sample['ollama_rss_gb'] = host_sample.rss / GB
+        return sample
+
+    def _update(self, rule: AlertRule, state: _RuleState, host: Optional[str],
+                value: Optional[float], now: float):
+        """Fire or resolve ``rule`` for one host."""
+        if value is not None and rule.compare(value, rule.threshold):
+            if state.since is None:
+                state.since = now
+            if not state.firing and now - state.since >= rule.hold:
+                state.firing = True
+                self.fired += 1
+                self._dispatch(rule, host, 'firing', value, now)
+        else:
+            state.since = None
+            if state.firing:
+                state.firing = False
+                self._dispatch(rule, host, 'resolved', value, now)
+
+    def _dispatch(self, rule: AlertRule, host: Optional[str], status: str,
+                  value: Optional[float], now: float):
+        """Run the actions of a rule that fired or resolved."""
+        prefix = f"{host}: " if host else ""
+        if status == 'firing':
+            message = f"{prefix}{rule.name} (now {value:.4g})"
+            self._log('warning', f"Alert: {message}")
+        else:
+            message = f"{prefix}Resolved: {rule.name}"
+            self._log('info', f"Alert: {message}")
+        if rule.notify:
+            self.notify(message, f"alert:{rule.name}:{host}")
+        if not rule.webhook and not rule.command:
+            return
+        event = {
+            'alert': rule.name,
+            'status': status,
+            'host': host,
+            'metric': rule.metric,
+            'value': value,
+            'threshold': rule.threshold,
+            'message': message,
+            'time': now
+        }
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='alerts')
+        if rule.webhook:
+            self._executor.submit(self._post, rule.webhook, event)
+        if rule.command:
+            self._executor.submit(self._run, rule.command, event)
+
+    def _post(self, url: str, event: dict):
+        """Send an alert to a webhook; runs on the alert thread."""
+        import httpx
+        try:
+            response = httpx.post(url, json=event, timeout=5.0)
+            if response.status_code >= 400:
+                self._log('error', f"Alert webhook returned HTTP {response.status_code}")
+        except httpx.HTTPError as e:
+            self._log('error', f"Alert webhook failed: {str(e)}")
+
+    def _run(self, command: str, event: dict):
+        """Run an alert command; runs on the alert thread."""
+        env = dict(os.environ)
+        for key, value in event.items():
+            env[f'ALERT_{key.upper()}'] = '' if value is None else str(value)
+        try:
+            result = subprocess.run(command, shell=True, env=env, timeout=60)
+            if result.returncode:
+                self._log('error', f"Alert command exited with {result.returncode}")
+        except (OSError, subprocess.SubprocessError) as e:
+            self._log('error', f"Alert command failed: {str(e)}")
+
+    def firing(self) -> List[str]:
+        """Names of the rules currently firing, for any host."""
+        return sorted({
+            self.rules[index].name
+            for (index, _), state in self._states.items() if state.firing
+        })
+
+    def close(self):
+        """Stop the action thread without waiting for pending actions."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+    def _log(self, level: str, message: str):
+        if self.logger:
+            getattr(self.logger, level)(message)
@@ -0,0 +1,70 @@
+"""
+Benchmark fleet poll-cycle wall time against local stand-in servers.
+
+Usage:
+    python benchmarks/bench_fleet.py [--delay 0.05] [--cycles 5]
+
+A cycle should take roughly the slowest host's response time regardless of
+how many hosts are in the fleet.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from typing import Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fleet import FleetPoller
+from mock_ollama import MockOllamaServer
+
+
+def bench(host_count: int, delay: float, cycles: int, workers: Optional[int],
+          dead: int) -> list:
+    """Return poll-cycle wall times for a fleet of ``host_count`` hosts."""
+    servers = [MockOllamaServer(delay=delay).start() for _ in range(host_count)]
+    # Closed ports answer with connection refused, like a stopped Ollama
+    endpoints = [s.url for s in servers] + [
+        f'http://127.0.0.1:{1 + i}' for i in range(dead)
+    ]
+    poller = FleetPoller(endpoints, max_workers=workers)
+    try:
+        poller.poll(force=True)  # warm up connections
+        timings = []
+        for _ in range(cycles):
+            start = time.perf_counter()
+            poller.poll(force=True)
+            timings.append(time.perf_counter() - start)
+        return timings
+    finally:
+        poller.close()
+        for server in servers:
+            server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--delay', type=float, default=0.05,
+                        help='simulated /api/ps latency in seconds')
+    parser.add_argument('--cycles', type=int, default=5)
+    parser.add_argument('--workers', type=int,
+                        help='worker threads, one per host by default')
+    parser.add_argument('--dead', type=int, default=0,
+                        help='extra unreachable endpoints in the fleet')
+    parser.add_argument('--hosts', type=int, nargs='+',
+                        default=[1, 10, 25, 50, 100])
+    args = parser.parse_args()
+
+    print(f"{'hosts':>6} {'median ms':>10} {'max ms':>8}")
+    for count in args.hosts:
+        timings = bench(count, args.delay, args.cycles, args.workers, args.dead)
+        print(
+            f"{count:>6} {statistics.median(timings) * 1000:>10.1f} "
+            f"{max(timings) * 1000:>8.1f}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Measure memory and CPU footprint of the monitor against a stand-in server.
+
+Usage:
+    python benchmarks/bench_footprint.py [--duration 60] [--mode headless tray]
+
+Starts the monitor in a subprocess with a throw-away settings directory,
+lets it poll a local stand-in server and reports resident memory and CPU
+time extrapolated to one hour.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import psutil
+
+from mock_ollama import MockOllamaServer
+
+
+def measure(mode: str, url: str, duration: float) -> dict:
+    """Run the monitor in ``mode`` for ``duration`` seconds and sample it."""
+    with tempfile.TemporaryDirectory() as home:
+        with open(os.path.join(home, 'settings.json'), 'w') as f:
+            json.dump({'api_url': url}, f)
+        args = [sys.executable, os.path.join(ROOT, 'ollama_monitor.py')]
+        if mode == 'headless':
+            args.append('--headless')
+        env = dict(os.environ, OLLAMA_MONITOR_HOME=home)
+        proc = subprocess.Popen(
+            args, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            process = psutil.Process(proc.pid)
+            # Skip interpreter start-up so only steady-state polling counts
+            time.sleep(2)
+            start_cpu = sum(process.cpu_times()[:2])
+            time.sleep(duration)
+            cpu = sum(process.cpu_times()[:2]) - start_cpu
+            rss = process.memory_info().rss
+        finally:
+            proc.terminate()
+            proc.wait(10)
+    return {
+        'rss_mb': rss / 2**20,
+        'cpu_s_per_hour': cpu * 3600 / duration,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--duration', type=float, default=60)
+    parser.add_argument('--mode', nargs='+', default=['headless'],
+                        choices=['headless', 'tray'])
+    args = parser.parse_args()
+
+    server = MockOllamaServer().start()
+    try:
+        print(f"{'mode':>9} {'RSS MB':>8} {'CPU s/h':>8}")
+        for mode in args.mode:
+            result = measure(mode, server.url, args.duration)
+            print(
+                f"{mode:>9} {result['rss_mb']:>8.1f} "
+                f"{result['cpu_s_per_hour']:>8.1f}"
+            )
+    finally:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+"""
+Benchmark the monitor's own poll loop against a local stand-in server.
+
+Usage:
+    python benchmarks/bench_poll_loop.py [--polls 500] [--scenario FILE --speed 5]
+
+Reports CPU time and memory allocated per ``get_running_models`` call, then
+runs ``update_status`` while the stand-in server changes state and reports
+how long each change took to show up in the monitor's status. Without
+``--scenario`` the server alternates between a loaded and an unloaded model.
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_ollama import MockOllamaServer, load_scenario
+from monitor_core import MonitorCore, setup_logging, shutdown_logging
+
+
+class ProbeMonitor(MonitorCore):
+    """Monitor that timestamps every rendered status."""
+
+    def __init__(self):
+        super().__init__()
+        # (time.perf_counter(), time.thread_time(), current_model)
+        self.renders = []
+
+    def render(self):
+        self.renders.append(
+            (time.perf_counter(), time.thread_time(), self.current_model)
+        )
+
+
+def make_monitor(url: str) -> ProbeMonitor:
+    """Create a monitor polling ``url``."""
+    with open(os.path.join(os.environ['OLLAMA_MONITOR_HOME'], 'settings.json'),
+              'w') as f:
+        json.dump({'api_url': url}, f)
+    return ProbeMonitor()
+
+
+def poll_cost(monitor: ProbeMonitor, polls: int) -> dict:
+    """Measure CPU time and allocations of ``get_running_models``."""
+    monitor._init_http_client()
+    for _ in range(20):
+        monitor.get_running_models()
+
+    cpu_start = time.thread_time()
+    wall_start = time.perf_counter()
+    for _ in range(polls):
+        monitor.get_running_models()
+    cpu = (time.thread_time() - cpu_start) / polls
+    wall = (time.perf_counter() - wall_start) / polls
+
+    tracemalloc.start()
+    peaks = []
+    retained_start = tracemalloc.get_traced_memory()[0]
+    for _ in range(polls):
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        monitor.get_running_models()
+        peaks.append(tracemalloc.get_traced_memory()[1] - before)
+    retained = tracemalloc.get_traced_memory()[0] - retained_start
+    tracemalloc.stop()
+    monitor.client.close()
+    monitor.client = None
+
+    return {
+        'cpu_ms': cpu * 1000,
+        'wall_ms': wall * 1000,
+        'alloc_kib': statistics.median(peaks) / 1024,
+        'retained_bytes': retained / polls,
+    }
+
+
+def flip_scenario(flips: int, every: float) -> list:
+    """Alternate between a loaded and an unloaded model, with jitter."""
+    steps = [{'at': 0, 'models': []}]
+    at = 0.0
+    for i in range(flips):
+        at += every * random.uniform(0.75, 1.25)
+        steps.append({'at': round(at, 3),
+                      'models': ['llama3.2:3b'] if i % 2 == 0 else []})
+    return steps
+
+
+def detection(monitor: ProbeMonitor, server: MockOllamaServer, steps: list,
+              speed: float) -> list:
+    """
+    Play ``steps`` while the monitor polls; return one row per step.
+
+    Each row is (step, latency in seconds or None if the status did not
+    change before the next step).
+    """
+    thread = threading.Thread(target=monitor.update_status, daemon=True)
+    thread.start()
+    while not monitor.renders:
+        time.sleep(0.01)
+    server.play(steps, speed).join()
+    # Give the last step the longest poll interval to show up
+    time.sleep(monitor.scheduler.idle_interval + 1)
+    monitor.stop()
+    thread.join()
+
+    rows = []
+    applied = server.applied
+    for i, (applied_at, step) in enumerate(applied):
+        until = applied[i + 1][0] if i + 1 < len(applied) else float('inf')
+        before = [status for t, _, status in monitor.renders if t <= applied_at]
+        previous = before[-1] if before else None
+        latency = next(
+            (t - applied_at for t, _, status in monitor.renders
+             if applied_at < t < until and status != previous),
+            None
+        )
+        rows.append((step, latency))
+    return rows
+
+
+def loop_cpu_per_poll(monitor: ProbeMonitor) -> float:
+    """CPU time of the poll thread per rendered poll, in milliseconds."""
+    renders = monitor.renders
+    if len(renders) < 2:
+        return 0.0
+    return (renders[-1][1] - renders[0][1]) / (len(renders) - 1) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--polls', type=int, default=500,
+                        help='get_running_models calls to measure')
+    parser.add_argument('--scenario', help='scenario or recorded session to play')
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help='replay speed-up factor for --scenario')
+    parser.add_argument('--flips', type=int, default=6,
+                        help='load/unload changes without --scenario')
+    parser.add_argument('--every', type=float, default=4.0,
+                        help='seconds between changes without --scenario')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as home:
+        os.environ['OLLAMA_MONITOR_HOME'] = home
+        # Log to the file only so the report stays readable
+        setup_logging(console=False)
+        server = MockOllamaServer().start()
+        try:
+            cost = poll_cost(make_monitor(server.url), args.polls)
+            print(f"get_running_models over {args.polls} polls:")
+            print(f"  CPU per poll:        {cost['cpu_ms']:.3f} ms "
+                  f"(wall {cost['wall_ms']:.3f} ms)")
+            print(f"  allocated per poll:  {cost['alloc_kib']:.1f} KiB (median peak)")
+            print(f"  retained per poll:   {cost['retained_bytes']:.0f} bytes")
+
+            if args.scenario:
+                steps, speed = load_scenario(args.scenario), args.speed
+            else:
+                steps, speed = flip_scenario(args.flips, args.every), 1.0
+            monitor = make_monitor(server.url)
+            rows = detection(monitor, server, steps, speed)
+        finally:
+            server.stop()
+            # Release the log file before the directory is removed
+            shutdown_logging()
+
+    print(f"\nupdate_status: {len(monitor.renders)} polls, "
+          f"{loop_cpu_per_poll(monitor):.3f} ms CPU per poll")
+    print(f"{'at s':>7} {'detected after':>15}  step")
+    latencies = []
+    for step, latency in rows:
+        change = {k: v for k, v in step.items() if k != 'at'}
+        if 'models' in change:
+            change['models'] = [
+                m if isinstance(m, str) else m.get('name') for m in change['models']
+            ]
+        shown = "no change" if latency is None else f"{latency * 1000:.0f} ms"
+        print(f"{step.get('at', 0) / speed:>7.1f} {shown:>15}  {json.dumps(change)}")
+        if latency is not None:
+            latencies.append(latency)
+    if latencies:
+        latencies.sort()
+        print(f"detection latency: median {statistics.median(latencies) * 1000:.0f} ms, "
+              f"max {latencies[-1] * 1000:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
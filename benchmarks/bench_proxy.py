@@ -0,0 +1,81 @@
+"""
+Benchmark the metering proxy's per-request overhead.
+
+Usage:
+    python benchmarks/bench_proxy.py [--requests 500] [--tokens 32] [--token-delay 0]
+
+Sends the same requests to the local stand-in server directly and through
+the proxy and reports the added wall time per request, together with the
+CPU time the proxy itself spent per request. Streamed generate requests
+show the cost of passing tokens through; ``/api/ps`` the fixed cost.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from mock_ollama import MockOllamaServer
+from proxy import MeteringProxy
+
+
+def timed(client: httpx.Client, base: str, kind: str, count: int) -> list:
+    """Wall seconds of ``count`` requests of one kind."""
+    timings = []
+    for _ in range(count):
+        started = time.perf_counter()
+        if kind == 'ps':
+            client.get(f'{base}/api/ps').read()
+        else:
+            with client.stream('POST', f'{base}/api/generate',
+                               json={'model': 'llama3.2:3b', 'prompt': 'hi'}) as response:
+                for _ in response.iter_raw():
+                    pass
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=500,
+                        help='requests per kind and path')
+    parser.add_argument('--tokens', type=int, default=32,
+                        help='tokens streamed per generate request')
+    parser.add_argument('--token-delay', type=float, default=0.0,
+                        help='seconds between streamed tokens; above zero each '
+                             'token arrives on its own, as from a real model')
+    args = parser.parse_args()
+
+    server = MockOllamaServer(tokens=args.tokens, token_delay=args.token_delay).start()
+    proxy = MeteringProxy(lambda: server.url, port=0)
+    proxy.start()
+    host, port = proxy.address
+    proxied = f'http://{host}:{port}'
+    try:
+        with httpx.Client(timeout=10.0) as client:
+            print(f"{'request':<22} {'direct ms':>10} {'proxied ms':>11} "
+                  f"{'added ms':>9} {'proxy CPU ms':>13}")
+            for kind, label in (('ps', 'GET /api/ps'),
+                                ('generate', f'generate {args.tokens} tokens')):
+                # Warm up both connection pools
+                timed(client, server.url, kind, 20)
+                timed(client, proxied, kind, 20)
+                direct = statistics.median(timed(client, server.url, kind, args.requests))
+                through = statistics.median(timed(client, proxied, kind, args.requests))
+                recent = list(proxy.stats.recent)[-args.requests:]
+                cpu = statistics.median(m.overhead for m in recent)
+                print(f"{label:<22} {direct * 1000:>10.3f} {through * 1000:>11.3f} "
+                      f"{(through - direct) * 1000:>9.3f} {cpu * 1000:>13.3f}")
+    finally:
+        proxy.stop()
+        server.stop()
+    print(f"\n{proxy.stats.summary()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+Measure cold-start time to the first tray icon and the first status.
+
+Usage:
+    python benchmarks/bench_startup.py [--mode tray] [--runs 5]
+    python benchmarks/bench_startup.py --exe dist/OllamaMonitor.exe
+
+Launches the monitor against a local stand-in server with a throw-away
+settings directory and reads the "Startup:" lines it logs. Wall times are
+measured from process spawn, so they include interpreter (or PyInstaller
+bootloader) start-up. Exits non-zero when a budget is exceeded.
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from mock_ollama import MockOllamaServer
+
+MILESTONE_RE = re.compile(r'Startup: (.+) after (\d+) ms')
+
+
+def launch(command: list, url: str, timeout: float) -> dict:
+    """Start the monitor once and return wall-clock ms per milestone."""
+    with tempfile.TemporaryDirectory() as home:
+        with open(os.path.join(home, 'settings.json'), 'w') as f:
+            json.dump({'api_url': url}, f)
+        env = dict(os.environ, OLLAMA_MONITOR_HOME=home)
+
+        spawned = time.perf_counter()
+        proc = subprocess.Popen(
+            command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        seen = {}
+        try:
+            deadline = spawned + timeout
+            while 'first status' not in seen and time.perf_counter() < deadline:
+                for log_file in glob.glob(os.path.join(home, 'logs', '*.log')):
+                    with open(log_file, encoding='utf-8') as f:
+                        for match in MILESTONE_RE.finditer(f.read()):
+                            if match.group(1) not in seen:
+                                seen[match.group(1)] = (
+                                    (time.perf_counter() - spawned) * 1000,
+                                    int(match.group(2))
+                                )
+                time.sleep(0.002)
+        finally:
+            proc.terminate()
+            proc.wait(10)
+    return seen
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--mode', choices=['tray', 'headless'], default='tray')
+    parser.add_argument('--exe', help='time a built executable instead')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--budget-icon-ms', type=float,
+                        help='fail if the icon takes longer to appear')
+    parser.add_argument('--budget-status-ms', type=float,
+                        help='fail if the first status takes longer')
+    args = parser.parse_args()
+
+    if args.exe:
+        command = [args.exe]
+    else:
+        command = [sys.executable, os.path.join(ROOT, 'ollama_monitor.py')]
+    if args.mode == 'headless':
+        command.append('--headless')
+
+    server = MockOllamaServer().start()
+    try:
+        runs = [launch(command, server.url, args.timeout) for _ in range(args.runs)]
+    finally:
+        server.stop()
+
+    print(f"{'milestone':>14} {'wall ms':>8} {'in-app ms':>10}")
+    failed = False
+    budgets = {
+        'icon visible': args.budget_icon_ms,
+        'first status': args.budget_status_ms,
+    }
+    for milestone, budget in budgets.items():
+        samples = [run[milestone] for run in runs if milestone in run]
+        if not samples:
+            if args.mode == 'tray' or milestone == 'first status':
+                print(f"{milestone:>14} {'missing':>8}")
+                failed = failed or budget is not None
+            continue
+        wall = statistics.median(s[0] for s in samples)
+        in_app = statistics.median(s[1] for s in samples)
+        over = budget is not None and wall > budget
+        failed = failed or over
+        print(
+            f"{milestone:>14} {wall:>8.0f} {in_app:>10.0f}"
+            f"{'  over budget' if over else ''}"
+        )
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
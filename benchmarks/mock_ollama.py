@@ -0,0 +1,523 @@
+"""
+Local stand-in for an Ollama server.
+
+Serves canned ``/api/ps``, ``/api/tags`` and ``/api/show`` responses with
+an optional artificial delay so the monitor can be exercised without a real Ollama
+installation. ``/api/generate`` and ``/api/chat`` stream a fixed number of
+tokens at a fixed rate for the throughput benchmark, or answer once all of
+them are generated with ``"stream": false``; they load unknown models after
+``load_time`` seconds and honour ``keep_alive``, and requests without a
+prompt only load the model, as in Ollama.
+
+The server state can be scripted: a scenario is a list of steps, each
+applied at its ``at`` offset in seconds, that load or unload models, slow
+responses down, answer with an HTTP error or refuse connections. Sessions
+recorded from a real server replay the same way, optionally faster than
+real time.
+
+Usage:
+    python benchmarks/mock_ollama.py [--port 11434] [--scenario FILE] [--speed 10]
+    python benchmarks/mock_ollama.py --record http://gpu-01:11434 --out session.jsonl
+"""
+
+import argparse
+import copy
+import hashlib
+import json
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional, Union
+
+DEFAULT_MODELS = [
+    {
+        'name': 'llama3.2:3b',
+        'model': 'llama3.2:3b',
+        'size': 3200000000,
+        'size_vram': 3200000000,
+        'digest': 'a80c4f17acd55265feec403c7aef86be0c25983ab279d83f3bcd3abbcb5b8b72',
+        'details': {
+            'format': 'gguf',
+            'family': 'llama',
+            'parameter_size': '3.2B',
+            'quantization_level': 'Q4_K_M'
+        },
+        'expires_at': '2099-01-01T00:00:00Z'
+    }
+]
+
+_UNSET = object()
+
+
+def make_model(entry: Union[str, dict]) -> dict:
+    """
+    Expand a scenario model entry into an ``/api/ps`` model.
+
+    Args:
+        entry: Full model dictionary, or just a model name
+
+    Returns:
+        Model dictionary; names get a stable fake digest
+    """
+    if isinstance(entry, dict):
+        return entry
+    model = copy.deepcopy(DEFAULT_MODELS[0])
+    model['name'] = model['model'] = entry
+    model['digest'] = hashlib.sha256(entry.encode()).hexdigest()
+    return model
+
+
+def parse_keep_alive(value) -> float:
+    """Convert a ``keep_alive`` value to seconds; negative means forever."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    units = {'s': 1, 'm': 60, 'h': 3600}
+    if value and value[-1] in units:
+        return float(value[:-1]) * units[value[-1]]
+    return float(value)
+
+
+def load_scenario(path: str) -> List[dict]:
+    """
+    Read a scenario from a JSON list or a JSON-lines file.
+
+    Args:
+        path: Scenario file
+
+    Returns:
+        Steps sorted by their ``at`` offset
+    """
+    with open(path, encoding='utf-8') as f:
+        text = f.read()
+    if text.lstrip().startswith('['):
+        steps = json.loads(text)
+    else:
+        steps = [json.loads(line) for line in text.splitlines() if line.strip()]
+    return sorted(steps, key=lambda step: step.get('at', 0))
+
+
+def record_session(url: str, path: str, duration: float, interval: float = 1.0):
+    """
+    Poll a real server's ``/api/ps`` and save state changes as a scenario.
+
+    Only polls that differ from the previous one are written, so the file
+    replays the session's transitions without its idle stretches.
+
+    Args:
+        url: Base URL of the Ollama server
+        path: Output JSON-lines file
+        duration: Seconds to record
+        interval: Seconds between polls
+    """
+    import httpx
+
+    started = time.monotonic()
+    last = None
+    with httpx.Client(timeout=5.0) as client, open(path, 'w', encoding='utf-8') as out:
+        while time.monotonic() - started < duration:
+            polled = time.monotonic()
+            try:
+                response = client.get(f'{url}/api/ps')
+                if response.status_code == 200:
+                    state = {'refuse': False, 'status': 200,
+                             'models': response.json().get('models', [])}
+                else:
+                    state = {'refuse': False, 'status': response.status_code}
+            except httpx.TransportError:
+                state = {'refuse': True}
+            if state != last:
+                out.write(json.dumps({'at': round(polled - started, 3), **state}) + '\n')
+                out.flush()
+                last = state
+            time.sleep(max(0.0, interval - (time.monotonic() - polled)))
+
+
+class MockOllamaServer:
+    """A threaded HTTP server answering like ``ollama serve``."""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0,
+                 models: Optional[List[dict]] = None, delay: float = 0.0,
+                 tokens: int = 32, token_delay: float = 0.005,
+                 tags: Optional[List[dict]] = None, load_time: float = 0.0):
+        """
+        Initialize the stand-in server.
+
+        Args:
+            host: Address to bind
+            port: Port to bind, 0 picks a free one
+            models: Models reported by ``/api/ps``
+            delay: Seconds to wait before answering each request
+            tokens: Tokens streamed per generate or chat request
+            token_delay: Seconds between streamed tokens
+            tags: Models reported by ``/api/tags``, defaults to the loaded ones
+            load_time: Seconds a generate or chat request takes to load a
+                model that is not loaded
+        """
+        self.models = DEFAULT_MODELS if models is None else models
+        self.tags = tags
+        self.delay = delay
+        self.status = 200
+        self.refusing = False
+        self.tokens = tokens
+        self.token_delay = token_delay
+        self.load_time = load_time
+        self.loads = 0
+        self.requests = 0
+        self.shows = 0
+        # Model name -> unload time set through keep_alive
+        self._expiry = {}
+        self._models_lock = threading.Lock()
+        # (time.perf_counter(), step) for every scenario step applied
+        self.applied = []
+        self._player = None
+        self._stop_playing = threading.Event()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Send headers and body in one segment to avoid Nagle stalls
+            wbufsize = 64 * 1024
+
+            def setup(self):
+                super().setup()
+                # Like Ollama, stream each token at once instead of after
+                # Nagle's algorithm waited for an acknowledgement
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def do_GET(self):
+                if self._refused():
+                    return
+                server.requests += 1
+                if server.delay:
+                    time.sleep(server.delay)
+                if server.status != 200:
+                    self._send(server.status, {'error': 'scripted failure'})
+                elif self.path == '/api/ps':
+                    self._send(200, {'models': server.resident_models()})
+                elif self.path == '/api/tags':
+                    self._send(200, {'models': server.tag_list()})
+                elif self.path == '/api/version':
+                    self._send(200, {'version': '0.0.0-mock'})
+                else:
+                    self._send(404, {'error': 'not found'})
+
+            def do_POST(self):
+                if self._refused():
+                    return
+                server.requests += 1
+                length = int(self.headers.get('Content-Length', 0))
+                request = json.loads(self.rfile.read(length) or b'{}')
+                if self.path == '/api/show':
+                    server.shows += 1
+                    show = server.show(request.get('model') or request.get('name', ''))
+                    if show is None:
+                        self._send(404, {'error': 'model not found'})
+                    else:
+                        self._send(200, show)
+                    return
+                if self.path not in ('/api/generate', '/api/chat'):
+                    self._send(404, {'error': 'not found'})
+                    return
+                if server.delay:
+                    time.sleep(server.delay)
+                load_ns = server.touch(
+                    request.get('model', ''), request.get('keep_alive', '5m')
+                )
+                if not request.get('prompt') and not request.get('messages'):
+                    self._send(200, {
+                        'model': request.get('model'), 'done': True,
+                        'done_reason': 'load', 'load_duration': load_ns
+                    })
+                    return
+                if request.get('stream', True) is False:
+                    self._answer(request, self.path == '/api/chat', load_ns)
+                else:
+                    self._stream(request, self.path == '/api/chat', load_ns)
+
+            def _refused(self):
+                # Kept-alive connections outlive the listener; drop them too
+                if server.refusing:
+                    self.close_connection = True
+                return server.refusing
+
+            def _stream(self, request, chat, load_ns):
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/x-ndjson')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                limit = request.get('options', {}).get('num_predict')
+                count = min(server.tokens, limit) if limit else server.tokens
+                started = time.perf_counter_ns()
+                for i in range(count):
+                    time.sleep(server.token_delay)
+                    text = f'tok{i} '
+                    chunk = {'model': request.get('model'), 'done': False}
+                    if chat:
+                        chunk['message'] = {'role': 'assistant', 'content': text}
+                    else:
+                        chunk['response'] = text
+                    self._chunk(chunk)
+                self._chunk({
+                    'model': request.get('model'),
+                    'done': True,
+                    'total_duration': time.perf_counter_ns() - started,
+                    'load_duration': load_ns,
+                    'prompt_eval_count': 12,
+                    'prompt_eval_duration': 2000000,
+                    'eval_count': count,
+                    'eval_duration': max(1, time.perf_counter_ns() - started),
+                })
+                self.wfile.write(b'0\r\n\r\n')
+                self.wfile.flush()
+
+            def _answer(self, request, chat, load_ns):
+                limit = request.get('options', {}).get('num_predict')
+                count = min(server.tokens, limit) if limit else server.tokens
+                started = time.perf_counter_ns()
+                time.sleep(server.token_delay * count)
+                text = ''.join(f'tok{i} ' for i in range(count))
+                answer = {'model': request.get('model'), 'done': True}
+                if chat:
+                    answer['message'] = {'role': 'assistant', 'content': text}
+                else:
+                    answer['response'] = text
+                elapsed = time.perf_counter_ns() - started
+                self._send(200, dict(
+                    answer,
+                    total_duration=elapsed + load_ns,
+                    load_duration=load_ns,
+                    prompt_eval_count=12,
+                    prompt_eval_duration=2000000,
+                    eval_count=count,
+                    eval_duration=max(1, elapsed)
+                ))
+
+            def _chunk(self, payload):
+                data = json.dumps(payload).encode() + b'\n'
+                self.wfile.write(f'{len(data):x}\r\n'.encode() + data + b'\r\n')
+                self.wfile.flush()
+
+            def _send(self, code, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(code)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._handler = Handler
+        self._bind((host, port))
+        self.host, self.port = self.httpd.server_address[:2]
+
+    def _bind(self, address):
+        """Create the listener and its serving thread."""
+        self.httpd = ThreadingHTTPServer(address, self._handler)
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self.httpd.serve_forever, daemon=True
+        )
+
+    @property
+    def url(self) -> str:
+        """Base URL of the running server."""
+        return f'http://{self.host}:{self.port}'
+
+    def resident_models(self) -> List[dict]:
+        """Loaded models, without those whose keep_alive ran out."""
+        now = time.time()
+        with self._models_lock:
+            expired = {name for name, at in self._expiry.items() if 0 <= at <= now}
+            if expired:
+                self.models = [m for m in self.models if m['name'] not in expired]
+                for name in expired:
+                    del self._expiry[name]
+            return self.models
+
+    def touch(self, name: str, keep_alive) -> int:
+        """
+        Load a model if needed and reset its keep-alive, like a request.
+
+        Args:
+            name: Model name
+            keep_alive: ``keep_alive`` of the request
+
+        Returns:
+            load_duration in nanoseconds
+        """
+        started = time.perf_counter_ns()
+        resident = {m['name'] for m in self.resident_models()}
+        if name not in resident:
+            time.sleep(self.load_time)
+            self.loads += 1
+        seconds = parse_keep_alive(keep_alive)
+        with self._models_lock:
+            if seconds == 0:
+                self.models = [m for m in self.models if m['name'] != name]
+                self._expiry.pop(name, None)
+                return time.perf_counter_ns() - started
+            model = next((m for m in self.models if m['name'] == name), None)
+            if model is None:
+                model = make_model(name)
+                self.models = self.models + [model]
+            if seconds < 0:
+                self._expiry[name] = -1
+                model['expires_at'] = '2318-01-01T00:00:00Z'
+            else:
+                self._expiry[name] = time.time() + seconds
+                model['expires_at'] = datetime.fromtimestamp(
+                    self._expiry[name], timezone.utc
+                ).isoformat().replace('+00:00', 'Z')
+        return time.perf_counter_ns() - started
+
+    def tag_list(self) -> List[dict]:
+        """Models reported by ``/api/tags``."""
+        if self.tags is not None:
+            return self.tags
+        return [
+            {key: model[key] for key in ('name', 'model', 'size', 'digest', 'details')
+             if key in model}
+            for model in self.models
+        ]
+
+    def show(self, name: str) -> Optional[dict]:
+        """``/api/show`` response for an installed model, None if unknown."""
+        tag = next((t for t in self.tag_list() if t.get('name') == name), None)
+        if tag is None:
+            return None
+        details = tag.get('details') or {}
+        family = details.get('family', 'llama')
+        return {
+            'details': details,
+            'model_info': {
+                'general.architecture': family,
+                f'{family}.context_length': 131072
+            },
+            'capabilities': ['completion']
+        }
+
+    def start(self) -> 'MockOllamaServer':
+        """Start serving in a background thread."""
+        self._thread.start()
+        return self
+
+    def set_state(self, models=_UNSET, delay: Optional[float] = None,
+                  status: Optional[int] = None, refuse: Optional[bool] = None):
+        """
+        Change what the server answers; arguments left out are kept.
+
+        Args:
+            models: Loaded models, as dictionaries or names
+            delay: Seconds to wait before answering
+            status: HTTP status for every request, 200 for normal answers
+            refuse: Close the listener so connections are refused
+        """
+        if models is not _UNSET:
+            self.models = [make_model(entry) for entry in models]
+        if delay is not None:
+            self.delay = delay
+        if status is not None:
+            self.status = status
+        if refuse is not None and refuse != self.refusing:
+            self.refusing = refuse
+            if refuse:
+                self.httpd.shutdown()
+                self.httpd.server_close()
+            else:
+                self._bind((self.host, self.port))
+                self.start()
+
+    def apply(self, step: dict):
+        """
+        Apply one scenario step.
+
+        Args:
+            step: Dict with any of ``models``, ``delay``, ``status`` and
+                ``refuse``
+        """
+        self.set_state(
+            step.get('models', _UNSET), step.get('delay'),
+            step.get('status'), step.get('refuse')
+        )
+        self.applied.append((time.perf_counter(), step))
+
+    def play(self, steps: List[dict], speed: float = 1.0,
+             loop: bool = False) -> threading.Thread:
+        """
+        Apply scenario steps at their ``at`` offsets in a background thread.
+
+        Args:
+            steps: Scenario steps sorted by ``at``
+            speed: Time compression, 10 replays ten times faster
+            loop: Start over after the last step
+
+        Returns:
+            The playback thread
+        """
+        def run():
+            while True:
+                started = time.monotonic()
+                for step in steps:
+                    wait = step.get('at', 0) / speed - (time.monotonic() - started)
+                    if self._stop_playing.wait(max(0.0, wait)):
+                        return
+                    self.apply(step)
+                if not loop or not steps:
+                    return
+
+        self._stop_playing.clear()
+        self._player = threading.Thread(target=run, name='scenario', daemon=True)
+        self._player.start()
+        return self._player
+
+    def stop(self):
+        """Stop playback and shut the server down."""
+        self._stop_playing.set()
+        if not self.refusing:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=11434)
+    parser.add_argument('--delay', type=float, default=0.0,
+                        help='seconds to wait before answering')
+    parser.add_argument('--scenario', help='scenario or recorded session to play')
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help='replay speed-up factor')
+    parser.add_argument('--loop', action='store_true', help='repeat the scenario')
+    parser.add_argument('--record', metavar='URL',
+                        help='record a real server instead of serving')
+    parser.add_argument('--out', default='session.jsonl',
+                        help='file to record to')
+    parser.add_argument('--duration', type=float, default=600,
+                        help='seconds to record')
+    parser.add_argument('--interval', type=float, default=1.0,
+                        help='seconds between recorded polls')
+    args = parser.parse_args()
+
+    if args.record:
+        record_session(args.record, args.out, args.duration, args.interval)
+        return
+
+    server = MockOllamaServer(args.host, args.port, delay=args.delay).start()
+    print(f"Serving on {server.url}")
+    if args.scenario:
+        server.play(load_scenario(args.scenario), args.speed, args.loop)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+"""
+Local status broker for Ollama Monitor.
+
+One monitor polls Ollama and pushes every state change to the other
+monitors and tools on this machine over a loopback TCP socket, so the
+request rate on the server stays the same however many clients watch it.
+Messages are JSON lines; a new subscriber first receives the current
+state, then one line per change.
+"""
+
+import json
+import queue
+import socket
+import threading
+from typing import Iterator, Optional
+
+DEFAULT_PORT = 11435
+# A subscriber that does not take a message within this time is dropped
+SEND_TIMEOUT = 1.0
+
+
+class StatusBroker:
+    """Publish poll results to every connected subscriber."""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = DEFAULT_PORT,
+                 logger=None):
+        """
+        Bind the listening socket.
+
+        Args:
+            host: Loopback address to listen on
+            port: Port to listen on, 0 picks a free one
+            logger: Logger for subscriber connects and disconnects
+
+        Raises:
+            OSError: If the port is taken, usually by another broker
+        """
+        self.logger = logger
+        self.published = 0
+        self._listener = socket.create_server((host, port))
+        self.address = self._listener.getsockname()[:2]
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._latest = None
+        self._last_state = None
+
+    @property
+    def subscribers(self) -> int:
+        """Number of connected subscribers."""
+        return len(self._subscribers)
+
+    def start(self):
+        """Accept subscribers and send messages on background threads."""
+        threading.Thread(target=self._accept, name='broker-accept', daemon=True).start()
+        threading.Thread(target=self._send, name='broker-send', daemon=True).start()
+
+    def publish(self, state: dict):
+        """
+        Queue a state for the subscribers if it differs from the last one.
+
+        Args:
+            state: JSON-serializable state; its ``latency`` alone does not
+                count as a change
+        """
+        key = {k: v for k, v in state.items() if k != 'latency'}
+        if key == self._last_state:
+            return
+        self._last_state = key
+        self._queue.put((json.dumps(state, separators=(',', ':')) + '\n').encode())
+
+    def _accept(self):
+        while True:
+            try:
+                connection, _ = self._listener.accept()
+            except OSError:
+                return
+            connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            connection.settimeout(SEND_TIMEOUT)
+            with self._lock:
+                try:
+                    if self._latest is not None:
+                        connection.sendall(self._latest)
+                except OSError:
+                    connection.close()
+                    continue
+                self._subscribers.append(connection)
+            self._log(f"Status subscriber connected ({self.subscribers} in total)")
+
+    def _send(self):
+        while True:
+            line = self._queue.get()
+            if line is None:
+                return
+            with self._lock:
+                self._latest = line
+                self.published += 1
+                for connection in list(self._subscribers):
+                    try:
+                        connection.sendall(line)
+                    except OSError:
+                        self._subscribers.remove(connection)
+                        connection.close()
+                        self._log("Status subscriber disconnected")
+
+    def stop(self):
+        """Close the listener and every subscriber connection."""
+        self._listener.close()
+        self._queue.put(None)
+        with self._lock:
+            for connection in self._subscribers:
+                connection.close()
+            self._subscribers = []
+
+    def _log(self, message: str):
+        if self.logger:
+            self.logger.info(message)
+
+
+class Subscription:
+    """Connection to a broker, yielding the states it pushes."""
+
+    def __init__(self, connection: socket.socket, state: dict, reader):
+        self.state = state
+        self._connection = connection
+        self._reader = reader
+
+    def __iter__(self) -> Iterator[dict]:
+        """Yield states as they arrive until the broker goes away."""
+        for line in self._reader:
+            self.state = json.loads(line)
+            yield self.state
+
+    def close(self):
+        """Disconnect; also ends an iteration blocked in another thread."""
+        try:
+            self._connection.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._connection.close()
+
+
+def subscribe(host: str = '127.0.0.1', port: int = DEFAULT_PORT,
+              api_url: Optional[str] = None,
+              timeout: float = 5.0) -> Optional[Subscription]:
+    """
+    Connect to a running broker.
+
+    Args:
+        host: Address the broker listens on
+        port: Port the broker listens on
+        api_url: Only accept a broker polling this server
+        timeout: Seconds to wait for the connection and the first state
+
+    Returns:
+        Subscription holding the current state, None if no broker for
+        ``api_url`` is running
+    """
+    try:
+        connection = socket.create_connection((host, port), timeout=timeout)
+    except OSError:
+        return None
+    reader = connection.makefile('rb')
+    try:
+        state = json.loads(reader.readline() or b'null')
+    except (OSError, ValueError):
+        state = None
+    if not state or (api_url and state.get('api_url') != api_url):
+        connection.close()
+        return None
+    connection.settimeout(None)
+    return Subscription(connection, state, reader)
@@ -0,0 +1,199 @@
+"""
+Discovery of Ollama servers on a network.
+
+Probes every address of the given CIDR ranges and host names on every
+given port, with a bounded number of connections in flight. A probe is a
+TCP connect with a short timeout followed, on the same connection, by
+``GET /api/version``; only hosts that answer with a version count, so
+other web servers on the same port are skipped. Closed ports fail at once
+and silent ones after the connect timeout, so a /24 takes a few connect
+timeouts rather than 254 of them in a row.
+"""
+
+import http.client
+import ipaddress
+import json
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+DEFAULT_PORTS = (11434,)
+# Larger scans are almost certainly a typo in the prefix length
+MAX_PROBES = 65536
+# /api/version answers are tiny; anything longer is not Ollama
+MAX_BODY = 4096
+
+
+@dataclass
+class DiscoveredServer:
+    """An Ollama server that answered a probe."""
+
+    url: str
+    version: str
+    latency: float
+
+
+def server_url(host: str, port: int) -> str:
+    """Base URL of a server, with IPv6 addresses in brackets."""
+    if ':' in host:
+        return f'http://[{host}]:{port}'
+    return f'http://{host}:{port}'
+
+
+def expand_targets(targets: Iterable[str],
+                   ports: Iterable[int] = DEFAULT_PORTS) -> List[Tuple[str, int]]:
+    """
+    List the (host, port) pairs to probe.
+
+    Args:
+        targets: CIDR ranges such as ``192.168.1.0/24``, addresses, host
+            names, ``host:port`` or URLs; an explicit port replaces ``ports``
+        ports: Ports to probe on targets without one
+
+    Returns:
+        Pairs in target order, without duplicates
+
+    Raises:
+        ValueError: If a target cannot be parsed or the scan is too large
+    """
+    ports = list(ports)
+    pairs = {}
+    for target in targets:
+        target = target.strip()
+        if not target:
+            continue
+        hosts, target_ports = None, ports
+        if '://' in target or target.startswith('['):
+            parsed = urlparse(target if '://' in target else f'http://{target}')
+            if not parsed.hostname:
+                raise ValueError(f"Invalid target: {target}")
+            hosts = [parsed.hostname]
+            target_ports = [parsed.port] if parsed.port else ports
+        else:
+            try:
+                network = ipaddress.ip_network(target, strict=False)
+            except ValueError:
+                network = None
+            if network is not None:
+                if network.num_addresses > MAX_PROBES:
+                    raise ValueError(f"Range too large: {target}")
+                hosts = (
+                    [str(network.network_address)] if network.num_addresses == 1
+                    else [str(address) for address in network.hosts()]
+                )
+            elif target.count(':') == 1:
+                host, port = target.rsplit(':', 1)
+                if not port.isdigit():
+                    raise ValueError(f"Invalid port in target: {target}")
+                hosts, target_ports = [host], [int(port)]
+            elif '/' in target:
+                raise ValueError(f"Invalid range: {target}")
+            else:
+                hosts = [target]
+        for host in hosts:
+            for port in target_ports:
+                pairs[(host, port)] = None
+        if len(pairs) > MAX_PROBES:
+            raise ValueError(f"More than {MAX_PROBES} addresses to probe")
+    return list(pairs)
+
+
+def probe(host: str, port: int, connect_timeout: float = 0.5,
+          read_timeout: float = 2.0) -> Optional[DiscoveredServer]:
+    """
+    Ask one address whether it is an Ollama server.
+
+    Args:
+        host: Address or host name
+        port: TCP port
+        connect_timeout: Seconds to wait for the connection
+        read_timeout: Seconds to wait for the answer once connected
+
+    Returns:
+        DiscoveredServer, or None if nothing that looks like Ollama answered
+    """
+    started = time.perf_counter()
+    connection = http.client.HTTPConnection(host, port, timeout=connect_timeout)
+    try:
+        connection.connect()
+        connection.sock.settimeout(read_timeout)
+        connection.request('GET', '/api/version', headers={'Accept': 'application/json'})
+        response = connection.getresponse()
+        if response.status != 200:
+            return None
+        version = json.loads(response.read(MAX_BODY)).get('version')
+    except (OSError, http.client.HTTPException, ValueError, AttributeError):
+        return None
+    finally:
+        connection.close()
+    if not isinstance(version, str):
+        return None
+    return DiscoveredServer(server_url(host, port), version, time.perf_counter() - started)
+
+
+def scan(targets: Iterable[str], ports: Iterable[int] = DEFAULT_PORTS,
+         max_in_flight: int = 128, connect_timeout: float = 0.5,
+         read_timeout: float = 2.0,
+         on_found: Optional[Callable[[DiscoveredServer], None]] = None
+         ) -> List[DiscoveredServer]:
+    """
+    Probe all targets concurrently.
+
+    Args:
+        targets: See :func:`expand_targets`
+        ports: Ports to probe on targets without one
+        max_in_flight: Upper bound on simultaneous connections
+        connect_timeout: Seconds to wait for each connection
+        read_timeout: Seconds to wait for each answer once connected
+        on_found: Called with each server as soon as it answered, in the
+            thread that called :func:`scan`
+
+    Returns:
+        The servers found, in target order
+
+    Raises:
+        ValueError: If a target cannot be parsed or the scan is too large
+    """
+    probes = expand_targets(targets, ports)
+    if not probes:
+        return []
+    found = {}
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(max_in_flight, len(probes))),
+        thread_name_prefix='discovery'
+    ) as executor:
+        futures = {
+            executor.submit(probe, host, port, connect_timeout, read_timeout): index
+            for index, (host, port) in enumerate(probes)
+        }
+        for future in as_completed(futures):
+            server = future.result()
+            if server is not None:
+                found[futures[future]] = server
+                if on_found:
+                    on_found(server)
+    return [found[index] for index in sorted(found)]
+
+
+def local_network() -> Optional[str]:
+    """
+    The /24 of the address this machine uses for outgoing traffic.
+
+    Returns:
+        CIDR range such as ``192.168.1.0/24``, None without a network
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        # Connecting a UDP socket sends nothing; it only picks a route
+        sock.connect(('192.0.2.1', 9))
+        address = sock.getsockname()[0]
+    except OSError:
+        return None
+    finally:
+        sock.close()
+    if address.startswith('127.'):
+        return None
+    return str(ipaddress.ip_network(f'{address}/24', strict=False))
@@ -0,0 +1,205 @@
+"""
+Concurrent polling of a fleet of Ollama servers.
+
+Every endpoint is polled on a bounded worker pool so that one slow or
+unreachable host never holds up the results of the others.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import httpx
+
+from models import describe_models
+from monitor_core import STATUS_NOT_RUNNING, STATUS_NO_MODEL
+from scheduler import PollScheduler
+from transport import classify_error
+
+# Workers spend their time waiting on the network, so every host gets one
+# up to this many; larger fleets are polled in several rounds per cycle
+MAX_WORKERS = 256
+
+
+@dataclass
+class HostStatus:
+    """Result of polling a single Ollama endpoint."""
+
+    url: str
+    status: str = "Waiting..."
+    models: List[dict] = field(default_factory=list)
+    latency: Optional[float] = None
+    error: Optional[str] = None
+    checked_at: float = 0.0
+
+    @property
+    def up(self) -> bool:
+        """Whether the host answered the last poll."""
+        return self.status != STATUS_NOT_RUNNING and self.checked_at > 0
+
+    @property
+    def label(self) -> str:
+        """Short host name used in menus and notifications."""
+        return urlparse(self.url).netloc or self.url
+
+
+def poll_host(client: httpx.Client, url: str,
+              timeout=httpx.USE_CLIENT_DEFAULT) -> HostStatus:
+    """
+    Poll ``/api/ps`` on a single endpoint.
+
+    Args:
+        client: Shared HTTP client
+        url: Base URL of the Ollama server
+        timeout: Request timeout, the client's own by default
+
+    Returns:
+        HostStatus describing the endpoint
+    """
+    start = time.perf_counter()
+    try:
+        response = client.get(f'{url}/api/ps', timeout=timeout)
+        latency = time.perf_counter() - start
+        if response.status_code != 200:
+            return HostStatus(
+                url, STATUS_NOT_RUNNING, latency=latency,
+                error=f"HTTP {response.status_code}", checked_at=time.time()
+            )
+        models = response.json().get('models', [])
+        return HostStatus(
+            url, describe_models(models), models, latency,
+            checked_at=time.time()
+        )
+    except Exception as e:
+        error = classify_error(e)
+    return HostStatus(
+        url, STATUS_NOT_RUNNING, latency=time.perf_counter() - start,
+        error=error, checked_at=time.time()
+    )
+
+
+class FleetPoller:
+    """Poll a list of Ollama endpoints concurrently."""
+
+    def __init__(self, endpoints: List[str], client_config: Optional[dict] = None,
+                 max_workers: Optional[int] = None, timeout: float = 2.0,
+                 schedule: Optional[dict] = None):
+        """
+        Initialize the fleet poller.
+
+        Args:
+            endpoints: Base URLs of the Ollama servers to watch
+            client_config: Keyword arguments for each host's httpx.Client
+            max_workers: Upper bound on concurrent requests, one per
+                endpoint up to ``MAX_WORKERS`` if None
+            timeout: Longest a single request may take, in seconds
+            schedule: Keyword arguments for each host's PollScheduler
+        """
+        self.endpoints = list(dict.fromkeys(e.rstrip('/') for e in endpoints))
+        self.timeout = timeout
+        # One small client per host: a single shared pool serializes every
+        # request on its lock and lets one stuck host starve the rest.
+        client_config = dict(client_config or {})
+        client_config.setdefault('timeout', timeout)
+        keepalive_expiry = getattr(
+            client_config.get('limits'), 'keepalive_expiry', 60.0
+        )
+        client_config['limits'] = httpx.Limits(
+            max_connections=2,
+            max_keepalive_connections=1,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.clients: Dict[str, httpx.Client] = {
+            url: httpx.Client(**client_config) for url in self.endpoints
+        }
+        self.statuses: Dict[str, HostStatus] = {
+            url: HostStatus(url) for url in self.endpoints
+        }
+        self.schedulers: Dict[str, PollScheduler] = {
+            url: PollScheduler(**(schedule or {})) for url in self.endpoints
+        }
+        self._due: Dict[str, float] = dict.fromkeys(self.endpoints, 0.0)
+        self._in_flight = {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, min(max_workers or MAX_WORKERS, len(self.endpoints))),
+            thread_name_prefix='fleet-poll'
+        )
+
+    def poll(self, force: bool = False) -> List[HostStatus]:
+        """
+        Run one poll cycle over the whole fleet.
+
+        Only hosts whose own schedule is due are polled, so unreachable
+        hosts back off independently. Hosts that are still answering a
+        request from an earlier cycle are not polled again and keep their
+        last known status, so a cycle never takes much longer than
+        ``timeout``.
+
+        Args:
+            force: Poll every idle host, even if its schedule is not due
+
+        Returns:
+            Latest HostStatus for every endpoint, in configuration order
+        """
+        # Submit hosts that were up last time first so a backlog of dead
+        # hosts cannot queue ahead of healthy ones in the worker pool.
+        now = time.monotonic()
+        for url in sorted(self.endpoints, key=lambda u: not self.statuses[u].up):
+            if url not in self._in_flight and (force or self._due[url] <= now):
+                self._in_flight[url] = self._executor.submit(
+                    poll_host, self.clients[url], url
+                )
+
+        wait(list(self._in_flight.values()), timeout=self.timeout + 0.5)
+
+        for url, future in list(self._in_flight.items()):
+            if future.done():
+                del self._in_flight[url]
+                status = future.result()
+                changed = status.status != self.statuses[url].status
+                self.statuses[url] = status
+                self._due[url] = time.monotonic() + self.schedulers[url].next_delay(
+                    changed, status.up, status.latency or 0.0
+                )
+        return [self.statuses[url] for url in self.endpoints]
+
+    def next_poll_in(self) -> float:
+        """
+        Get the time until the next host is due for polling.
+
+        Returns:
+            Seconds to wait before calling :meth:`poll` again
+        """
+        due = [self._due[url] for url in self.endpoints if url not in self._in_flight]
+        if not due:
+            return self.timeout
+        return max(0.0, min(due) - time.monotonic())
+
+    @staticmethod
+    def summarize(statuses: List[HostStatus]) -> Tuple[str, str]:
+        """
+        Summarize a fleet poll for the tray.
+
+        Args:
+            statuses: Result of :meth:`poll`
+
+        Returns:
+            Tuple of (icon status, summary text). The icon status is one of
+            the single-host status strings so the usual icon colors apply.
+        """
+        up = [s for s in statuses if s.up]
+        model_count = sum(len(s.models) for s in up)
+        text = f"Fleet: {len(up)}/{len(statuses)} up, {model_count} models loaded"
+        if not up:
+            return STATUS_NOT_RUNNING, text
+        if not model_count:
+            return STATUS_NO_MODEL, text
+        return text, text
+
+    def close(self):
+        """Stop the worker pool and close every host connection."""
+        self._executor.shutdown(wait=False)
+        for client in self.clients.values():
+            client.close()
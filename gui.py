@@ -0,0 +1,440 @@
+"""
+Tk settings window and pystray widgets for the Ollama Monitor tray app.
+
+Imported on first use so the tray starts without loading Tk.
+"""
+
+import os
+import queue
+import sys
+import threading
+import time
+import webbrowser
+from typing import TYPE_CHECKING
+from urllib.parse import urlparse
+
+import pystray
+from tkinter import ttk
+import tkinter as tk
+from tkinter import messagebox
+
+from __version__ import __version__
+
+if TYPE_CHECKING:
+    from ollama_monitor import OllamaMonitor
+
+
+class SettingsWindow:
+    """Settings window for Ollama Monitor configuration."""
+
+    def __init__(self, monitor: 'OllamaMonitor'):
+        """
+        Initialize the settings window.
+
+        Args:
+            monitor: Reference to the main OllamaMonitor instance
+        """
+        self.monitor = monitor
+        self.window = tk.Tk()
+        self.window.title("Ollama Monitor - Settings")
+        self.window.geometry("400x500")
+        self.window.resizable(False, False)
+        
+        # Set Windows theme
+        self.style = ttk.Style()
+        self.style.theme_use('vista')
+        
+        self._create_widgets()
+        self._center_window()
+        
+        # Make window modal
+        self.window.transient()
+        self.window.grab_set()
+        self.window.focus_set()
+        
+        self.window.mainloop()
+    
+    def _create_widgets(self):
+        """Create and arrange all window widgets."""
+        # Title
+        title_label = ttk.Label(
+            self.window, 
+            text="Ollama Monitor", 
+            font=('Segoe UI', 14, 'bold')
+        )
+        title_label.pack(pady=10)
+        
+        # Settings frame
+        settings_frame = ttk.LabelFrame(
+            self.window, 
+            text="Settings", 
+            padding=10
+        )
+        settings_frame.pack(fill="x", padx=10, pady=5)
+        
+        # Startup setting
+        self.startup_var = tk.BooleanVar(
+            value=self.monitor.settings.get('startup', False)
+        )
+        startup_check = ttk.Checkbutton(
+            settings_frame,
+            text="Run at Windows startup",
+            variable=self.startup_var,
+            command=self.toggle_startup
+        )
+        startup_check.pack(anchor="w", pady=5)
+        
+        # API Settings frame
+        api_frame = ttk.LabelFrame(
+            self.window, 
+            text="API Connection", 
+            padding=10
+        )
+        api_frame.pack(fill="x", padx=10, pady=5)
+        
+        # API URL setting
+        url_frame = ttk.Frame(api_frame)
+        url_frame.pack(fill="x", pady=2)
+        
+        ttk.Label(
+            url_frame, 
+            text="Ollama URL:"
+        ).pack(side="left")
+        
+        self.api_url_var = tk.StringVar(
+            value=self.monitor.settings.get(
+                'api_url', 
+                f'http://{self.monitor.DEFAULT_API_HOST}:{self.monitor.DEFAULT_API_PORT}'
+            )
+        )
+        url_entry = ttk.Entry(
+            url_frame,
+            textvariable=self.api_url_var,
+            width=30
+        )
+        url_entry.pack(side="right")
+        
+        # Save API settings button
+        save_api_btn = ttk.Button(
+            api_frame,
+            text="Save API Settings",
+            command=self.save_api_settings
+        )
+        save_api_btn.pack(pady=5)
+
+        # Discovery button
+        discover_btn = ttk.Button(
+            api_frame,
+            text="Discover Servers...",
+            command=lambda: DiscoveryWindow(self.window, self.monitor)
+        )
+        discover_btn.pack(pady=5)
+        
+        # About frame
+        about_frame = ttk.LabelFrame(
+            self.window, 
+            text="About", 
+            padding=10
+        )
+        about_frame.pack(fill="x", padx=10, pady=5)
+        
+        # Version info
+        version_label = ttk.Label(
+            about_frame, 
+            text=f"Version: {__version__}"
+        )
+        version_label.pack(anchor="w")
+        
+        # Description
+        desc_label = ttk.Label(
+            about_frame,
+            text="Ollama Monitor is a system tray application that helps you\nmonitor your Ollama AI models.\nCreated by Yusuf Emre ALBAYRAK",
+            justify="left"
+        )
+        desc_label.pack(anchor="w", pady=5)
+        
+        # GitHub link
+        github_link = ttk.Label(
+            about_frame,
+            text="GitHub Repository",
+            cursor="hand2",
+            foreground="blue"
+        )
+        github_link.pack(anchor="w")
+        github_link.bind(
+            "<Button-1>", 
+            lambda e: webbrowser.open(
+                "https://github.com/ysfemreAlbyrk/ollama-monitor"
+            )
+        )
+        
+        # Close button
+        close_btn = ttk.Button(
+            self.window, 
+            text="Close", 
+            command=self.window.destroy
+        )
+        close_btn.pack(side="bottom", pady=10)
+    
+    def _center_window(self):
+        """Center the window on the screen."""
+        self.window.update_idletasks()
+        width = self.window.winfo_width()
+        height = self.window.winfo_height()
+        x = (self.window.winfo_screenwidth() // 2) - (width // 2)
+        y = (self.window.winfo_screenheight() // 2) - (height // 2)
+        self.window.geometry(f'{width}x{height}+{x}+{y}')
+    
+    def toggle_startup(self):
+        """Toggle Windows startup setting."""
+        startup = self.startup_var.get()
+        self.monitor.settings['startup'] = startup
+        self.monitor.save_settings()
+        
+        key_path = r"Software\\Microsoft\\Windows\\CurrentVersion\\Run"
+        try:
+            import winreg
+
+            key = winreg.OpenKey(
+                winreg.HKEY_CURRENT_USER, 
+                key_path, 
+                0, 
+                winreg.KEY_ALL_ACCESS
+            )
+            
+            if startup:
+                # Use sys.executable for a more reliable path to the bundled .exe
+                executable_path = sys.executable if hasattr(sys, 'frozen') else os.path.abspath(sys.argv[0])
+                winreg.SetValueEx(
+                    key, 
+                    "OllamaMonitor", 
+                    0, 
+                    winreg.REG_SZ, 
+                    executable_path
+                )
+            else:
+                try:
+                    winreg.DeleteValue(key, "OllamaMonitor")
+                except WindowsError:
+                    pass
+            
+            winreg.CloseKey(key)
+        except Exception as e:
+            self.monitor.logger.error(f"Failed to save startup setting: {str(e)}")
+    
+    def save_api_settings(self):
+        """Save API settings and reinitialize client."""
+        try:
+            api_url = self.api_url_var.get().strip()
+            
+            # Basic URL validation
+            parsed = urlparse(api_url)
+            if not all([parsed.scheme, parsed.netloc]):
+                raise ValueError("Invalid URL format")
+            
+            # Save new settings
+            self.monitor.settings['api_url'] = api_url
+            self.monitor.save_settings()
+            
+            # Reinitialize client
+            self.monitor.reconnect()
+            
+            self.window.destroy()
+            self.monitor.logger.info("API settings saved and connection updated!")
+            self.monitor.notify("API settings saved and connection updated!")
+            
+        except Exception as e:
+            messagebox.showerror(
+                "Error",
+                f"Invalid API URL: {str(e)}"
+            )
+
+
+class DiscoveryWindow:
+    """Scan for Ollama servers and add them as monitored endpoints."""
+
+    def __init__(self, parent: tk.Tk, monitor: 'OllamaMonitor'):
+        """
+        Initialize the discovery window.
+
+        Args:
+            parent: Settings window this window belongs to
+            monitor: Reference to the main OllamaMonitor instance
+        """
+        self.monitor = monitor
+        self.window = tk.Toplevel(parent)
+        self.window.title("Ollama Monitor - Discover Servers")
+        self.window.geometry("400x380")
+        self.window.resizable(False, False)
+
+        # Filled by the scan thread, emptied by the Tk loop
+        self.found = queue.Queue()
+        self.servers = []
+        self.scan_started = 0.0
+
+        self._create_widgets()
+
+        self.window.transient(parent)
+        self.window.grab_set()
+        self.window.focus_set()
+
+    def _create_widgets(self):
+        """Create and arrange all window widgets."""
+        from discovery import DEFAULT_PORTS, local_network
+
+        scan_frame = ttk.LabelFrame(
+            self.window,
+            text="Scan",
+            padding=10
+        )
+        scan_frame.pack(fill="x", padx=10, pady=5)
+
+        # Targets: ranges, addresses or host names
+        targets_frame = ttk.Frame(scan_frame)
+        targets_frame.pack(fill="x", pady=2)
+        ttk.Label(targets_frame, text="Ranges or hosts:").pack(side="left")
+        self.targets_var = tk.StringVar(
+            value=self.monitor.settings.get('discovery_targets') or local_network() or ''
+        )
+        ttk.Entry(
+            targets_frame,
+            textvariable=self.targets_var,
+            width=30
+        ).pack(side="right")
+
+        # Ports
+        ports_frame = ttk.Frame(scan_frame)
+        ports_frame.pack(fill="x", pady=2)
+        ttk.Label(ports_frame, text="Ports:").pack(side="left")
+        self.ports_var = tk.StringVar(
+            value=' '.join(
+                str(port) for port in self.monitor.settings.get('discovery_ports', DEFAULT_PORTS)
+            )
+        )
+        ttk.Entry(
+            ports_frame,
+            textvariable=self.ports_var,
+            width=30
+        ).pack(side="right")
+
+        self.scan_btn = ttk.Button(
+            scan_frame,
+            text="Scan",
+            command=self.start_scan
+        )
+        self.scan_btn.pack(pady=5)
+
+        self.status_var = tk.StringVar(
+            value="Separate several ranges or hosts with spaces."
+        )
+        ttk.Label(scan_frame, textvariable=self.status_var).pack(anchor="w")
+
+        # Results
+        results_frame = ttk.LabelFrame(
+            self.window,
+            text="Ollama servers found",
+            padding=10
+        )
+        results_frame.pack(fill="both", expand=True, padx=10, pady=5)
+        self.results = tk.Listbox(results_frame, selectmode="multiple", height=8)
+        self.results.pack(fill="both", expand=True)
+
+        ttk.Button(
+            self.window,
+            text="Monitor Selected",
+            command=self.add_selected
+        ).pack(pady=10)
+
+    def start_scan(self):
+        """Start scanning in the background."""
+        targets = self.targets_var.get().replace(',', ' ').split()
+        try:
+            ports = [int(port) for port in self.ports_var.get().replace(',', ' ').split()]
+            if not targets or not ports:
+                raise ValueError("Enter at least one range or host and one port")
+        except ValueError as e:
+            messagebox.showerror("Error", f"Invalid scan settings: {str(e)}")
+            return
+
+        self.monitor.settings['discovery_targets'] = ' '.join(targets)
+        self.monitor.settings['discovery_ports'] = ports
+        self.monitor.save_settings()
+
+        self.servers = []
+        self.results.delete(0, "end")
+        self.scan_btn.state(["disabled"])
+        self.status_var.set("Scanning...")
+        self.scan_started = time.perf_counter()
+        threading.Thread(
+            target=self._scan, args=(targets, ports), name='discovery-scan', daemon=True
+        ).start()
+        self.window.after(100, self._show_results)
+
+    def _scan(self, targets: list, ports: list):
+        """Body of the scan thread; hands every result to the Tk loop."""
+        from discovery import scan
+        try:
+            scan(targets, ports, on_found=self.found.put)
+            self.found.put(None)
+        except ValueError as e:
+            self.found.put(e)
+
+    def _show_results(self):
+        """List the servers found so far; runs on the Tk loop."""
+        while True:
+            try:
+                item = self.found.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, ValueError):
+                self.scan_btn.state(["!disabled"])
+                self.status_var.set("Scan failed.")
+                messagebox.showerror("Error", f"Invalid scan settings: {str(item)}")
+                return
+            if item is None:
+                self.scan_btn.state(["!disabled"])
+                self.status_var.set(
+                    f"Found {len(self.servers)} servers in "
+                    f"{time.perf_counter() - self.scan_started:.1f} s."
+                )
+                return
+            self.servers.append(item)
+            self.results.insert("end", f"{item.url}  (Ollama {item.version})")
+            self.results.selection_set("end")
+        self.window.after(100, self._show_results)
+
+    def add_selected(self):
+        """Monitor the selected servers as fleet endpoints."""
+        urls = [self.servers[index].url for index in self.results.curselection()]
+        if not urls:
+            messagebox.showinfo("Discover Servers", "Select the servers to monitor.")
+            return
+        added = self.monitor.add_endpoints(urls)
+        if added:
+            self.monitor.reconnect()
+            self.monitor.logger.info(f"Monitoring {added} discovered servers")
+            self.monitor.notify(f"Monitoring {added} more servers")
+        self.window.destroy()
+
+
+class CustomMenuItem(pystray.MenuItem):
+    """Custom menu item with better visibility for disabled items."""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+    
+    def render(self, window, offset=(0, 0)):
+        if not self.visible:
+            return []
+            
+        # Use white color (or any other color) for disabled items
+        text_color = 'white' if not self.enabled else 'black'
+        
+        return [(
+            offset[0], offset[1],
+            self.text,
+            {
+                'text': text_color,
+                'background': None,
+            }
+        )]
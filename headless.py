@@ -0,0 +1,29 @@
+"""
+Headless daemon mode for Ollama Monitor.
+
+Runs the same monitoring loop as the tray app on the main thread, without
+pystray, Tk, Pillow or the Windows registry, so it can run on the Linux
+servers that host Ollama.
+"""
+
+import signal
+
+from monitor_core import MonitorCore
+
+
+class HeadlessMonitor(MonitorCore):
+    """Ollama Monitor without a user interface; transitions go to the log."""
+
+    def notify(self, message: str, key=None):
+        """Log the notification; there is nothing to show it on."""
+        self.logger.info(f"Notification: {message}")
+
+    def render(self):
+        """Nothing to draw; status changes are already logged."""
+
+    def run(self):
+        """Poll until SIGINT or SIGTERM is received."""
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: self.stop())
+        self.logger.info(f"Running headless against {self.api_url}")
+        self.update_status()
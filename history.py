@@ -0,0 +1,467 @@
+"""
+Persistent poll history for Ollama Monitor.
+
+Poll results are kept in a local SQLite database. Raw samples and state
+transitions are appended, and per-minute and per-hour rollups plus hourly
+model residency are accumulated in memory and added to the database in
+batches, so the poll loop never waits for the disk. Old rows are removed
+according to a retention policy, and the rollup tables are keyed by time
+bucket so range queries over weeks only touch a few hundred rows.
+"""
+
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    ts REAL NOT NULL,
+    host TEXT NOT NULL,
+    up INTEGER NOT NULL,
+    latency REAL,
+    models TEXT NOT NULL,
+    size_vram INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS samples_host_ts ON samples (host, ts);
+CREATE INDEX IF NOT EXISTS samples_ts ON samples (ts);
+
+CREATE TABLE IF NOT EXISTS transitions (
+    ts REAL NOT NULL,
+    host TEXT NOT NULL,
+    event TEXT NOT NULL,
+    model TEXT
+);
+CREATE INDEX IF NOT EXISTS transitions_host_ts ON transitions (host, ts);
+CREATE INDEX IF NOT EXISTS transitions_ts ON transitions (ts);
+
+CREATE TABLE IF NOT EXISTS rollup_minute (
+    bucket INTEGER NOT NULL,
+    host TEXT NOT NULL,
+    polls INTEGER NOT NULL,
+    up_polls INTEGER NOT NULL,
+    seconds REAL NOT NULL,
+    up_seconds REAL NOT NULL,
+    latency_sum REAL NOT NULL,
+    latency_count INTEGER NOT NULL,
+    latency_max REAL,
+    vram_max INTEGER NOT NULL,
+    PRIMARY KEY (bucket, host)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS rollup_hour (
+    bucket INTEGER NOT NULL,
+    host TEXT NOT NULL,
+    polls INTEGER NOT NULL,
+    up_polls INTEGER NOT NULL,
+    seconds REAL NOT NULL,
+    up_seconds REAL NOT NULL,
+    latency_sum REAL NOT NULL,
+    latency_count INTEGER NOT NULL,
+    latency_max REAL,
+    vram_max INTEGER NOT NULL,
+    PRIMARY KEY (bucket, host)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS residency_hour (
+    bucket INTEGER NOT NULL,
+    host TEXT NOT NULL,
+    model TEXT NOT NULL,
+    seconds REAL NOT NULL,
+    PRIMARY KEY (bucket, host, model)
+) WITHOUT ROWID;
+"""
+
+_ROLLUP_UPSERT = """
+INSERT INTO {table} VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (bucket, host) DO UPDATE SET
+    polls = polls + excluded.polls,
+    up_polls = up_polls + excluded.up_polls,
+    seconds = seconds + excluded.seconds,
+    up_seconds = up_seconds + excluded.up_seconds,
+    latency_sum = latency_sum + excluded.latency_sum,
+    latency_count = latency_count + excluded.latency_count,
+    latency_max = MAX(COALESCE(latency_max, 0), COALESCE(excluded.latency_max, 0)),
+    vram_max = MAX(vram_max, excluded.vram_max)
+"""
+
+_RESIDENCY_UPSERT = """
+INSERT INTO residency_hour VALUES (?, ?, ?, ?)
+ON CONFLICT (bucket, host, model) DO UPDATE SET seconds = seconds + excluded.seconds
+"""
+
+DAY = 86400
+
+
+class _Rollup:
+    """Additive aggregate of the polls of one host in one time bucket."""
+
+    __slots__ = (
+        'polls', 'up_polls', 'seconds', 'up_seconds', 'latency_sum',
+        'latency_count', 'latency_max', 'vram_max'
+    )
+
+    def __init__(self):
+        self.polls = 0
+        self.up_polls = 0
+        self.seconds = 0.0
+        self.up_seconds = 0.0
+        self.latency_sum = 0.0
+        self.latency_count = 0
+        self.latency_max = None
+        self.vram_max = 0
+
+    def add(self, up: bool, latency: Optional[float], seconds: float,
+            size_vram: int):
+        self.polls += 1
+        self.seconds += seconds
+        if up:
+            self.up_polls += 1
+            self.up_seconds += seconds
+        if latency is not None:
+            self.latency_sum += latency
+            self.latency_count += 1
+            if self.latency_max is None or latency > self.latency_max:
+                self.latency_max = latency
+        if size_vram > self.vram_max:
+            self.vram_max = size_vram
+
+    def row(self, bucket: int, host: str) -> tuple:
+        return (
+            bucket, host, self.polls, self.up_polls, self.seconds,
+            self.up_seconds, self.latency_sum, self.latency_count,
+            self.latency_max, self.vram_max
+        )
+
+
+class HistoryStore:
+    """Append-only poll history in SQLite with batched writes and rollups."""
+
+    def __init__(self, path: str, flush_interval: float = 30.0,
+                 raw_days: float = 2, minute_days: float = 14,
+                 retention_days: float = 365, max_gap: float = 60.0,
+                 logger=None):
+        """
+        Open or create the database and start the writer thread.
+
+        Args:
+            path: SQLite database file
+            flush_interval: Seconds between batched writes
+            raw_days: Days raw samples are kept
+            minute_days: Days per-minute rollups are kept
+            retention_days: Days hourly rollups, residency and
+                transitions are kept
+            max_gap: Longest time in seconds a sample accounts for; longer
+                gaps (e.g. while the monitor was not running) are not counted
+            logger: Logger for write errors
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        self.raw_days = raw_days
+        self.minute_days = minute_days
+        self.retention_days = retention_days
+        self.max_gap = max_gap
+        self.logger = logger
+        self.flushes = 0
+
+        # Poll-thread state: last sample per host
+        self._previous: Dict[str, Tuple[float, bool, frozenset]] = {}
+        # Pending writes, swapped out as a whole by flush()
+        self._lock = threading.Lock()
+        self._reset_pending()
+
+        self._write_lock = threading.Lock()
+        self._db = self._connect()
+        self._db.executescript(SCHEMA)
+        self._pruned_at = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name='history-writer', daemon=True
+        )
+        self._thread.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection; WAL lets readers run while the writer commits."""
+        db = sqlite3.connect(self.path, check_same_thread=False)
+        db.execute('PRAGMA journal_mode=WAL')
+        # Commits no longer fsync; a crash can only lose the last batches
+        db.execute('PRAGMA synchronous=NORMAL')
+        return db
+
+    def _reset_pending(self):
+        self._samples = []
+        self._transitions = []
+        self._minutes = defaultdict(_Rollup)
+        self._hours = defaultdict(_Rollup)
+        self._residency = defaultdict(float)
+
+    def record(self, timestamp: float, hosts: list):
+        """
+        Add one poll result; only touches memory.
+
+        Args:
+            timestamp: ``time.time()`` of the poll
+            hosts: (endpoint, up, latency, models) per monitored host
+        """
+        with self._lock:
+            for host, up, latency, models in hosts:
+                names = frozenset(m.get('name', '') for m in models)
+                size_vram = int(sum(m.get('size_vram', 0) for m in models))
+                previous = self._previous.get(host)
+                if previous is None:
+                    seconds = 0.0
+                    self._transitions.append(
+                        (timestamp, host, 'up' if up else 'down', None)
+                    )
+                    self._transitions.extend(
+                        (timestamp, host, 'loaded', name) for name in sorted(names)
+                    )
+                else:
+                    last_ts, last_up, last_names = previous
+                    seconds = timestamp - last_ts
+                    if seconds > self.max_gap or seconds < 0:
+                        seconds = 0.0
+                    if up != last_up:
+                        self._transitions.append(
+                            (timestamp, host, 'up' if up else 'down', None)
+                        )
+                    if up and names != last_names:
+                        self._transitions.extend(
+                            (timestamp, host, 'loaded', name)
+                            for name in sorted(names - last_names)
+                        )
+                        self._transitions.extend(
+                            (timestamp, host, 'unloaded', name)
+                            for name in sorted(last_names - names)
+                        )
+                    if not up:
+                        # Keep the last known models until the host answers again
+                        names = last_names
+                self._previous[host] = (timestamp, up, names)
+
+                self._samples.append((
+                    timestamp, host, int(up), latency,
+                    ','.join(sorted(names)) if up else '', size_vram
+                ))
+                minute = int(timestamp // 60 * 60)
+                hour = int(timestamp // 3600 * 3600)
+                self._minutes[(minute, host)].add(up, latency, seconds, size_vram)
+                self._hours[(hour, host)].add(up, latency, seconds, size_vram)
+                if up and seconds:
+                    for name in names:
+                        self._residency[(hour, host, name)] += seconds
+
+    def record_event(self, timestamp: float, host: str, event: str,
+                     model: Optional[str] = None):
+        """
+        Add a transition the polls cannot see, such as a preload.
+
+        Args:
+            timestamp: ``time.time()`` of the event
+            host: Endpoint the event concerns
+            event: Event name
+            model: Model name, if the event concerns one
+        """
+        with self._lock:
+            self._transitions.append((timestamp, host, event, model))
+
+    def flush(self):
+        """Write everything recorded so far in one transaction."""
+        with self._lock:
+            samples, transitions = self._samples, self._transitions
+            minutes, hours, residency = self._minutes, self._hours, self._residency
+            self._reset_pending()
+        if not (samples or transitions or minutes):
+            return
+        with self._write_lock, self._db:
+            self._db.executemany(
+                'INSERT INTO samples VALUES (?, ?, ?, ?, ?, ?)', samples
+            )
+            self._db.executemany(
+                'INSERT INTO transitions VALUES (?, ?, ?, ?)', transitions
+            )
+            self._db.executemany(
+                _ROLLUP_UPSERT.format(table='rollup_minute'),
+                [r.row(bucket, host) for (bucket, host), r in minutes.items()]
+            )
+            self._db.executemany(
+                _ROLLUP_UPSERT.format(table='rollup_hour'),
+                [r.row(bucket, host) for (bucket, host), r in hours.items()]
+            )
+            self._db.executemany(
+                _RESIDENCY_UPSERT,
+                [(b, h, m, s) for (b, h, m), s in residency.items()]
+            )
+        self.flushes += 1
+
+    def prune(self, now: Optional[float] = None):
+        """
+        Apply the retention policy.
+
+        Args:
+            now: Reference time, defaults to ``time.time()``
+        """
+        now = time.time() if now is None else now
+        with self._write_lock, self._db:
+            self._db.execute(
+                'DELETE FROM samples WHERE ts < ?', (now - self.raw_days * DAY,)
+            )
+            self._db.execute(
+                'DELETE FROM rollup_minute WHERE bucket < ?',
+                (now - self.minute_days * DAY,)
+            )
+            cutoff = now - self.retention_days * DAY
+            for table, column in (('rollup_hour', 'bucket'),
+                                  ('residency_hour', 'bucket'),
+                                  ('transitions', 'ts')):
+                self._db.execute(f'DELETE FROM {table} WHERE {column} < ?', (cutoff,))
+        self._pruned_at = now
+
+    def _run(self):
+        """Writer loop: flush on an interval and prune about once an hour."""
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+                if time.time() - self._pruned_at >= 3600:
+                    self.prune()
+            except sqlite3.Error as e:
+                if self.logger:
+                    self.logger.error(f"Error writing history: {str(e)}")
+
+    def close(self):
+        """Write pending data and close the database."""
+        self._stop.set()
+        self._thread.join()
+        try:
+            self.flush()
+        finally:
+            self._db.close()
+
+    def _query(self, sql: str, params: tuple = ()) -> list:
+        """Run a read query on a short-lived connection."""
+        db = sqlite3.connect(self.path)
+        try:
+            return db.execute(sql, params).fetchall()
+        finally:
+            db.close()
+
+    def uptime(self, since: float) -> List[Tuple[str, float, float]]:
+        """
+        Share of observed time each host was reachable.
+
+        Args:
+            since: Start of the period, ``time.time()`` style
+
+        Returns:
+            (host, up seconds, observed seconds) per host
+        """
+        self.flush()
+        return self._query(
+            'SELECT host, SUM(up_seconds), SUM(seconds) FROM rollup_hour '
+            'WHERE bucket >= ? GROUP BY host ORDER BY host',
+            (int(since // 3600 * 3600),)
+        )
+
+    def model_residency(self, since: float) -> Dict[date, Dict[str, float]]:
+        """
+        Hours each model was loaded, per local calendar day.
+
+        Args:
+            since: Start of the period, ``time.time()`` style
+
+        Returns:
+            {day: {model: seconds loaded}} summed over hosts
+        """
+        self.flush()
+        days: Dict[date, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        for bucket, model, seconds in self._query(
+            'SELECT bucket, model, SUM(seconds) FROM residency_hour '
+            'WHERE bucket >= ? GROUP BY bucket, model',
+            (int(since // 3600 * 3600),)
+        ):
+            days[datetime.fromtimestamp(bucket).date()][model] += seconds
+        return {day: dict(models) for day, models in sorted(days.items())}
+
+    def transitions(self, since: float, host: Optional[str] = None) -> list:
+        """
+        State changes since a point in time.
+
+        Args:
+            since: Start of the period, ``time.time()`` style
+            host: Only this host, all hosts if None
+
+        Returns:
+            (timestamp, host, event, model) rows, oldest first
+        """
+        self.flush()
+        if host is None:
+            return self._query(
+                'SELECT * FROM transitions WHERE ts >= ? ORDER BY ts', (since,)
+            )
+        return self._query(
+            'SELECT * FROM transitions WHERE host = ? AND ts >= ? ORDER BY ts',
+            (host, since)
+        )
+
+    def active_hours(self, since: float, host: str) -> List[int]:
+        """
+        Hours in which a host answered at least one poll.
+
+        Args:
+            since: Start of the period, ``time.time()`` style
+            host: Endpoint
+
+        Returns:
+            Start of each hour, oldest first
+        """
+        self.flush()
+        return [bucket for bucket, in self._query(
+            'SELECT bucket FROM rollup_hour WHERE host = ? AND bucket >= ? '
+            'AND up_polls > 0 ORDER BY bucket',
+            (host, int(since // 3600 * 3600))
+        )]
+
+
+def _duration(seconds: float) -> str:
+    """Format a duration as minutes below an hour, hours above."""
+    if seconds < 3600:
+        return f"{seconds / 60:.0f} min"
+    return f"{seconds / 3600:.1f} h"
+
+
+def format_summary(store: HistoryStore, days: int = 7,
+                   now: Optional[float] = None) -> str:
+    """
+    Describe uptime and model residency over the last ``days`` days.
+
+    Args:
+        store: History to summarize
+        days: Length of the period
+        now: End of the period, defaults to ``time.time()``
+
+    Returns:
+        Multi-line text for the terminal or the log
+    """
+    now = time.time() if now is None else now
+    since = now - days * DAY
+    lines = [f"Uptime over the last {days} days:"]
+    uptime = store.uptime(since)
+    for host, up_seconds, seconds in uptime:
+        share = up_seconds / seconds * 100 if seconds else 0.0
+        lines.append(f"  {host}: {share:.1f}% of {_duration(seconds)} observed")
+    if not uptime:
+        lines.append("  no data")
+
+    lines.append("Model residency per day:")
+    residency = store.model_residency(since)
+    for day, models in residency.items():
+        text = ', '.join(
+            f"{name} {_duration(seconds)}"
+            for name, seconds in sorted(models.items(), key=lambda m: -m[1])
+        )
+        lines.append(f"  {day.isoformat()}: {text}")
+    if not residency:
+        lines.append("  no data")
+    return '\n'.join(lines)
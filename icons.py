@@ -0,0 +1,161 @@
+"""
+Tray icon cache for Ollama Monitor.
+
+Each status icon is decoded once, the first time it is shown. Icons with
+a gauge overlay are composited on demand and kept in a small LRU cache
+keyed by the quantized gauge value, so steady-state polling never touches
+the disk or redraws an image.
+"""
+
+import os
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+ICON_COLORS = ('red', 'blue', 'green')
+
+OVERLAY_NONE = 'none'
+OVERLAY_VRAM = 'vram'
+OVERLAY_MODELS = 'models'
+
+# Number of distinct VRAM gauge levels (0%, 10%, ..., 100%)
+VRAM_STEPS = 10
+# Loaded-model counts above this are drawn as "9+"
+MAX_MODEL_BADGE = 9
+
+
+def vram_fraction(models: List[dict]) -> float:
+    """
+    Get the share of loaded model weights that sit in VRAM.
+
+    Args:
+        models: The ``models`` list returned by ``/api/ps``
+
+    Returns:
+        Fraction between 0 and 1, 0 when nothing is loaded
+    """
+    size = sum(m.get('size', 0) for m in models)
+    if not size:
+        return 0.0
+    return min(1.0, sum(m.get('size_vram', 0) for m in models) / size)
+
+
+class IconCache:
+    """Decoded status icons plus an LRU cache of gauge variants."""
+
+    def __init__(self, icons_dir: str, size: int = 64, max_overlays: int = 32):
+        """
+        Prepare the cache; icons are decoded on first use.
+
+        Args:
+            icons_dir: Directory containing ``icon_<color>.png`` files
+            size: Edge length the icons are scaled to
+            max_overlays: Maximum number of composited icons kept
+        """
+        self.icons_dir = icons_dir
+        self.size = size
+        self.max_overlays = max_overlays
+        self._base: Dict[str, Image.Image] = {}
+        self._overlays: 'OrderedDict[Tuple[str, str, int], Image.Image]' = OrderedDict()
+        self._font = None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, color: str, overlay: str = OVERLAY_NONE,
+            models: Optional[List[dict]] = None) -> Image.Image:
+        """
+        Get the icon for a status color, optionally with a gauge overlay.
+
+        Args:
+            color: One of ``ICON_COLORS``
+            overlay: ``OVERLAY_NONE``, ``OVERLAY_VRAM`` or ``OVERLAY_MODELS``
+            models: Loaded models used to compute the gauge value
+
+        Returns:
+            Cached PIL Image; callers must not modify it
+        """
+        if overlay == OVERLAY_NONE or not models:
+            return self.base(color)
+
+        if overlay == OVERLAY_VRAM:
+            value = round(vram_fraction(models) * VRAM_STEPS)
+        else:
+            value = min(len(models), MAX_MODEL_BADGE + 1)
+
+        key = (color, overlay, value)
+        image = self._overlays.get(key)
+        if image is not None:
+            self._overlays.move_to_end(key)
+            self.hits += 1
+            return image
+
+        self.misses += 1
+        image = self._render(color, overlay, value)
+        self._overlays[key] = image
+        if len(self._overlays) > self.max_overlays:
+            self._overlays.popitem(last=False)
+        return image
+
+    def base(self, color: str) -> Image.Image:
+        """
+        Get a plain status icon, decoding it on first use.
+
+        Args:
+            color: One of ``ICON_COLORS``
+
+        Returns:
+            Cached PIL Image; callers must not modify it
+        """
+        image = self._base.get(color)
+        if image is None:
+            path = os.path.join(self.icons_dir, f'icon_{color}.png')
+            with Image.open(path) as source:
+                image = source.convert('RGBA').resize(
+                    (self.size, self.size), Image.LANCZOS, reducing_gap=2.0
+                )
+            self._base[color] = image
+        return image
+
+    def _render(self, color: str, overlay: str, value: int) -> Image.Image:
+        """Composite a gauge overlay onto a copy of a base icon."""
+        image = self.base(color).copy()
+        draw = ImageDraw.Draw(image)
+        size = self.size
+
+        if overlay == OVERLAY_VRAM:
+            # Horizontal bar along the bottom edge
+            height = max(4, size // 6)
+            top = size - height
+            draw.rectangle((0, top, size - 1, size - 1), fill=(0, 0, 0, 200))
+            width = round((size - 2) * value / VRAM_STEPS)
+            if width:
+                draw.rectangle(
+                    (1, top + 1, width, size - 2), fill=(255, 255, 255, 255)
+                )
+        else:
+            # Count badge in the bottom-right corner
+            radius = size // 4
+            center = size - radius - 1
+            draw.ellipse(
+                (center - radius, center - radius, center + radius, center + radius),
+                fill=(0, 0, 0, 220)
+            )
+            text = str(value) if value <= MAX_MODEL_BADGE else f"{MAX_MODEL_BADGE}+"
+            font = self._badge_font(radius)
+            left, top, right, bottom = draw.textbbox((0, 0), text, font=font)
+            draw.text(
+                (center - (left + right) / 2, center - (top + bottom) / 2),
+                text, fill=(255, 255, 255, 255), font=font
+            )
+        return image
+
+    def _badge_font(self, radius: int):
+        """Load the badge font on first use."""
+        if self._font is None:
+            try:
+                self._font = ImageFont.load_default(size=int(radius * 1.4))
+            except TypeError:
+                # Pillow < 10.1 only ships a fixed-size bitmap font
+                self._font = ImageFont.load_default()
+        return self._font
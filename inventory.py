@@ -0,0 +1,321 @@
+"""
+Installed-model inventory for Ollama Monitor.
+
+Lists the models ``/api/tags`` reports, indexed by name, family and
+quantization, and keeps the list in memory and in ``inventory.json`` so
+menus and commands read it without asking the server. Refreshes run on a
+background thread, on demand or on a slow schedule, and compare digests:
+only models that are new or whose digest changed are looked up with
+``/api/show``, one at a time.
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import httpx
+
+from models import parse_timestamp
+
+GB = 1024 ** 3
+
+
+class InstalledModel(NamedTuple):
+    """One model stored on an Ollama server."""
+
+    name: str
+    digest: str
+    size: int                       # bytes on disk
+    modified_at: Optional[float]
+    family: str
+    parameter_size: str
+    quantization: str
+    context_length: Optional[int]   # from /api/show
+    capabilities: Optional[tuple]   # from /api/show, None until looked up
+
+    @classmethod
+    def from_api(cls, tag: dict, show: Optional[dict] = None) -> 'InstalledModel':
+        """
+        Build a record from ``/api/tags`` and ``/api/show`` entries.
+
+        Args:
+            tag: Model dictionary from ``/api/tags``
+            show: ``/api/show`` response for the model, if looked up
+
+        Returns:
+            InstalledModel instance
+        """
+        details = tag.get('details') or {}
+        context_length = capabilities = None
+        if show is not None:
+            info = show.get('model_info') or {}
+            architecture = info.get('general.architecture', '')
+            context_length = info.get(f'{architecture}.context_length')
+            capabilities = tuple(show.get('capabilities') or ())
+        return cls(
+            tag.get('name', ''),
+            tag.get('digest') or tag.get('name', ''),
+            tag.get('size', 0),
+            parse_timestamp(tag.get('modified_at', '')),
+            details.get('family', ''),
+            details.get('parameter_size', '?'),
+            details.get('quantization_level', ''),
+            context_length,
+            capabilities
+        )
+
+    def describe(self) -> str:
+        """Name, parameter size, quantization and size on disk."""
+        text = f"{self.name} ({self.parameter_size}"
+        if self.quantization:
+            text += f", {self.quantization}"
+        return text + f", {self.size / GB:.1f} GB)"
+
+
+class InventoryIndex:
+    """Installed models by name, family and quantization; never modified."""
+
+    def __init__(self, models: Iterable[InstalledModel] = ()):
+        """
+        Args:
+            models: Installed models; later entries replace earlier ones
+                of the same name
+        """
+        self.by_name: Dict[str, InstalledModel] = {m.name: m for m in models}
+        self.by_family: Dict[str, List[InstalledModel]] = {}
+        self.by_quantization: Dict[str, List[InstalledModel]] = {}
+        for model in sorted(self.by_name.values(), key=lambda m: m.name):
+            self.by_family.setdefault(model.family or 'other', []).append(model)
+            self.by_quantization.setdefault(model.quantization or 'other', []).append(model)
+        self.digests = {model.digest for model in self.by_name.values()}
+        self.total_size = sum(model.size for model in self.by_name.values())
+
+    def __len__(self) -> int:
+        return len(self.by_name)
+
+    def __iter__(self):
+        for family in sorted(self.by_family):
+            yield from self.by_family[family]
+
+    def get(self, name: str) -> Optional[InstalledModel]:
+        """Model of the given name, adding the implicit ``:latest`` tag."""
+        return self.by_name.get(name) or self.by_name.get(f'{name}:latest')
+
+    def select(self, family: Optional[str] = None,
+               quantization: Optional[str] = None) -> List[InstalledModel]:
+        """Models of a family and/or quantization, sorted by name."""
+        if family is not None:
+            models = self.by_family.get(family, [])
+        elif quantization is not None:
+            models = self.by_quantization.get(quantization, [])
+        else:
+            return sorted(self.by_name.values(), key=lambda m: m.name)
+        if quantization is None:
+            return list(models)
+        return [m for m in models if m.quantization == quantization]
+
+
+class ModelInventory:
+    """Cached inventory of one server's installed models."""
+
+    def __init__(self, path: str, api_url: str, refresh_interval: float = 3600.0,
+                 min_interval: float = 60.0, logger=None):
+        """
+        Load the cached inventory; nothing is requested until a refresh.
+
+        Args:
+            path: JSON file the inventory is cached in
+            api_url: Base URL of the server the inventory describes
+            refresh_interval: Seconds between scheduled refreshes
+            min_interval: Fewest seconds between two automatic refreshes
+            logger: Logger for refreshes and errors
+        """
+        self.path = path
+        self.api_url = api_url
+        self.refresh_interval = refresh_interval
+        self.min_interval = min_interval
+        self.logger = logger
+        self.index = InventoryIndex()
+        self.refreshed_at: Optional[float] = None
+        # Changes whenever the index is replaced, for cheap change checks
+        self.version = 0
+        self.show_requests = 0
+        self._attempted_at = 0.0
+        self._in_flight = False
+        self._lock = threading.Lock()
+        self._executor = None
+        self._load()
+
+    def _load(self):
+        """Read the cache file if it describes the same server."""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('api_url') != self.api_url:
+                return
+            self.index = InventoryIndex(
+                InstalledModel(*entry[:-1], None if entry[-1] is None else tuple(entry[-1]))
+                for entry in data.get('models', [])
+            )
+            self.refreshed_at = data.get('refreshed_at')
+            self.version += 1
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, TypeError) as e:
+            self._log('warning', f"Ignoring the model inventory cache: {str(e)}")
+
+    def _save(self):
+        """Write the cache file in one step, so readers never see half of it."""
+        data = {
+            'api_url': self.api_url,
+            'refreshed_at': self.refreshed_at,
+            'models': [list(model) for model in self.index.by_name.values()]
+        }
+        temporary = f'{self.path}.tmp'
+        try:
+            with open(temporary, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(temporary, self.path)
+        except OSError as e:
+            self._log('error', f"Could not save the model inventory: {str(e)}")
+
+    def due(self, loaded: Iterable = (), now: Optional[float] = None) -> bool:
+        """
+        Whether a scheduled refresh should start.
+
+        Args:
+            loaded: Loaded models; one whose digest is not in the inventory
+                means a model was pulled since the last refresh
+            now: Current ``time.time()``
+        """
+        now = time.time() if now is None else now
+        if self._in_flight or now - self._attempted_at < self.min_interval:
+            return False
+        if self.refreshed_at is None or now - self.refreshed_at >= self.refresh_interval:
+            return True
+        digests = self.index.digests
+        return any(model.digest not in digests for model in loaded)
+
+    def check(self, client: httpx.Client, api_url: str, loaded: Iterable = (),
+              now: Optional[float] = None):
+        """
+        Start a refresh in the background if one is due; never blocks.
+
+        Args:
+            client: HTTP client for the refresh requests
+            api_url: Base URL of the Ollama server
+            loaded: Models currently loaded according to ``/api/ps``
+            now: Current ``time.time()``
+        """
+        if self.due(loaded, now):
+            self.refresh_async(client, api_url)
+
+    def refresh_async(self, client: httpx.Client, api_url: str) -> bool:
+        """
+        Start a refresh in the background.
+
+        Returns:
+            False if a refresh is already running
+        """
+        with self._lock:
+            if self._in_flight:
+                return False
+            self._in_flight = True
+        self._attempted_at = time.time()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='inventory')
+        self._executor.submit(self._refresh_logged, client, api_url)
+        return True
+
+    def _refresh_logged(self, client: httpx.Client, api_url: str):
+        """Run a refresh and log its failure; runs on the inventory thread."""
+        try:
+            self.refresh(client, api_url)
+        except (httpx.HTTPError, ValueError) as e:
+            self._log('warning', f"Could not refresh the model inventory: {str(e)}")
+        finally:
+            with self._lock:
+                self._in_flight = False
+
+    def refresh(self, client: httpx.Client, api_url: str) -> Tuple[int, int, int]:
+        """
+        Fetch ``/api/tags`` and look up new or changed models.
+
+        Args:
+            client: HTTP client for the requests
+            api_url: Base URL of the Ollama server
+
+        Returns:
+            Number of added, changed and removed models
+
+        Raises:
+            httpx.HTTPError: If ``/api/tags`` could not be read
+            ValueError: If the response is not valid JSON
+        """
+        self._attempted_at = time.time()
+        response = client.get(f'{api_url}/api/tags')
+        response.raise_for_status()
+        tags = response.json().get('models') or []
+        known = self.index.by_name if api_url == self.api_url else {}
+        models = []
+        added = changed = 0
+        for tag in tags:
+            name = tag.get('name', '')
+            previous = known.get(name)
+            digest = tag.get('digest') or name
+            if (
+                previous is not None and previous.digest == digest
+                and previous.capabilities is not None
+            ):
+                # Same digest, same model: keep what was looked up before
+                models.append(previous._replace(
+                    size=tag.get('size', previous.size),
+                    modified_at=parse_timestamp(tag.get('modified_at', '')) or previous.modified_at
+                ))
+                continue
+            if previous is None:
+                added += 1
+            elif previous.digest != digest:
+                changed += 1
+            models.append(InstalledModel.from_api(tag, self._show(client, api_url, name)))
+        removed = len(set(known) - {model.name for model in models})
+        self.api_url = api_url
+        self.index = InventoryIndex(models)
+        self.refreshed_at = time.time()
+        self.version += 1
+        self._save()
+        if added or changed or removed:
+            self._log('info', (
+                f"Model inventory: {added} added, {changed} changed, "
+                f"{removed} removed; {self.summary()}"
+            ))
+        return added, changed, removed
+
+    def _show(self, client: httpx.Client, api_url: str, name: str) -> Optional[dict]:
+        """``/api/show`` response for a model, None if it failed."""
+        self.show_requests += 1
+        try:
+            response = client.post(f'{api_url}/api/show', json={'model': name})
+            if response.status_code == 200:
+                return response.json()
+            self._log('warning', f"Could not look up {name}: HTTP {response.status_code}")
+        except (httpx.HTTPError, ValueError) as e:
+            self._log('warning', f"Could not look up {name}: {str(e)}")
+        return None
+
+    def summary(self) -> str:
+        """Number of installed models and their size on disk."""
+        index = self.index
+        return f"{len(index)} models, {index.total_size / GB:.1f} GB on disk"
+
+    def close(self):
+        """Stop the refresh thread without waiting for a running refresh."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+    def _log(self, level: str, message: str):
+        if self.logger:
+            getattr(self.logger, level)(message)
@@ -0,0 +1,101 @@
+"""
+Queue-backed, de-duplicating log handler for Ollama Monitor.
+
+Records are handed to a background listener that owns the file and
+console handlers, so the poll loop never waits for disk or terminal I/O.
+Identical messages repeated within a short time are counted instead of
+queued and reported later as one summary line.
+"""
+
+import logging
+from logging.handlers import QueueHandler
+from typing import Dict, Tuple
+
+# A message seen again within this many seconds counts as a repeat
+REPEAT_WINDOW = 300.0
+# While a message keeps repeating, summarize it at most this often
+SUMMARY_INTERVAL = 3600.0
+
+
+class _Repeat:
+    """Suppressed occurrences of one message."""
+
+    __slots__ = ('since', 'last_seen', 'count', 'record')
+
+    def __init__(self, created: float):
+        self.since = created
+        self.last_seen = created
+        self.count = 0
+        self.record = None
+
+
+class DedupQueueHandler(QueueHandler):
+    """
+    QueueHandler that collapses repeated identical messages.
+
+    The first occurrence of a message is queued as usual. Repeats within
+    ``repeat_window`` seconds are only counted; the count is queued as a
+    summary when any other message is logged, every ``summary_interval``
+    seconds while the repeats go on, and on :meth:`flush_repeats`.
+    """
+
+    def __init__(self, queue, repeat_window: float = REPEAT_WINDOW,
+                 summary_interval: float = SUMMARY_INTERVAL):
+        """
+        Args:
+            queue: Queue shared with the QueueListener
+            repeat_window: Seconds within which a message counts as a repeat
+            summary_interval: Seconds between summaries of an ongoing repeat
+        """
+        super().__init__(queue)
+        self.repeat_window = repeat_window
+        self.summary_interval = summary_interval
+        self.suppressed = 0
+        self._repeats: Dict[Tuple, _Repeat] = {}
+
+    def emit(self, record: logging.LogRecord):
+        """Queue the record, or count it if it repeats a recent message."""
+        try:
+            key = (record.name, record.levelno, record.getMessage())
+            repeat = self._repeats.get(key)
+            if repeat is not None and record.created - repeat.last_seen <= self.repeat_window:
+                repeat.count += 1
+                repeat.last_seen = record.created
+                repeat.record = record
+                self.suppressed += 1
+                if record.created - repeat.since >= self.summary_interval:
+                    self._summarize(repeat)
+                return
+            self.flush_repeats(record.created)
+            self._repeats[key] = _Repeat(record.created)
+            super().emit(record)
+        except Exception:
+            self.handleError(record)
+
+    def flush_repeats(self, now: float = None):
+        """
+        Queue summaries for every message repeated since its last report.
+
+        Args:
+            now: Time of the record being logged; messages not seen for
+                ``repeat_window`` seconds before it are forgotten
+        """
+        for key, repeat in list(self._repeats.items()):
+            if repeat.count:
+                self._summarize(repeat)
+            if now is not None and now - repeat.last_seen > self.repeat_window:
+                del self._repeats[key]
+
+    def _summarize(self, repeat: _Repeat):
+        """Queue one summary line for ``repeat`` and reset its count."""
+        record = logging.makeLogRecord(repeat.record.__dict__)
+        record.msg = (
+            f"{repeat.record.getMessage()} [repeated {repeat.count} times in "
+            f"{repeat.last_seen - repeat.since:.0f} seconds]"
+        )
+        record.args = None
+        record.exc_info = None
+        record.exc_text = None
+        repeat.since = repeat.last_seen
+        repeat.count = 0
+        self.enqueue(self.prepare(record))
@@ -0,0 +1,203 @@
+"""
+Prometheus/OpenMetrics exporter for Ollama Monitor.
+
+Serves the state the poll loop already collected. The response body is
+serialized once per state change and shared by every scrape, so scrapers
+never cause requests to the Ollama server.
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterable, List, Optional, Tuple
+
+from models import parse_timestamp
+
+CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+# (endpoint, up, latency seconds or None, models from /api/ps)
+HostSnapshot = Tuple[str, bool, Optional[float], List[dict]]
+
+def _escape(value: str) -> str:
+    """Escape a label value."""
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def render_metrics(hosts: Iterable[HostSnapshot], host_sample=None) -> bytes:
+    """
+    Serialize host snapshots in OpenMetrics text format.
+
+    Args:
+        hosts: One snapshot per monitored endpoint
+        host_sample: Readings of the local Ollama processes, if sampled
+
+    Returns:
+        Encoded exposition, terminated by ``# EOF``
+    """
+    families = {
+        'ollama_up': ('gauge', 'Whether the Ollama API answered the last poll', []),
+        'ollama_poll_latency_seconds': (
+            'gauge', 'Round trip of the last /api/ps poll', []),
+        'ollama_models_loaded': ('gauge', 'Number of loaded models', []),
+        'ollama_model_size_bytes': ('gauge', 'Size of a loaded model', []),
+        'ollama_model_vram_bytes': ('gauge', 'VRAM used by a loaded model', []),
+        'ollama_model_expires_at_seconds': (
+            'gauge', 'When a loaded model will be unloaded', []),
+    }
+    if host_sample is not None:
+        families.update({
+            'ollama_process_cpu_percent': (
+                'gauge', 'CPU use of an Ollama process', []),
+            'ollama_process_resident_memory_bytes': (
+                'gauge', 'Resident memory of an Ollama process', []),
+            'ollama_process_threads': ('gauge', 'Threads of an Ollama process', []),
+            'ollama_process_read_bytes': (
+                'counter', 'Bytes read by an Ollama process', []),
+            'ollama_process_written_bytes': (
+                'counter', 'Bytes written by an Ollama process', []),
+            'ollama_host_memory_used_ratio': (
+                'gauge', 'Share of host memory in use', []),
+        })
+        for process in host_sample.processes:
+            labels = f'{{pid="{process.pid}",role="{process.role}"'
+            if process.model:
+                labels += f',model="{_escape(process.model)}"'
+            labels += '}'
+            families['ollama_process_cpu_percent'][2].append(
+                f'{labels} {process.cpu_percent:.1f}'
+            )
+            families['ollama_process_resident_memory_bytes'][2].append(
+                f'{labels} {process.rss}'
+            )
+            families['ollama_process_threads'][2].append(
+                f'{labels} {process.num_threads}'
+            )
+            if process.read_bytes is not None:
+                families['ollama_process_read_bytes'][2].append(
+                    f'_total{labels} {process.read_bytes}'
+                )
+                families['ollama_process_written_bytes'][2].append(
+                    f'_total{labels} {process.write_bytes}'
+                )
+        families['ollama_host_memory_used_ratio'][2].append(
+            f' {host_sample.memory_percent / 100:.3f}'
+        )
+
+    for endpoint, up, latency, models in hosts:
+        host = f'endpoint="{_escape(endpoint)}"'
+        families['ollama_up'][2].append(f'{{{host}}} {int(up)}')
+        if latency is not None:
+            families['ollama_poll_latency_seconds'][2].append(
+                f'{{{host}}} {latency:.3f}'
+            )
+        families['ollama_models_loaded'][2].append(f'{{{host}}} {len(models)}')
+        for model in models:
+            labels = (
+                f'{{{host},model="{_escape(model.get("name", ""))}",'
+                f'digest="{_escape(model.get("digest", ""))}"}}'
+            )
+            families['ollama_model_size_bytes'][2].append(
+                f'{labels} {model.get("size", 0)}'
+            )
+            families['ollama_model_vram_bytes'][2].append(
+                f'{labels} {model.get("size_vram", 0)}'
+            )
+            expires_at = parse_timestamp(model.get('expires_at', ''))
+            if expires_at is not None:
+                families['ollama_model_expires_at_seconds'][2].append(
+                    f'{labels} {expires_at:.3f}'
+                )
+
+    lines = []
+    for name, (kind, help_text, samples) in families.items():
+        lines.append(f'# TYPE {name} {kind}')
+        lines.append(f'# HELP {name} {help_text}')
+        lines.extend(f'{name}{sample}' for sample in samples)
+    lines.append('# EOF\n')
+    return '\n'.join(lines).encode('utf-8')
+
+
+class MetricsExporter:
+    """Minimal HTTP listener serving a pre-serialized metrics snapshot."""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 9877):
+        """
+        Bind the listener; call :meth:`start` to begin serving.
+
+        Args:
+            host: Address to listen on
+            port: Port to listen on, 0 picks a free one
+        """
+        self._key = None
+        self.body = render_metrics([])
+        self.renders = 0
+        self.scrapes = 0
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Send headers and body in one segment
+            wbufsize = 64 * 1024
+
+            def do_GET(self):
+                if self.path.split('?', 1)[0] not in ('/metrics', '/'):
+                    self.send_error(404)
+                    return
+                body = exporter.body
+                exporter.scrapes += 1
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self.httpd.serve_forever, name='metrics-exporter', daemon=True
+        )
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """Address the listener is bound to."""
+        return self.httpd.server_address[:2]
+
+    def start(self):
+        """Start serving in a background thread."""
+        self._thread.start()
+
+    def update(self, hosts: List[HostSnapshot], host_sample=None):
+        """
+        Publish a new poll result, re-serializing only if it changed.
+
+        Latency is compared at millisecond resolution.
+
+        Args:
+            hosts: One snapshot per monitored endpoint
+            host_sample: Readings of the local Ollama processes, if sampled
+        """
+        key = tuple(
+            (
+                endpoint, up,
+                None if latency is None else round(latency, 3),
+                tuple(
+                    (m.get('digest'), m.get('size'), m.get('size_vram'),
+                     m.get('expires_at'))
+                    for m in models
+                )
+            )
+            for endpoint, up, latency, models in hosts
+        ) + (None if host_sample is None else tuple(host_sample),)
+        if key == self._key:
+            return
+        self._key = key
+        # Swapping the reference is atomic, scrapes see old or new body
+        self.body = render_metrics(hosts, host_sample)
+        self.renders += 1
+
+    def stop(self):
+        """Stop the listener."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
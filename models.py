@@ -0,0 +1,197 @@
+"""
+Loaded-model records for Ollama Monitor.
+
+Parses the full ``/api/ps`` model list into compact records and tracks
+them across polls by digest, so each poll yields added, removed and
+changed models instead of a single status string.
+"""
+
+import re
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional
+
+STATUS_NO_MODEL = "No Model Running"
+
+_FRACTION_RE = re.compile(r'\.(\d+)')
+
+
+def parse_timestamp(value: str) -> Optional[float]:
+    """
+    Parse an RFC 3339 timestamp as returned by Ollama.
+
+    Ollama reports nanoseconds and ``Z`` suffixes, which
+    ``datetime.fromisoformat`` rejects before Python 3.11.
+
+    Args:
+        value: Timestamp string such as ``2024-06-04T14:38:31.83753-07:00``
+
+    Returns:
+        Seconds since the epoch, or None if it cannot be parsed
+    """
+    if not value:
+        return None
+    value = value.replace('Z', '+00:00')
+    value = _FRACTION_RE.sub(lambda m: '.' + m.group(1)[:6].ljust(6, '0'), value, 1)
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        return None
+
+
+def describe_models(models: List[dict]) -> str:
+    """
+    Build the status text for a list of running models.
+
+    Args:
+        models: The ``models`` list returned by ``/api/ps``
+
+    Returns:
+        Status message about running models
+    """
+    if not models:
+        return STATUS_NO_MODEL
+    model = models[0]
+    text = (
+        f"{model['name']} "
+        f"({model.get('details', {}).get('parameter_size', '?')})"
+    )
+    if len(models) > 1:
+        text += f" +{len(models) - 1} more"
+    return text
+
+
+class LoadedModel:
+    """One model resident on an Ollama server."""
+
+    __slots__ = (
+        'name', 'digest', 'size', 'size_vram', 'parameter_size',
+        'quantization', 'expires_at'
+    )
+
+    def __init__(self, name: str, digest: str, size: int, size_vram: int,
+                 parameter_size: str, quantization: str,
+                 expires_at: Optional[float]):
+        self.name = name
+        self.digest = digest
+        self.size = size
+        self.size_vram = size_vram
+        self.parameter_size = parameter_size
+        self.quantization = quantization
+        self.expires_at = expires_at
+
+    @classmethod
+    def from_api(cls, data: dict) -> 'LoadedModel':
+        """
+        Build a record from one entry of the ``/api/ps`` response.
+
+        Args:
+            data: Model dictionary from the API
+
+        Returns:
+            LoadedModel instance
+        """
+        details = data.get('details') or {}
+        return cls(
+            data.get('name', ''),
+            data.get('digest') or data.get('name', ''),
+            data.get('size', 0),
+            data.get('size_vram', 0),
+            details.get('parameter_size', '?'),
+            details.get('quantization_level', ''),
+            parse_timestamp(data.get('expires_at', ''))
+        )
+
+    @property
+    def vram_share(self) -> float:
+        """Fraction of the model held in VRAM."""
+        if not self.size:
+            return 0.0
+        return min(1.0, self.size_vram / self.size)
+
+    def describe(self) -> str:
+        """Name and parameter size, as shown in notifications."""
+        return f"{self.name} ({self.parameter_size})"
+
+    def processor(self) -> str:
+        """GPU/CPU split in the style of ``ollama ps``."""
+        gpu = round(self.vram_share * 100)
+        if gpu >= 100:
+            return "100% GPU"
+        if gpu <= 0:
+            return "100% CPU"
+        return f"{100 - gpu}%/{gpu}% CPU/GPU"
+
+    def same_state(self, other: 'LoadedModel') -> bool:
+        """Whether two records of the same digest are indistinguishable."""
+        return (
+            self.size == other.size
+            and self.size_vram == other.size_vram
+            and self.expires_at == other.expires_at
+            and self.name == other.name
+        )
+
+    def __repr__(self) -> str:
+        return f"LoadedModel({self.name!r}, {self.digest[:12]!r})"
+
+
+class ModelChanges(NamedTuple):
+    """Difference between two consecutive polls."""
+
+    added: List[LoadedModel]
+    removed: List[LoadedModel]
+    changed: List[LoadedModel]
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+
+class ModelSet:
+    """Loaded models keyed by digest, updated incrementally per poll."""
+
+    def __init__(self):
+        self._by_digest: Dict[str, LoadedModel] = {}
+
+    def __len__(self) -> int:
+        return len(self._by_digest)
+
+    def __contains__(self, digest: str) -> bool:
+        return digest in self._by_digest
+
+    @property
+    def models(self) -> List[LoadedModel]:
+        """Loaded models in the order the API reported them."""
+        return list(self._by_digest.values())
+
+    def update(self, models: List[dict]) -> ModelChanges:
+        """
+        Replace the set with the models from a new poll.
+
+        Records of unchanged models are kept as they are.
+
+        Args:
+            models: The ``models`` list returned by ``/api/ps``
+
+        Returns:
+            ModelChanges describing what happened since the last poll
+        """
+        previous = self._by_digest
+        current: Dict[str, LoadedModel] = {}
+        added = []
+        changed = []
+        for data in models:
+            record = LoadedModel.from_api(data)
+            old = previous.get(record.digest)
+            if old is None:
+                added.append(record)
+            elif old.same_state(record):
+                record = old
+            else:
+                changed.append(record)
+            current[record.digest] = record
+        removed = [m for digest, m in previous.items() if digest not in current]
+        self._by_digest = current
+        return ModelChanges(added, removed, changed)
+
+    def clear(self):
+        """Forget every model."""
+        self._by_digest = {}
@@ -0,0 +1,1362 @@
+"""
+Backend-agnostic polling core for Ollama Monitor.
+
+Holds settings, the HTTP client and the poll loop. It has no GUI or
+Windows-only dependencies, so it runs both behind the tray icon and as a
+headless daemon on servers.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import socket
+import sys
+import threading
+import time
+from datetime import datetime
+from logging.handlers import QueueListener, RotatingFileHandler
+from typing import Optional
+from urllib.parse import urlparse
+
+from __version__ import __version__
+from log_queue import DedupQueueHandler
+from models import ModelSet, STATUS_NO_MODEL, describe_models
+from notifications import Hysteresis, NotificationPipeline
+from scheduler import PollScheduler
+from timeseries import SampleRing
+
+STATUS_NOT_RUNNING = "Ollama Not Running"
+
+# Settings baked into the HTTP client; changing them needs a new client
+TRANSPORT_SETTINGS = (
+    'connect_timeout', 'read_timeout', 'http_max_connections',
+    'http_max_keepalive', 'http_keepalive_expiry'
+)
+
+_log_listener: Optional[QueueListener] = None
+
+
+def is_local_url(url: str) -> bool:
+    """
+    Check whether a URL points at this machine.
+
+    Args:
+        url: Server URL
+
+    Returns:
+        True for loopback addresses and this machine's host name
+    """
+    host = (urlparse(url).hostname or '').lower()
+    return host in ('localhost', '127.0.0.1', '::1', '0.0.0.0') or (
+        host == socket.gethostname().lower()
+    )
+
+
+def data_dir() -> str:
+    """
+    Get the platform-appropriate directory for settings.
+
+    ``OLLAMA_MONITOR_HOME`` overrides the default location.
+
+    Returns:
+        Absolute directory path
+    """
+    override = os.getenv('OLLAMA_MONITOR_HOME')
+    if override:
+        return override
+    home = os.path.expanduser('~')
+    if sys.platform == 'win32':
+        return os.path.join(os.getenv('APPDATA') or home, 'OllamaMonitor')
+    if sys.platform == 'darwin':
+        return os.path.join(home, 'Library', 'Application Support', 'OllamaMonitor')
+    return os.path.join(
+        os.getenv('XDG_CONFIG_HOME') or os.path.join(home, '.config'),
+        'ollama-monitor'
+    )
+
+
+def history_path() -> str:
+    """
+    Get the location of the history database.
+
+    Returns:
+        Absolute file path
+    """
+    return os.path.join(data_dir(), 'history.sqlite3')
+
+
+def inventory_path() -> str:
+    """
+    Get the location of the cached model inventory.
+
+    Returns:
+        Absolute file path
+    """
+    return os.path.join(data_dir(), 'inventory.json')
+
+
+def perf_path() -> str:
+    """
+    Get the location of the monitor's own performance statistics.
+
+    Returns:
+        Absolute file path
+    """
+    return os.path.join(data_dir(), 'perf.json')
+
+
+def log_dir() -> str:
+    """
+    Get the platform-appropriate directory for log files.
+
+    Returns:
+        Absolute directory path
+    """
+    if os.getenv('OLLAMA_MONITOR_HOME') or sys.platform == 'win32':
+        return os.path.join(data_dir(), 'logs')
+    home = os.path.expanduser('~')
+    if sys.platform == 'darwin':
+        return os.path.join(home, 'Library', 'Logs', 'OllamaMonitor')
+    return os.path.join(
+        os.getenv('XDG_STATE_HOME') or os.path.join(home, '.local', 'state'),
+        'ollama-monitor',
+        'logs'
+    )
+
+
+def setup_logging(console: bool = True) -> logging.Logger:
+    """
+    Setup logging configuration.
+
+    The logger only queues records; a background listener writes them to
+    the log file and the console. Calling this again returns the logger
+    that is already set up.
+
+    Args:
+        console: Also write log records to stderr
+
+    Returns:
+        The application logger
+    """
+    global _log_listener
+
+    logger = logging.getLogger('OllamaMonitor')
+    if _log_listener is not None:
+        return logger
+
+    logs = log_dir()
+    os.makedirs(logs, exist_ok=True)
+
+    # Log file with date
+    log_file = os.path.join(
+        logs,
+        f'ollama_monitor_{datetime.now().strftime("%Y%m%d")}.log'
+    )
+
+    # Create rotating file handler (max 5MB per file, keep 5 backup files)
+    file_handler = RotatingFileHandler(
+        log_file,
+        maxBytes=5*1024*1024,  # 5MB
+        backupCount=5,
+        encoding='utf-8'
+    )
+    file_handler.setFormatter(logging.Formatter(
+        '%(asctime)s [%(levelname)s] %(message)s'
+    ))
+    handlers = [file_handler]
+
+    if console:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(logging.Formatter(
+            '[%(levelname)s] %(message)s'
+        ))
+        handlers.append(console_handler)
+
+    # Writes happen on the listener thread, never on the poll loop
+    log_queue = queue.SimpleQueue()
+    _log_listener = QueueListener(log_queue, *handlers)
+    _log_listener.start()
+    atexit.register(shutdown_logging)
+
+    logger.setLevel(logging.INFO)
+    logger.addHandler(DedupQueueHandler(log_queue))
+
+    return logger
+
+
+def shutdown_logging():
+    """Write out pending repeat summaries and queued records, then close the log."""
+    global _log_listener
+
+    if _log_listener is None:
+        return
+    logger = logging.getLogger('OllamaMonitor')
+    for handler in list(logger.handlers):
+        if isinstance(handler, DedupQueueHandler):
+            handler.flush_repeats()
+            logger.removeHandler(handler)
+    _log_listener.stop()
+    for handler in _log_listener.handlers:
+        handler.close()
+    _log_listener = None
+
+
+class MonitorCore:
+    """
+    Polling and state logic shared by every Ollama Monitor front end.
+
+    httpx and the fleet poller are imported when the HTTP client is first
+    created, which happens on the poll thread, so front ends can show
+    themselves before paying for those imports.
+    """
+
+    DEFAULT_API_HOST = "localhost"
+    DEFAULT_API_PORT = "11434"
+
+    def __init__(self, started_at: Optional[float] = None):
+        """
+        Load settings; the HTTP client is created when polling starts.
+
+        Args:
+            started_at: ``time.perf_counter()`` value at launch, used to
+                report start-up timings
+        """
+        self.started_at = time.perf_counter() if started_at is None else started_at
+        # Setup logging
+        self.logger = setup_logging()
+        self.logger.info(f"Starting Ollama Monitor v{__version__}")
+
+        self.current_model = "Waiting..."
+        self.overall_status = "Waiting..."
+        self.should_run = True
+        self._wake = threading.Event()
+        self.last_status = None
+        self.client = None
+        self.fleet = None
+        # Replaced clients and fleet pollers, closed by the poll thread
+        self._retired = []
+        self._client_lock = threading.Lock()
+        self.fleet_status = "Waiting..."
+        self.host_statuses = []
+        self.running_models = []
+        self.loaded_models = ModelSet()
+        self.last_latency = None
+        self.last_status_code = 0
+        self.last_error = None
+        self.last_timings = None
+        self.connections_opened = 0
+        self.exporter = None
+        self.proxy = None
+        self.process_sampler = None
+        self.host_sample = None
+        self.history = None
+        self.warmer = None
+        self.preloader = None
+        self.alerts = None
+        self.inventory = None
+        self.broker = None
+        self.subscription = None
+        from profiling import PerfStats
+        self.perf = PerfStats()
+        self.profiler = None
+        self._perf_written = time.monotonic()
+        self._sampled_models = set()
+
+        # Load settings
+        self.settings_file = os.path.join(data_dir(), 'settings.json')
+        os.makedirs(os.path.dirname(self.settings_file), exist_ok=True)
+        self.load_settings()
+        self.scheduler = PollScheduler(**self.schedule_settings)
+        self.hysteresis = Hysteresis(self.settings.get('notify_hold_polls', 2))
+        self.notifier = NotificationPipeline(
+            self.show_notification,
+            debounce=self.settings.get('notify_debounce', 2.0),
+            max_per_minute=self.settings.get('notify_max_per_minute', 4),
+            logger=self.logger
+        )
+        self.samples = SampleRing(self.settings.get('history_samples', 7200))
+
+    def _init_http_client(self):
+        """
+        Initialize HTTP client with current settings.
+
+        May run on another thread than the poll loop, e.g. from the
+        settings window: the new client and fleet poller are built first
+        and swapped in together, and the poll thread closes the old ones
+        once it no longer uses them.
+        """
+        import httpx
+        from transport import client_options
+
+        try:
+            # Parse URL for authentication
+            url = self.api_url
+            parsed_url = urlparse(url)
+
+            self.logger.info(f"Initializing HTTP client with URL: {url}")
+
+            # Setup client config: keep-alive pool and separate timeouts
+            client_config = client_options(self.settings)
+
+            # If URL contains authentication, set it up in client
+            if parsed_url.username and parsed_url.password:
+                auth = (parsed_url.username, parsed_url.password)
+                client_config['auth'] = auth
+                self.logger.info("Using URL authentication")
+
+            # Create client with config
+            client = httpx.Client(**client_config)
+            fleet = None
+            if self.endpoints:
+                from fleet import FleetPoller
+                fleet_config = client_options(self.settings)
+                fleet = FleetPoller(
+                    self.endpoints,
+                    fleet_config,
+                    max_workers=self.settings.get('fleet_workers'),
+                    timeout=max(
+                        fleet_config['timeout'].connect, fleet_config['timeout'].read
+                    ),
+                    schedule=self.schedule_settings
+                )
+                self.logger.info(
+                    f"Fleet mode enabled for {len(self.endpoints)} endpoints"
+                )
+            with self._client_lock:
+                self._retired.extend(r for r in (self.client, self.fleet) if r is not None)
+                self.client, self.fleet = client, fleet
+                self._client_key = self.client_key()
+            self.logger.info("HTTP client initialized successfully")
+
+        except Exception as e:
+            self.logger.error(f"Error initializing HTTP client: {str(e)}")
+            raise
+
+    def load_settings(self):
+        """Load application settings from JSON file."""
+        try:
+            if os.path.exists(self.settings_file):
+                with open(self.settings_file, 'r') as f:
+                    self.settings = json.load(f)
+                    self.logger.info("Settings loaded successfully")
+
+                    # Convert old settings format if needed
+                    if 'api_host' in self.settings and 'api_port' in self.settings:
+                        host = self.settings.pop('api_host')
+                        port = self.settings.pop('api_port')
+                        self.settings['api_url'] = f'http://{host}:{port}'
+                        self.save_settings()
+                        self.logger.info("Converted old settings format to new URL format")
+            else:
+                # Default settings
+                self.settings = {
+                    'startup': False,
+                    'api_url': f'http://{self.DEFAULT_API_HOST}:{self.DEFAULT_API_PORT}'
+                }
+                # Save default settings
+                self.save_settings()
+                self.logger.info("Created default settings")
+        except Exception as e:
+            self.logger.error(f"Error loading settings: {str(e)}")
+            self.settings = {
+                'startup': False,
+                'api_url': f'http://{self.DEFAULT_API_HOST}:{self.DEFAULT_API_PORT}'
+            }
+
+    def save_settings(self):
+        """Save application settings to JSON file."""
+        try:
+            with open(self.settings_file, 'w') as f:
+                json.dump(self.settings, f, indent=4)
+            self.logger.info("Settings saved successfully")
+        except Exception as e:
+            self.logger.error(f"Error saving settings: {str(e)}")
+
+    def client_key(self) -> tuple:
+        """Settings that require a new HTTP client when they change."""
+        parsed_url = urlparse(self.api_url)
+        transport = tuple(
+            (key, repr(self.settings.get(key))) for key in TRANSPORT_SETTINGS
+        )
+        return (parsed_url.username, parsed_url.password, transport)
+
+    def reconnect(self):
+        """
+        Apply changed API settings.
+
+        The client sends absolute URLs, so a new server address reuses the
+        existing pool. The client is only rebuilt when credentials or
+        transport settings changed.
+        """
+        if (
+            self.client is None or self.endpoints or self.fleet
+            or self.client_key() != self._client_key
+        ):
+            self._init_http_client()
+        else:
+            self.logger.info(f"API URL changed to {self.api_url}")
+        if self.fleet:
+            self.stop_single_host()
+        else:
+            self.start_warmer()
+            self.start_preloader()
+            self.start_inventory()
+        self.start_process_sampler()
+        self.scheduler.reset()
+        self._wake.set()
+
+    def stop_single_host(self):
+        """
+        Stop the features that only work against the single API URL.
+
+        Used when the monitor switches to a fleet. The warmer, preloader
+        and inventory are retired like a replaced client, so the poll
+        thread closes them once it no longer uses them. The broker stops
+        publishing and a followed broker is left, so the fleet is polled;
+        the broker is only joined again on the next start.
+        """
+        with self._client_lock:
+            self._retired.extend(
+                r for r in (self.warmer, self.preloader, self.inventory) if r is not None
+            )
+            self.warmer = self.preloader = self.inventory = None
+        broker, self.broker = self.broker, None
+        if broker:
+            broker.stop()
+        subscription = self.subscription
+        if subscription:
+            subscription.close()
+        self.loaded_models = ModelSet()
+
+    def add_endpoints(self, urls: list) -> int:
+        """
+        Monitor more servers, e.g. ones found by discovery.
+
+        The configured server stays monitored: the first added endpoint
+        turns the single server into a fleet of it and the new ones. Call
+        :meth:`reconnect` to start polling them.
+
+        Args:
+            urls: Base URLs of the servers
+
+        Returns:
+            Number of servers that were not monitored yet
+        """
+        endpoints = list(self.endpoints) or [self.api_url]
+        known = {url.rstrip('/') for url in endpoints}
+        added = [url for url in dict.fromkeys(u.rstrip('/') for u in urls) if url not in known]
+        if added:
+            self.settings['endpoints'] = endpoints + added
+            self.save_settings()
+        return len(added)
+
+    def notify(self, message: str, key=None):
+        """
+        Report a status transition to the user.
+
+        The message is logged and queued on the notification pipeline,
+        which shows it later from its own thread.
+
+        Args:
+            message: Notification text
+            key: Pending messages with the same key replace each other
+        """
+        self.logger.info(f"Notification: {message}")
+        self.notifier.submit(message, key)
+
+    def show_notification(self, message: str):
+        """
+        Display a notification. Front ends override this.
+
+        Args:
+            message: Notification text, possibly a summary of several
+        """
+
+    def render(self):
+        """Show the latest poll result. Front ends override this."""
+
+    def log_startup_time(self, milestone: str):
+        """
+        Log how long after launch a start-up milestone was reached.
+
+        Args:
+            milestone: Name of the milestone
+        """
+        elapsed = (time.perf_counter() - self.started_at) * 1000
+        self.logger.info(f"Startup: {milestone} after {elapsed:.0f} ms")
+
+    def get_running_models(self) -> str:
+        """
+        Get information about running Ollama models.
+
+        Returns:
+            Status message about running models
+        """
+        import httpx
+        from transport import PollTimings, classify_error
+
+        self.running_models = []
+        self.last_latency = None
+        self.last_status_code = 0
+        self.last_error = None
+        timings = PollTimings()
+        try:
+            response = self.client.get(
+                f'{self.api_url}/api/ps',
+                extensions={'trace': timings.trace}
+            )
+            self.last_timings = timings.finish()
+            self.last_latency = timings.total
+            self.perf.record('request', timings.total)
+            self.last_status_code = response.status_code
+            if not timings.reused:
+                self.connections_opened += 1
+                self.logger.info(f"Opened new connection: {timings.summary()}")
+            else:
+                self.logger.debug(f"Poll timings: {timings.summary()}")
+
+            if response.status_code == 200:
+                decode_started = time.perf_counter()
+                data = response.json()
+                self.perf.record('decode', time.perf_counter() - decode_started)
+                running_models = data.get('models', [])
+                self.running_models = running_models
+                self.handle_model_changes(self.loaded_models.update(running_models))
+
+                status = describe_models(running_models)
+                self.last_status = status
+                return status
+
+            self.logger.warning(f"API returned status code: {response.status_code}")
+            self.last_error = f"HTTP {response.status_code}"
+            return STATUS_NOT_RUNNING
+
+        except httpx.TimeoutException as e:
+            self.last_error = classify_error(e)
+            self.logger.error(f"API request timed out: {self.last_error}")
+            return STATUS_NOT_RUNNING
+
+        except httpx.ConnectError as e:
+            self.last_error = classify_error(e)
+            self.logger.error(f"Connection error ({self.last_error}): {str(e)}")
+            self.last_status = STATUS_NOT_RUNNING
+            return STATUS_NOT_RUNNING
+
+        except Exception as e:
+            self.last_error = classify_error(e)
+            self.logger.error(f"Unexpected error in get_running_models: {str(e)}")
+            return STATUS_NOT_RUNNING
+
+    def handle_model_changes(self, changes):
+        """
+        Log and announce models loaded or unloaded since the last poll.
+
+        Args:
+            changes: ModelChanges from the loaded-model set
+        """
+        for model in changes.added:
+            self.logger.info(f"Model loaded: {model.describe()}")
+            self.notify(model.describe(), key=model.digest)
+        for model in changes.removed:
+            self.logger.info(f"Model unloaded: {model.describe()}")
+            if self.loaded_models:
+                self.notify(f"Model Stopped: {model.name}", key=model.digest)
+        for model in changes.changed:
+            self.logger.debug(f"Model updated: {model.describe()}")
+
+    def announce_status(self, status: str):
+        """
+        Notify when the server stopped or unloaded its last model.
+
+        A status has to hold for ``notify_hold_polls`` polls before it is
+        announced, so a flapping connection does not flood the user.
+
+        Args:
+            status: Status text of the latest poll
+        """
+        if status not in (STATUS_NOT_RUNNING, STATUS_NO_MODEL):
+            # Loaded models are announced one by one as they appear
+            status = 'running'
+        if not self.hysteresis.update('status', status):
+            return
+        if status == STATUS_NOT_RUNNING:
+            self.notify("Ollama Service Stopped", key='status')
+        elif status == STATUS_NO_MODEL:
+            self.logger.info("No model running")
+            self.notify("Model Stopped", key='status')
+
+    def poll_fleet(self, fleet) -> str:
+        """
+        Poll every configured endpoint and notify about host transitions.
+
+        A host's new status is announced once it held for
+        ``notify_hold_polls`` of that host's polls.
+
+        Args:
+            fleet: FleetPoller to poll, read once per cycle since the
+                settings window may replace it meanwhile
+
+        Returns:
+            Summary text for the whole fleet
+        """
+        previous = {s.url: s.checked_at for s in self.host_statuses}
+        self.host_statuses = fleet.poll()
+
+        for host in self.host_statuses:
+            # Hosts that were not due this cycle report their old result
+            if not host.checked_at or host.checked_at == previous.get(host.url):
+                continue
+            if not self.hysteresis.update(host.url, host.status):
+                continue
+            self.logger.info(f"{host.label} status changed: {host.status}")
+            if host.status == STATUS_NOT_RUNNING:
+                message = "Ollama Service Stopped"
+            elif host.status == STATUS_NO_MODEL:
+                message = "Model Stopped"
+            else:
+                message = host.status
+            self.notify(f"{host.label}: {message}", key=host.url)
+
+        self.running_models = [
+            model for host in self.host_statuses if host.up for model in host.models
+        ]
+        # Fleet samples describe the slowest host and the whole fleet's models
+        latencies = [h.latency for h in self.host_statuses if h.up and h.latency]
+        self.last_latency = max(latencies) if latencies else None
+        self.last_status_code = 200 if latencies else 0
+        self.fleet_status, summary = fleet.summarize(self.host_statuses)
+        return summary
+
+    def poll(self):
+        """Poll the configured server or fleet once and update the state."""
+        started = time.perf_counter()
+        cpu_started = time.thread_time()
+        self.close_retired()
+        fleet = self.fleet
+        if fleet:
+            self.current_model = self.poll_fleet(fleet)
+            self.overall_status = self.fleet_status
+        else:
+            self.current_model = self.get_running_models()
+            self.overall_status = self.current_model
+            self.announce_status(self.current_model)
+        sampler = self.process_sampler
+        if sampler:
+            self.sample_processes(sampler)
+        # The single-host features are stopped in fleet mode; a switch may
+        # still be under way, and a fleet's status code is not the server's
+        if not fleet and self.last_status_code == 200:
+            warmer = self.warmer
+            if warmer:
+                warmer.check(self.client, self.api_url, self.loaded_models.models)
+            preloader = self.preloader
+            if preloader:
+                preloader.check(self.client, self.api_url, self.loaded_models.models)
+            inventory = self.inventory
+            if inventory:
+                inventory.check(self.client, self.api_url, self.loaded_models.models)
+        self.store_state()
+        alerts = self.alerts
+        if alerts:
+            alerts.evaluate(self.host_snapshots(), self.host_sample)
+        broker = self.broker
+        if broker:
+            broker.publish(self.broker_state())
+        perf = self.perf
+        perf.record('poll', time.perf_counter() - started)
+        perf.record('poll_cpu', time.thread_time() - cpu_started)
+        perf.count('polls')
+        if self.last_error:
+            perf.count('errors')
+        if time.monotonic() - self._perf_written >= self.settings.get('perf_write_interval', 60.0):
+            self.write_perf()
+
+    def close_retired(self):
+        """Close clients and fleet pollers replaced since the last poll."""
+        with self._client_lock:
+            retired, self._retired = self._retired, []
+        for resource in retired:
+            resource.close()
+
+    def store_state(self):
+        """
+        Add the current state to the samples, the metrics and the history.
+
+        A monitor following the broker leaves the history to the broker:
+        both share one database, whose rollups add up what each records.
+        """
+        self.record_sample()
+        exporter = self.exporter
+        history = self.history if self.subscription is None else None
+        if exporter or history:
+            snapshots = self.host_snapshots()
+            if exporter:
+                exporter.update(snapshots, self.host_sample)
+            if history:
+                history.record(time.time(), snapshots)
+
+    def broker_state(self) -> dict:
+        """State of the monitored server as published to subscribers."""
+        return {
+            'api_url': self.api_url,
+            'status_code': self.last_status_code,
+            'error': self.last_error,
+            'latency': self.last_latency,
+            'models': self.running_models
+        }
+
+    def apply_broker_state(self, state: dict):
+        """
+        Take over a state pushed by the broker instead of polling.
+
+        Args:
+            state: Message from :meth:`broker_state` of the polling monitor
+        """
+        self.running_models = state.get('models', [])
+        self.last_status_code = state.get('status_code', 0)
+        self.last_error = state.get('error')
+        self.last_latency = state.get('latency')
+        if self.last_status_code == 200:
+            self.handle_model_changes(self.loaded_models.update(self.running_models))
+            status = describe_models(self.running_models)
+        else:
+            status = STATUS_NOT_RUNNING
+        self.last_status = status
+        self.current_model = self.overall_status = status
+        self.announce_status(status)
+
+    def join_broker(self):
+        """
+        Subscribe to a running status broker, or become the broker.
+
+        Only used with the ``broker`` setting and a single API URL. When
+        another monitor already polls the same server, this one follows
+        its pushed states; otherwise it binds the broker port itself.
+
+        Returns:
+            Subscription to follow, None if this monitor polls
+        """
+        if not self.settings.get('broker', False) or self.fleet or self.broker:
+            return None
+        from broker import DEFAULT_PORT, StatusBroker, subscribe
+        port = self.settings.get('broker_port', DEFAULT_PORT)
+        # A second attempt covers another monitor binding the port meanwhile
+        for _ in range(2):
+            subscription = subscribe('127.0.0.1', port, self.api_url)
+            if subscription:
+                self.logger.info(f"Following the status broker on port {port}")
+                return subscription
+            try:
+                broker = StatusBroker('127.0.0.1', port, logger=self.logger)
+            except OSError:
+                continue
+            broker.start()
+            self.broker = broker
+            self.logger.info(f"Publishing status to subscribers on port {port}")
+            return None
+        self.logger.warning(
+            f"Port {port} is taken by a broker for another server, polling directly"
+        )
+        return None
+
+    def follow_broker(self, subscription):
+        """
+        Render states pushed by the broker until it goes away or we stop.
+
+        The broker only pushes changes, so the current state is also
+        recorded every ``poll_interval`` in between: the samples, the
+        metrics and the alert rules see a steady state as the same run of
+        samples as a polling monitor does. The history is written by the
+        broker alone.
+
+        Args:
+            subscription: Subscription from :meth:`join_broker`
+        """
+        states = queue.Queue()
+
+        def receive():
+            try:
+                for state in subscription:
+                    states.put(state)
+            except (OSError, ValueError) as e:
+                states.put(e)
+            finally:
+                states.put(None)
+
+        threading.Thread(target=receive, name='broker-follow', daemon=True).start()
+        self.subscription = subscription
+        interval = self.settings.get('poll_interval', 1.0)
+        try:
+            self.apply_broker_state(subscription.state)
+            self.record_followed()
+            self.render()
+            while self.should_run:
+                try:
+                    state = states.get(timeout=interval)
+                except queue.Empty:
+                    self.record_followed()
+                    continue
+                if isinstance(state, Exception):
+                    raise state
+                if state is None or state.get('api_url') != self.api_url:
+                    break
+                self.apply_broker_state(state)
+                self.record_followed()
+                self.render()
+        except (OSError, ValueError) as e:
+            self.logger.error(f"Status broker connection failed: {str(e)}")
+        finally:
+            self.subscription = None
+            subscription.close()
+        if self.should_run:
+            self.logger.warning("Stopped following the status broker")
+
+    def record_followed(self):
+        """Store the followed state and evaluate the alert rules, as a poll does."""
+        self.store_state()
+        alerts = self.alerts
+        if alerts:
+            alerts.evaluate(self.host_snapshots(), self.host_sample)
+
+    def host_snapshots(self) -> list:
+        """
+        Describe every monitored endpoint after the last poll.
+
+        Returns:
+            List of (endpoint, up, latency, models) tuples
+        """
+        if self.fleet:
+            return [
+                (h.url, h.up, h.latency if h.up else None, h.models if h.up else [])
+                for h in self.host_statuses
+            ]
+        up = self.last_status_code == 200
+        return [(self.api_url, up, self.last_latency, self.running_models)]
+
+    def start_exporter(self):
+        """Start the metrics listener if ``metrics_port`` is configured."""
+        port = self.settings.get('metrics_port')
+        if port is None or self.exporter is not None:
+            return
+        from metrics_exporter import MetricsExporter
+        try:
+            self.exporter = MetricsExporter(
+                self.settings.get('metrics_host', '127.0.0.1'), int(port)
+            )
+        except OSError as e:
+            self.logger.error(f"Could not start metrics exporter: {str(e)}")
+            return
+        self.exporter.start()
+        host, port = self.exporter.address
+        self.logger.info(f"Serving metrics on http://{host}:{port}/metrics")
+
+    def start_proxy(self):
+        """Start the metering proxy if ``proxy_port`` is configured."""
+        port = self.settings.get('proxy_port')
+        if port is None or self.proxy is not None:
+            return
+        from proxy import MeteringProxy
+        from transport import client_options
+
+        options = client_options(self.settings)
+        try:
+            self.proxy = MeteringProxy(
+                lambda: self.api_url,
+                self.settings.get('proxy_host', '127.0.0.1'),
+                int(port),
+                max_connections=self.settings.get('proxy_max_connections', 32),
+                connect_timeout=options['timeout'].connect,
+                keepalive_expiry=options['limits'].keepalive_expiry,
+                logger=self.logger
+            )
+        except OSError as e:
+            self.logger.error(f"Could not start metering proxy: {str(e)}")
+            return
+        self.proxy.start()
+        host, port = self.proxy.address
+        self.logger.info(f"Metering proxy for {self.api_url} on http://{host}:{port}")
+
+    def start_history(self):
+        """Open the on-disk history unless ``history`` is turned off."""
+        if self.history is not None or not self.settings.get('history', True):
+            return
+        import sqlite3
+        from history import HistoryStore
+
+        try:
+            self.history = HistoryStore(
+                history_path(),
+                flush_interval=self.settings.get('history_flush_interval', 30.0),
+                raw_days=self.settings.get('history_raw_days', 2),
+                minute_days=self.settings.get('history_minute_days', 14),
+                retention_days=self.settings.get('history_retention_days', 365),
+                logger=self.logger
+            )
+        except sqlite3.Error as e:
+            self.logger.error(f"Could not open history: {str(e)}")
+
+    def start_alerts(self):
+        """Evaluate the configured ``alert_rules``, if any."""
+        rules = self.settings.get('alert_rules', [])
+        if self.alerts is not None or not rules:
+            return
+        from alerts import AlertEngine
+        self.alerts = AlertEngine(rules, self.notify, logger=self.logger)
+        self.logger.info(f"Evaluating {len(self.alerts.rules)} alert rules")
+
+    def start_warmer(self):
+        """Keep ``pinned_models`` loaded, if any are configured."""
+        pinned = self.settings.get('pinned_models', [])
+        if self.warmer is not None or not pinned or self.fleet:
+            return
+        from warmer import KeepAliveWarmer
+        budget = self.settings.get('warm_vram_budget_gb')
+        self.warmer = KeepAliveWarmer(
+            pinned,
+            lead_time=self.settings.get('warm_lead_time', 60.0),
+            keep_alive=self.settings.get('warm_keep_alive', '10m'),
+            vram_budget=None if budget is None else int(budget * 1024 ** 3),
+            logger=self.logger
+        )
+        self.logger.info(f"Keeping pinned models loaded: {', '.join(pinned)}")
+
+    def start_preloader(self):
+        """Preload models before the hours they are usually needed, if enabled."""
+        if (
+            self.preloader is not None
+            or not self.settings.get('preload', False)
+            or self.fleet
+        ):
+            return
+        from preloader import WEEK, Preloader
+        budget = self.settings.get('preload_vram_budget_gb')
+        weeks = self.settings.get('preload_weeks', 8)
+        self.preloader = Preloader(
+            lead_time=self.settings.get('preload_lead_time', 120.0),
+            threshold=self.settings.get('preload_threshold', 0.5),
+            vram_budget=None if budget is None else int(budget * 1024 ** 3),
+            dry_run=self.settings.get('preload_dry_run', False),
+            weeks=weeks,
+            logger=self.logger,
+            record_event=self._record_history_event
+        )
+        history = self.history
+        if history:
+            import sqlite3
+            since = time.time() - weeks * WEEK
+            try:
+                self.preloader.seed(
+                    history.transitions(since, self.api_url),
+                    history.active_hours(since, self.api_url)
+                )
+            except sqlite3.Error as e:
+                self.logger.error(f"Could not read usage history: {str(e)}")
+        mode = " (dry run)" if self.preloader.dry_run else ""
+        self.logger.info(f"Predictive preloading enabled{mode}")
+
+    def start_inventory(self):
+        """Load the cached inventory of installed models unless turned off."""
+        if (
+            self.inventory is not None
+            or not self.settings.get('inventory', True)
+            or self.fleet
+        ):
+            return
+        from inventory import ModelInventory
+        self.inventory = ModelInventory(
+            inventory_path(),
+            self.api_url,
+            refresh_interval=self.settings.get('inventory_refresh_interval', 3600.0),
+            logger=self.logger
+        )
+
+    def refresh_inventory(self) -> bool:
+        """
+        Refresh the installed models in the background.
+
+        Returns:
+            False if there is no inventory, no HTTP client yet or a refresh
+            is already running
+        """
+        inventory = self.inventory
+        if inventory is None or self.client is None:
+            return False
+        return inventory.refresh_async(self.client, self.api_url)
+
+    def set_model_loaded(self, name: str, loaded: bool):
+        """
+        Load or unload a model in the background, then poll again.
+
+        Args:
+            name: Model name
+            loaded: True to load the model, False to unload it
+        """
+        threading.Thread(
+            target=self._set_model_loaded, args=(name, loaded),
+            name='model-action', daemon=True
+        ).start()
+
+    def _set_model_loaded(self, name: str, loaded: bool):
+        """Body of the load/unload thread."""
+        import httpx
+
+        action = "load" if loaded else "unload"
+        payload = {'model': name, 'stream': False}
+        if not loaded:
+            payload['keep_alive'] = 0
+        try:
+            response = self.client.post(
+                f'{self.api_url}/api/generate', json=payload,
+                timeout=httpx.Timeout(300.0, connect=10.0)
+            )
+            if response.status_code == 200:
+                self.logger.info(f"Requested {action} of {name}")
+            else:
+                self.logger.warning(f"Could not {action} {name}: HTTP {response.status_code}")
+                self.notify(f"Could not {action} {name}: HTTP {response.status_code}")
+        except httpx.HTTPError as e:
+            self.logger.warning(f"Could not {action} {name}: {str(e)}")
+            self.notify(f"Could not {action} {name}: {str(e)}")
+        self._wake.set()
+
+    def perf_counters(self) -> dict:
+        """Counters kept outside the performance statistics."""
+        return {
+            'notifications': self.notifier.shown,
+            'notifications_merged': self.notifier.merged
+        }
+
+    def perf_snapshot(self) -> dict:
+        """The monitor's own performance statistics, see ``profiling``."""
+        return self.perf.snapshot(
+            self.perf_counters(), self.settings.get('cpu_budget_percent', 1.0)
+        )
+
+    def write_perf(self):
+        """Write the performance statistics for ``ollama_monitor.py perf``."""
+        self._perf_written = time.monotonic()
+        if not self.perf.counters['polls']:
+            # Leave the file of the monitor that actually polls alone
+            return
+        path = perf_path()
+        try:
+            with open(f'{path}.tmp', 'w', encoding='utf-8') as f:
+                json.dump(self.perf_snapshot(), f)
+            os.replace(f'{path}.tmp', path)
+        except OSError as e:
+            self.logger.error(f"Could not write performance statistics: {str(e)}")
+
+    def start_profiler(self) -> bool:
+        """
+        Start sampling the stacks of all threads.
+
+        Returns:
+            False if the profiler is already running
+        """
+        if self.profiler is not None:
+            return False
+        from profiling import SamplingProfiler
+        self.profiler = SamplingProfiler(self.settings.get('profiler_interval', 0.01))
+        self.profiler.start()
+        self.logger.info("Sampling profiler started")
+        return True
+
+    def stop_profiler(self) -> Optional[str]:
+        """
+        Stop the sampling profiler and write its collapsed stacks.
+
+        Returns:
+            Path of the written file, None if the profiler was not running
+            or the file could not be written
+        """
+        profiler, self.profiler = self.profiler, None
+        if profiler is None:
+            return None
+        profiler.stop()
+        os.makedirs(log_dir(), exist_ok=True)
+        path = os.path.join(
+            log_dir(), f"profile-{datetime.now().strftime('%Y%m%d-%H%M%S')}.folded"
+        )
+        try:
+            samples = profiler.write(path)
+        except OSError as e:
+            self.logger.error(f"Could not write profile: {str(e)}")
+            return None
+        self.logger.info(f"Wrote {samples} profile samples to {path}")
+        return path
+
+    def _record_history_event(self, timestamp: float, event: str, model: str):
+        """Add an event of the monitored server to the history, if kept."""
+        history = self.history
+        if history:
+            history.record_event(timestamp, self.api_url, event, model)
+
+    def start_process_sampler(self):
+        """Sample the Ollama processes if the server runs on this machine."""
+        self.host_sample = None
+        if (
+            self.fleet
+            or not self.settings.get('process_sampling', True)
+            or not is_local_url(self.api_url)
+        ):
+            self.process_sampler = None
+            return
+        try:
+            from process_sampler import ProcessSampler
+        except ImportError:
+            self.logger.info("psutil is not installed; Ollama processes are not sampled")
+            self.process_sampler = None
+            return
+        self.process_sampler = ProcessSampler()
+
+    def sample_processes(self, sampler):
+        """
+        Read the Ollama processes and log which runner serves each model.
+
+        Args:
+            sampler: ProcessSampler to read with
+        """
+        sample = sampler.sample(self.loaded_models.models)
+        self.host_sample = sample
+        loaded = {model.name: model for model in self.loaded_models.models}
+        self._sampled_models &= set(loaded)
+        for process in sample.processes:
+            model = loaded.get(process.model)
+            if model is None or model.name in self._sampled_models:
+                continue
+            self._sampled_models.add(model.name)
+            self.logger.info(
+                f"{model.name} runs in pid {process.pid}: "
+                f"{process.rss / 1024 ** 3:.1f} GB RAM, {model.processor()}, "
+                f"host memory {sample.memory_percent:.0f}% used"
+            )
+
+    def record_sample(self):
+        """Append the result of the last poll to the sample history."""
+        models = self.running_models
+        host = self.host_sample if self.process_sampler else None
+        self.samples.append(
+            time.time(),
+            self.last_latency,
+            len(models),
+            int(sum(m.get('size', 0) for m in models)),
+            int(sum(m.get('size_vram', 0) for m in models)),
+            self.last_status_code,
+            host.cpu_percent if host else None,
+            host.rss if host else 0
+        )
+
+    def run_benchmark(self, model: Optional[str] = None,
+                      concurrency: Optional[list] = None,
+                      prompts: Optional[list] = None,
+                      api: Optional[str] = None,
+                      rounds: int = 1,
+                      num_predict: Optional[int] = None) -> list:
+        """
+        Measure inference throughput of the configured server.
+
+        Arguments left as None come from the ``benchmark_*`` settings. The
+        model defaults to the first one loaded at the last poll. Requests
+        go through the monitor's client unless more parallel requests are
+        asked for than its pool allows, in which case a client with the
+        same options and a large enough pool is used for the run.
+
+        Args:
+            model: Model to benchmark
+            concurrency: Parallel request counts, one run each
+            prompts: Prompt set
+            api: ``'generate'`` or ``'chat'``
+            rounds: Passes over the prompt set per run
+            num_predict: Maximum tokens to generate per request
+
+        Returns:
+            List of BenchmarkReport, one per concurrency level
+        """
+        import httpx
+        from throughput import run_benchmark
+        from transport import client_options
+
+        if self.client is None:
+            self._init_http_client()
+        model = model or self.settings.get('benchmark_model')
+        if not model:
+            # Read what the poll loop found instead of polling from this thread
+            loaded = [m.name for m in self.loaded_models.models]
+            if not loaded and not self.perf.counters['polls']:
+                # Nothing polled yet, e.g. from the command line
+                try:
+                    response = self.client.get(f'{self.api_url}/api/ps')
+                    if response.status_code == 200:
+                        loaded = [m['name'] for m in response.json().get('models', [])]
+                except (httpx.HTTPError, ValueError, KeyError):
+                    pass
+            if not loaded:
+                raise ValueError("No model loaded; choose one to benchmark")
+            model = loaded[0]
+        if concurrency is None:
+            concurrency = self.settings.get('benchmark_concurrency', [1])
+        if isinstance(concurrency, int):
+            concurrency = [concurrency]
+        prompts = prompts or self.settings.get('benchmark_prompts')
+        api = api or self.settings.get('benchmark_api', 'generate')
+        num_predict = num_predict or self.settings.get('benchmark_num_predict', 128)
+
+        options = client_options(self.settings)
+        widest = max(concurrency)
+        client = self.client
+        if widest > options['limits'].max_connections:
+            options['limits'] = httpx.Limits(
+                max_connections=widest, max_keepalive_connections=widest
+            )
+            parsed_url = urlparse(self.api_url)
+            if parsed_url.username and parsed_url.password:
+                options['auth'] = (parsed_url.username, parsed_url.password)
+            client = httpx.Client(**options)
+
+        reports = []
+        try:
+            for level in concurrency:
+                self.logger.info(
+                    f"Benchmarking {model} via /api/{api} with {level} parallel requests"
+                )
+                report = run_benchmark(
+                    client, self.api_url, model, prompts, api, level, rounds,
+                    num_predict
+                )
+                for line in report.summary().splitlines():
+                    self.logger.info(line)
+                if self.warmer:
+                    for result in report.succeeded:
+                        self.warmer.record_load(model, result.load_duration / 1e9)
+                if self.preloader:
+                    for result in report.succeeded:
+                        self.preloader.record_load(model, result.load_duration / 1e9)
+                reports.append(report)
+        finally:
+            if client is not self.client:
+                client.close()
+        return reports
+
+    def update_status(self):
+        """Poll and render the status on an adaptive schedule until stopped."""
+        if self.client is None:
+            self._init_http_client()
+        self.start_exporter()
+        self.start_proxy()
+        self.start_process_sampler()
+        self.start_history()
+        self.start_alerts()
+        self.start_warmer()
+        self.start_preloader()
+        self.start_inventory()
+        if self.settings.get('profiler', False):
+            self.start_profiler()
+        subscription = self.join_broker()
+        first_poll = True
+        while self.should_run:
+            if subscription:
+                self.follow_broker(subscription)
+                subscription = self.join_broker() if self.should_run else None
+                continue
+            started = time.monotonic()
+            previous_model = self.current_model
+            self.poll()
+            self.render()
+            if first_poll:
+                first_poll = False
+                self.log_startup_time("first status")
+
+            fleet = self.fleet
+            if fleet:
+                delay = fleet.next_poll_in()
+            else:
+                delay = self.scheduler.next_delay(
+                    changed=self.current_model != previous_model,
+                    reachable=self.current_model != STATUS_NOT_RUNNING,
+                    elapsed=time.monotonic() - started
+                )
+            self._wake.wait(delay)
+            self._wake.clear()
+
+    def stop(self):
+        """Stop polling and release network resources."""
+        self.should_run = False
+        self._wake.set()
+        self.notifier.close()
+        self.logger.info("Stopping Ollama Monitor...")
+        if self.client is not None:
+            try:
+                self.client.close()
+                self.logger.info("HTTP client closed.")
+            except Exception as e:
+                self.logger.error(f"Error closing HTTP client: {str(e)}")
+        if self.fleet:
+            self.fleet.close()
+        self.close_retired()
+        if self.exporter:
+            self.exporter.stop()
+            self.exporter = None
+        if self.proxy:
+            self.logger.info(f"Proxy: {self.proxy.stats.summary()}")
+            for model in self.proxy.stats.models():
+                self.logger.info(f"Proxy: {self.proxy.stats.summary(model)}")
+            self.proxy.stop()
+            self.proxy = None
+        if self.history:
+            self.history.close()
+            self.history = None
+        if self.alerts:
+            self.alerts.close()
+            self.alerts = None
+        if self.warmer:
+            self.logger.info(f"Warmer: {self.warmer.summary()}")
+            self.warmer.close()
+            self.warmer = None
+        if self.subscription:
+            self.subscription.close()
+        if self.broker:
+            self.broker.stop()
+            self.broker = None
+        if self.preloader:
+            self.logger.info(f"Preloader: {self.preloader.summary()}")
+            self.preloader.close()
+            self.preloader = None
+        if self.inventory:
+            self.inventory.close()
+            self.inventory = None
+        self.stop_profiler()
+        self.write_perf()
+        if self.perf.counters['polls']:
+            from profiling import format_report
+            for line in format_report(self.perf_snapshot()).splitlines():
+                self.logger.info(f"Performance: {line}")
+
+    @property
+    def api_url(self) -> str:
+        """Get the API URL from settings."""
+        return self.settings.get(
+            'api_url',
+            f'http://{self.DEFAULT_API_HOST}:{self.DEFAULT_API_PORT}'
+        )
+
+    @property
+    def schedule_settings(self) -> dict:
+        """Get the poll scheduler configuration from settings."""
+        return {
+            'base_interval': self.settings.get('poll_interval', 1.0),
+            'fast_interval': self.settings.get('poll_interval_fast', 0.5),
+            'idle_interval': self.settings.get('poll_interval_idle', 5.0),
+            'max_backoff': self.settings.get('poll_backoff_max', 30.0),
+        }
+
+    @property
+    def endpoints(self) -> list:
+        """Get the list of fleet endpoints from settings."""
+        return self.settings.get('endpoints', [])
+
+    def __del__(self):
+        """Cleanup when the object is destroyed."""
+        # self.client.close() is now handled in stop()
+        self.logger.info("Ollama Monitor object being deleted.")
@@ -0,0 +1,183 @@
+"""
+Notification pipeline for Ollama Monitor.
+
+Status changes are confirmed by hysteresis before they are announced, and
+announcements are delivered from a background thread that merges bursts
+into one summary and caps how many notifications are shown per minute.
+The poll loop only appends to a queue and never waits for the desktop
+shell.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+# Windows balloon notifications are cut off after 255 characters
+MAX_MESSAGE_LENGTH = 255
+
+
+class Hysteresis:
+    """Confirm a state change only after it held for several observations."""
+
+    def __init__(self, hold: int = 2):
+        """
+        Args:
+            hold: Consecutive observations a new state needs to count
+        """
+        self.hold = max(1, hold)
+        self._confirmed: Dict[Hashable, Hashable] = {}
+        self._candidate: Dict[Hashable, Tuple[Hashable, int]] = {}
+
+    def update(self, key: Hashable, state: Hashable) -> Optional[Tuple]:
+        """
+        Record one observation.
+
+        The first observation of a key is accepted silently.
+
+        Args:
+            key: What is observed, e.g. a host
+            state: Observed state
+
+        Returns:
+            (old, new) when the confirmed state changed, otherwise None
+        """
+        if key not in self._confirmed:
+            self._confirmed[key] = state
+            return None
+        confirmed = self._confirmed[key]
+        if state == confirmed:
+            self._candidate.pop(key, None)
+            return None
+        candidate, count = self._candidate.get(key, (state, 0))
+        count = count + 1 if candidate == state else 1
+        if count < self.hold:
+            self._candidate[key] = (state, count)
+            return None
+        self._candidate.pop(key, None)
+        self._confirmed[key] = state
+        return confirmed, state
+
+    def forget(self, key: Hashable):
+        """Drop everything known about a key."""
+        self._confirmed.pop(key, None)
+        self._candidate.pop(key, None)
+
+
+class NotificationPipeline:
+    """Debounce, coalesce and rate-limit notifications on a worker thread."""
+
+    def __init__(self, show: Callable[[str], None], debounce: float = 2.0,
+                 max_per_minute: int = 4, logger=None):
+        """
+        The worker thread starts with the first notification.
+
+        Args:
+            show: Displays one notification; called on the worker thread
+            debounce: Seconds to wait for more notifications after the
+                first one of a burst
+            max_per_minute: Notifications shown per 60 seconds at most;
+                the rest are merged into the next one
+            logger: Logger for errors raised by ``show``
+        """
+        self.show = show
+        self.debounce = debounce
+        self.max_per_minute = max(1, max_per_minute)
+        self.logger = logger
+        self.shown = 0
+        self.merged = 0
+        # key -> message; keyless messages get a unique key
+        self._pending: Dict[Hashable, str] = {}
+        self._sequence = 0
+        self._recent = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = None
+
+    def submit(self, message: str, key: Optional[Hashable] = None):
+        """
+        Queue a notification without blocking.
+
+        Args:
+            message: Notification text
+            key: Messages with the same key replace each other while pending
+        """
+        with self._condition:
+            if self._closed:
+                return
+            if key is None:
+                self._sequence += 1
+                key = ('message', self._sequence)
+            # Re-insert so a replaced message moves to the end
+            self._pending.pop(key, None)
+            self._pending[key] = message
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='notifications', daemon=True
+                )
+                self._thread.start()
+            self._condition.notify()
+
+    def close(self):
+        """Stop the worker; pending notifications are dropped."""
+        with self._condition:
+            self._closed = True
+            self._pending.clear()
+            self._condition.notify()
+
+    def _run(self):
+        """Worker loop: collect a burst, wait for a free slot, show it."""
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                # Let the rest of the burst arrive
+                self._condition.wait_for(lambda: self._closed, self.debounce)
+                while not self._closed:
+                    wait = self._slot_wait()
+                    if wait <= 0:
+                        break
+                    self._condition.wait_for(lambda: self._closed, wait)
+                if self._closed:
+                    return
+                messages = list(self._pending.values())
+                self._pending.clear()
+                self._recent.append(time.monotonic())
+            self.shown += 1
+            self.merged += len(messages) - 1
+            try:
+                self.show(summarize(messages))
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"Error showing notification: {str(e)}")
+
+    def _slot_wait(self) -> float:
+        """Seconds until another notification may be shown."""
+        now = time.monotonic()
+        while self._recent and now - self._recent[0] >= 60:
+            self._recent.popleft()
+        if len(self._recent) < self.max_per_minute:
+            return 0.0
+        return 60 - (now - self._recent[0])
+
+
+def summarize(messages: list) -> str:
+    """
+    Merge notifications into one text.
+
+    Args:
+        messages: Notification texts, oldest first
+
+    Returns:
+        The message itself, or a summary of several, at most
+        ``MAX_MESSAGE_LENGTH`` characters long
+    """
+    if len(messages) == 1:
+        text = messages[0]
+    else:
+        text = f"{len(messages)} changes:\n" + '\n'.join(messages)
+    if len(text) > MAX_MESSAGE_LENGTH:
+        text = text[:MAX_MESSAGE_LENGTH - 1] + '…'
+    return text
@@ -4,473 +4,87 @@ Ollama Monitor - A system tray application to monitor Ollama AI models.
 Created by: Yusuf Emre ALBAYRAK
 """
 
-import json
+import time
+
+START_TIME = time.perf_counter()
+
+import argparse
 import os
 import sys
 import threading
-import time
-import webbrowser
-import logging
-from datetime import datetime
-from logging.handlers import RotatingFileHandler
-from typing import Optional
-from urllib.parse import urlparse
-
-import pystray
-import httpx
-from PIL import Image
-from tkinter import ttk
-import tkinter as tk
-from tkinter import messagebox
-import winreg
+from typing import TYPE_CHECKING, Optional
 
 from __version__ import __version__, __author__, __copyright__
+from models import LoadedModel
+from monitor_core import MonitorCore, history_path
+from tray_view import TrayView
 
-def setup_logging():
-    """Setup logging configuration."""
-    log_dir = os.path.join(os.getenv('APPDATA'), 'OllamaMonitor', 'logs')
-    os.makedirs(log_dir, exist_ok=True)
-    
-    # Log file with date
-    log_file = os.path.join(
-        log_dir, 
-        f'ollama_monitor_{datetime.now().strftime("%Y%m%d")}.log'
-    )
-    
-    # Create rotating file handler (max 5MB per file, keep 5 backup files)
-    file_handler = RotatingFileHandler(
-        log_file,
-        maxBytes=5*1024*1024,  # 5MB
-        backupCount=5,
-        encoding='utf-8'
-    )
-    
-    # Create console handler
-    console_handler = logging.StreamHandler()
-    
-    # Create formatters and add it to the handlers
-    file_formatter = logging.Formatter(
-        '%(asctime)s [%(levelname)s] %(message)s'
-    )
-    console_formatter = logging.Formatter(
-        '[%(levelname)s] %(message)s'
-    )
-    file_handler.setFormatter(file_formatter)
-    console_handler.setFormatter(console_formatter)
-    
-    # Get the logger
-    logger = logging.getLogger('OllamaMonitor')
-    logger.setLevel(logging.INFO)
-    
-    # Add the handlers to the logger
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
-    
-    return logger
+if TYPE_CHECKING:
+    # Imported where they are used at run time
+    import pystray
+    from PIL import Image
 
-class SettingsWindow:
-    """Settings window for Ollama Monitor configuration."""
+# Longest tooltip the Windows tray accepts
+TOOLTIP_LENGTH = 127
 
-    def __init__(self, monitor: 'OllamaMonitor'):
-        """
-        Initialize the settings window.
 
-        Args:
-            monitor: Reference to the main OllamaMonitor instance
-        """
-        self.monitor = monitor
-        self.window = tk.Tk()
-        self.window.title("Ollama Monitor - Settings")
-        self.window.geometry("400x460")
-        self.window.resizable(False, False)
-        
-        # Set Windows theme
-        self.style = ttk.Style()
-        self.style.theme_use('vista')
-        
-        self._create_widgets()
-        self._center_window()
-        
-        # Make window modal
-        self.window.transient()
-        self.window.grab_set()
-        self.window.focus_set()
-        
-        self.window.mainloop()
-    
-    def _create_widgets(self):
-        """Create and arrange all window widgets."""
-        # Title
-        title_label = ttk.Label(
-            self.window, 
-            text="Ollama Monitor", 
-            font=('Segoe UI', 14, 'bold')
-        )
-        title_label.pack(pady=10)
-        
-        # Settings frame
-        settings_frame = ttk.LabelFrame(
-            self.window, 
-            text="Settings", 
-            padding=10
-        )
-        settings_frame.pack(fill="x", padx=10, pady=5)
-        
-        # Startup setting
-        self.startup_var = tk.BooleanVar(
-            value=self.monitor.settings.get('startup', False)
-        )
-        startup_check = ttk.Checkbutton(
-            settings_frame,
-            text="Run at Windows startup",
-            variable=self.startup_var,
-            command=self.toggle_startup
-        )
-        startup_check.pack(anchor="w", pady=5)
-        
-        # API Settings frame
-        api_frame = ttk.LabelFrame(
-            self.window, 
-            text="API Connection", 
-            padding=10
-        )
-        api_frame.pack(fill="x", padx=10, pady=5)
-        
-        # API URL setting
-        url_frame = ttk.Frame(api_frame)
-        url_frame.pack(fill="x", pady=2)
-        
-        ttk.Label(
-            url_frame, 
-            text="Ollama URL:"
-        ).pack(side="left")
-        
-        self.api_url_var = tk.StringVar(
-            value=self.monitor.settings.get(
-                'api_url', 
-                f'http://{self.monitor.DEFAULT_API_HOST}:{self.monitor.DEFAULT_API_PORT}'
-            )
-        )
-        url_entry = ttk.Entry(
-            url_frame,
-            textvariable=self.api_url_var,
-            width=30
-        )
-        url_entry.pack(side="right")
-        
-        # Save API settings button
-        save_api_btn = ttk.Button(
-            api_frame,
-            text="Save API Settings",
-            command=self.save_api_settings
-        )
-        save_api_btn.pack(pady=5)
-        
-        # About frame
-        about_frame = ttk.LabelFrame(
-            self.window, 
-            text="About", 
-            padding=10
-        )
-        about_frame.pack(fill="x", padx=10, pady=5)
-        
-        # Version info
-        version_label = ttk.Label(
-            about_frame, 
-            text=f"Version: {__version__}"
-        )
-        version_label.pack(anchor="w")
-        
-        # Description
-        desc_label = ttk.Label(
-            about_frame,
-            text="Ollama Monitor is a system tray application that helps you\nmonitor your Ollama AI models.\nCreated by Yusuf Emre ALBAYRAK",
-            justify="left"
-        )
-        desc_label.pack(anchor="w", pady=5)
-        
-        # GitHub link
-        github_link = ttk.Label(
-            about_frame,
-            text="GitHub Repository",
-            cursor="hand2",
-            foreground="blue"
-        )
-        github_link.pack(anchor="w")
-        github_link.bind(
-            "<Button-1>", 
-            lambda e: webbrowser.open(
-                "https://github.com/ysfemreAlbyrk/ollama-monitor"
-            )
-        )
-        
-        # Close button
-        close_btn = ttk.Button(
-            self.window, 
-            text="Close", 
-            command=self.window.destroy
-        )
-        close_btn.pack(side="bottom", pady=10)
-    
-    def _center_window(self):
-        """Center the window on the screen."""
-        self.window.update_idletasks()
-        width = self.window.winfo_width()
-        height = self.window.winfo_height()
-        x = (self.window.winfo_screenwidth() // 2) - (width // 2)
-        y = (self.window.winfo_screenheight() // 2) - (height // 2)
-        self.window.geometry(f'{width}x{height}+{x}+{y}')
-    
-    def toggle_startup(self):
-        """Toggle Windows startup setting."""
-        startup = self.startup_var.get()
-        self.monitor.settings['startup'] = startup
-        self.monitor.save_settings()
-        
-        key_path = r"Software\\Microsoft\\Windows\\CurrentVersion\\Run"
-        try:
-            key = winreg.OpenKey(
-                winreg.HKEY_CURRENT_USER, 
-                key_path, 
-                0, 
-                winreg.KEY_ALL_ACCESS
-            )
-            
-            if startup:
-                # Use sys.executable for a more reliable path to the bundled .exe
-                executable_path = sys.executable if hasattr(sys, 'frozen') else os.path.abspath(sys.argv[0])
-                winreg.SetValueEx(
-                    key, 
-                    "OllamaMonitor", 
-                    0, 
-                    winreg.REG_SZ, 
-                    executable_path
-                )
-            else:
-                try:
-                    winreg.DeleteValue(key, "OllamaMonitor")
-                except WindowsError:
-                    pass
-            
-            winreg.CloseKey(key)
-        except Exception as e:
-            self.monitor.logger.error(f"Failed to save startup setting: {str(e)}")
-    
-    def save_api_settings(self):
-        """Save API settings and reinitialize client."""
-        try:
-            api_url = self.api_url_var.get().strip()
-            
-            # Basic URL validation
-            parsed = urlparse(api_url)
-            if not all([parsed.scheme, parsed.netloc]):
-                raise ValueError("Invalid URL format")
-            
-            # Save new settings
-            self.monitor.settings['api_url'] = api_url
-            self.monitor.save_settings()
-            
-            # Reinitialize client
-            if hasattr(self.monitor, 'client'):
-                self.monitor.client.close()
-            self.monitor._init_http_client()
-            
-            self.window.destroy()
-            self.monitor.logger.info("API settings saved and connection updated!")
-            self.monitor.icon.notify("API settings saved and connection updated!")
-            
-        except Exception as e:
-            messagebox.showerror(
-                "Error",
-                f"Invalid API URL: {str(e)}"
-            )
+def describe_loaded_model(model: LoadedModel, process=None) -> str:
+    """
+    Format a loaded model for the tray menu.
 
+    Args:
+        model: Loaded model record
+        process: ProcessSample of the runner serving the model, if known
 
-class CustomMenuItem(pystray.MenuItem):
-    """Custom menu item with better visibility for disabled items."""
-    
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-    
-    def render(self, window, offset=(0, 0)):
-        if not self.visible:
-            return []
-            
-        # Use white color (or any other color) for disabled items
-        text_color = 'white' if not self.enabled else 'black'
-        
-        return [(
-            offset[0], offset[1],
-            self.text,
-            {
-                'text': text_color,
-                'background': None,
-            }
-        )]
+    Returns:
+        Name with GPU/CPU split, VRAM use and the runner's RAM use
+    """
+    text = (
+        f"{model.name}: {model.processor()}, "
+        f"{model.size_vram / 1024 ** 3:.1f} GB VRAM"
+    )
+    if process is not None:
+        text += f", {process.rss / 1024 ** 3:.1f} GB RAM"
+    return text
 
 
-class OllamaMonitor:
+class OllamaMonitor(MonitorCore):
     """Main class for the Ollama Monitor application."""
     
-    DEFAULT_API_HOST = "localhost"
-    DEFAULT_API_PORT = "11434"
-    
-    def __init__(self):
-        """Initialize the Ollama Monitor application."""
-        # Setup logging
-        self.logger = setup_logging()
-        self.logger.info(f"Starting Ollama Monitor v{__version__}")
-        
-        self.current_model = "Waiting..."
-        self.icon: Optional[pystray.Icon] = None
-        self.should_run = True
-        self.last_status = None
+    def __init__(self, started_at: Optional[float] = None):
+        """
+        Initialize the Ollama Monitor application.
+
+        Args:
+            started_at: ``time.perf_counter()`` value at launch
+        """
+        self.icon = None
+        self.benchmark_running = False
         
         # Icon paths
         self.icons_dir = os.path.join(
             os.path.dirname(os.path.abspath(__file__)), 
             'icons'
         )
-        self.icon_red = os.path.join(self.icons_dir, 'icon_red.png')
-        self.icon_blue = os.path.join(self.icons_dir, 'icon_blue.png')
-        self.icon_green = os.path.join(self.icons_dir, 'icon_green.png')
+        from icons import IconCache, OVERLAY_NONE
+        self.icon_overlay = OVERLAY_NONE
+        self.icons = IconCache(self.icons_dir)
+        self.view = TrayView()
         
-        # Load settings
-        self.settings_file = os.path.join(
-            os.getenv('APPDATA'),
-            'OllamaMonitor',
-            'settings.json'
-        )
-        os.makedirs(os.path.dirname(self.settings_file), exist_ok=True)
-        self.load_settings()
-        
-        # Initialize HTTP client with configuration
-        self._init_http_client()
-
-    def _init_http_client(self):
-        """Initialize HTTP client with current settings."""
-        try:
-            # Parse URL for authentication
-            url = self.api_url
-            parsed_url = urlparse(url)
-            
-            self.logger.info(f"Initializing HTTP client with URL: {url}")
-            
-            # Setup client config
-            client_config = {
-                'verify': False,  # Disable SSL verification for proxy support
-                'follow_redirects': True
-            }
-
-            # If URL contains authentication, set it up in client
-            if parsed_url.username and parsed_url.password:
-                auth = (parsed_url.username, parsed_url.password)
-                client_config['auth'] = auth
-                self.logger.info("Using URL authentication")
-
-            # Create client with config
-            self.client = httpx.Client(**client_config)
-            self.logger.info("HTTP client initialized successfully")
-            
-        except Exception as e:
-            self.logger.error(f"Error initializing HTTP client: {str(e)}")
-            raise
-
-    def load_settings(self):
-        """Load application settings from JSON file."""
-        try:
-            if os.path.exists(self.settings_file):
-                with open(self.settings_file, 'r') as f:
-                    self.settings = json.load(f)
-                    self.logger.info("Settings loaded successfully")
-                    
-                    # Convert old settings format if needed
-                    if 'api_host' in self.settings and 'api_port' in self.settings:
-                        host = self.settings.pop('api_host')
-                        port = self.settings.pop('api_port')
-                        self.settings['api_url'] = f'http://{host}:{port}'
-                        self.save_settings()
-                        self.logger.info("Converted old settings format to new URL format")
-            else:
-                # Default settings
-                self.settings = {
-                    'startup': False,
-                    'api_url': f'http://{self.DEFAULT_API_HOST}:{self.DEFAULT_API_PORT}'
-                }
-                # Save default settings
-                self.save_settings()
-                self.logger.info("Created default settings")
-        except Exception as e:
-            self.logger.error(f"Error loading settings: {str(e)}")
-            self.settings = {
-                'startup': False,
-                'api_url': f'http://{self.DEFAULT_API_HOST}:{self.DEFAULT_API_PORT}'
-            }
-
-    def save_settings(self):
-        """Save application settings to JSON file."""
-        try:
-            with open(self.settings_file, 'w') as f:
-                json.dump(self.settings, f, indent=4)
-            self.logger.info("Settings saved successfully")
-        except Exception as e:
-            self.logger.error(f"Error saving settings: {str(e)}")
+        super().__init__(started_at)
+        self.icon_overlay = self.settings.get('icon_overlay', self.icon_overlay)
 
-    def get_running_models(self) -> str:
+    def show_notification(self, message: str):
         """
-        Get information about running Ollama models.
-        
-        Returns:
-            Status message about running models
+        Show a tray notification.
+
+        Args:
+            message: Notification text
         """
-        try:
-            response = self.client.get(
-                f'{self.api_url}/api/ps',
-                timeout=2
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                running_models = data.get('models', [])
-                
-                if running_models:
-                    model = running_models[0]
-                    model_info = (
-                        f"{model['name']} "
-                        f"({model['details']['parameter_size']})"
-                    )
-                    
-                    if self.last_status != model_info:
-                        self.logger.info(f"Model status changed: {model_info}")
-                        self.icon.notify(f"{model_info}")
-                        self.last_status = model_info
-                    return model_info
-                
-                if self.last_status != "No Model Running":
-                    self.logger.info("No model running")
-                    self.icon.notify("Model Stopped")
-                    self.last_status = "No Model Running"
-                return "No Model Running"
-                
-            self.logger.warning(f"API returned status code: {response.status_code}")
-            return "Ollama Not Running"
-            
-        except httpx.TimeoutException:
-            self.logger.error("API request timed out")
-            return "Ollama Not Running"
-            
-        except httpx.ConnectError as e:
-            self.logger.error(f"Connection error: {str(e)}")
-            if self.last_status != "Ollama Not Running":
-                self.icon.notify("Ollama Service Stopped")
-                self.last_status = "Ollama Not Running"
-            return "Ollama Not Running"
-            
-        except Exception as e:
-            self.logger.error(f"Unexpected error in get_running_models: {str(e)}")
-            return "Ollama Not Running"
+        if self.icon:
+            self.icon.notify(message)
 
-    def create_icon(self, status: str) -> Image.Image:
+    def create_icon(self, status: str) -> 'Image.Image':
         """
         Create system tray icon based on status.
         
@@ -481,90 +95,563 @@ class OllamaMonitor:
             PIL Image object for the icon
         """
         if "Ollama Not Running" in status:
-            icon_path = self.icon_red
+            color = 'red'
         elif "No Model Running" in status:
-            icon_path = self.icon_blue
+            color = 'blue'
         else:
-            icon_path = self.icon_green
+            color = 'green'
             
-        return Image.open(icon_path)
+        return self.icons.get(color, self.icon_overlay, self.running_models)
 
-    def create_menu(self) -> pystray.Menu:
+    def create_menu(self) -> 'pystray.Menu':
         """
         Create the system tray icon menu.
         
         Returns:
             pystray.Menu object
         """
+        import pystray
+
+        detail_items = [
+            pystray.MenuItem(text, lambda _: None, enabled=False)
+            for text in self.menu_signature()[1]
+        ]
+        if detail_items:
+            detail_items.insert(0, pystray.Menu.SEPARATOR)
+        if self.inventory:
+            detail_items.append(pystray.MenuItem("Models", self.create_models_menu()))
+
         return pystray.Menu(
             pystray.MenuItem(
                 self.current_model,  
                 lambda _: None,
                 enabled=True
             ),
+            *detail_items,
             pystray.Menu.SEPARATOR,
+            pystray.MenuItem("Run Benchmark", self.start_benchmark),
+            pystray.MenuItem("History", self.show_history),
+            pystray.MenuItem("Performance", self.show_performance),
+            pystray.MenuItem(
+                lambda _: "Stop Profiler" if self.profiler else "Start Profiler",
+                self.toggle_profiler
+            ),
             pystray.MenuItem("Settings", self.show_settings),
             pystray.MenuItem("Exit", self.stop)
         )
 
-    def update_status(self):
-        """Update the system tray icon status periodically."""
-        while self.should_run:
-            self.current_model = self.get_running_models()
-            if self.icon:
-                self.icon.icon = self.create_icon(self.current_model)
-                self.icon.title = f"{self.current_model}"
-                self.icon.menu = self.create_menu()
-            time.sleep(1)
+    def create_models_menu(self) -> 'pystray.Menu':
+        """
+        Create the submenu of installed models, grouped by family.
+
+        Built from the cached inventory only; clicking a model loads or
+        unloads it.
+
+        Returns:
+            pystray.Menu object
+        """
+        import pystray
+
+        inventory = self.inventory
+        loaded = {model.name for model in self.loaded_models.models}
+        families = [
+            pystray.MenuItem(
+                f"{family} ({len(models)})",
+                pystray.Menu(*(
+                    self._model_item(model, model.name in loaded) for model in models
+                ))
+            )
+            for family, models in sorted(inventory.index.by_family.items())
+        ]
+        return pystray.Menu(
+            pystray.MenuItem(inventory.summary(), lambda _: None, enabled=False),
+            *families,
+            pystray.Menu.SEPARATOR,
+            pystray.MenuItem("Refresh", self.refresh_models)
+        )
+
+    def _model_item(self, model, loaded: bool) -> 'pystray.MenuItem':
+        """Menu entry that toggles whether an installed model is loaded."""
+        import pystray
+        return pystray.MenuItem(
+            model.describe(),
+            lambda: self.set_model_loaded(model.name, not loaded),
+            checked=lambda _: loaded
+        )
+
+    def refresh_models(self):
+        """Refresh the installed models from the tray menu."""
+        if not self.refresh_inventory():
+            self.notify("Installed models are already being refreshed")
+
+    def menu_signature(self) -> tuple:
+        """
+        Summarize everything the menu displays.
+
+        Returns:
+            Hashable tuple that changes whenever the menu would change
+        """
+        if not self.fleet:
+            host = self.host_sample
+            details = [
+                describe_loaded_model(model, host and host.for_model(model.name))
+                for model in self.loaded_models.models
+            ]
+            if host and host.processes:
+                # Coarse steps so the menu is not rebuilt on every poll
+                details.append(
+                    f"Ollama processes: CPU {round(host.cpu_percent / 5) * 5:.0f}%, "
+                    f"RAM {host.rss / 1024 ** 3:.1f} GB, "
+                    f"host memory {host.memory_percent:.0f}% used"
+                )
+            if self.warmer and self.warmer.requests:
+                details.append(f"Warmer: {self.warmer.summary()}")
+            if self.preloader and (self.preloader.hits or self.preloader.misses):
+                details.append(f"Preloader: {self.preloader.summary()}")
+            firing = self.alerts.firing() if self.alerts else []
+            if firing:
+                details.append(f"Alerts: {', '.join(firing)}")
+            if self.proxy and self.proxy.stats.requests:
+                details.append(f"Proxy: {self.proxy.stats.summary()}")
+            if self.subscription:
+                details.append("Status from the monitor broker")
+            elif self.broker and self.broker.subscribers:
+                details.append(f"Broker: {self.broker.subscribers} subscribers")
+            if self.last_error:
+                details.append(f"Error: {self.last_error}")
+            # The models submenu changes with the loaded models and the inventory
+            inventory = self.inventory
+            return self.current_model, tuple(details), inventory and inventory.version
+
+        details = []
+        for host in self.host_statuses:
+            if host.error:
+                details.append(f"{host.label}: {host.status} ({host.error})")
+            else:
+                details.append(f"{host.label}: {host.status}")
+            if host.up and len(host.models) > 1:
+                details.extend(
+                    f"    {describe_loaded_model(LoadedModel.from_api(model))}"
+                    for model in host.models
+                )
+        return self.current_model, tuple(details)
+
+    def status_title(self) -> str:
+        """
+        Tooltip text: the status, plus the failure reason or the last
+        poll's timings.
+
+        The timings change on almost every poll, so they go here rather
+        than into the menu, which is rebuilt whenever its text changes.
+        """
+        if self.fleet:
+            title = f"{self.current_model}"
+        elif self.last_error:
+            title = f"{self.current_model} ({self.last_error})"
+        elif self.last_timings:
+            title = f"{self.current_model}\nLast poll: {self.last_timings.summary()}"
+        else:
+            title = f"{self.current_model}"
+        # Windows rejects longer tooltips
+        return title[:TOOLTIP_LENGTH]
+
+    def render(self):
+        """Push the latest poll result to the tray icon."""
+        if self.icon:
+            perf = self.perf
+            started = time.perf_counter()
+            image = self.create_icon(self.overall_status)
+            applied = time.perf_counter()
+            perf.record('icon', applied - started)
+            self.view.apply(
+                self.icon,
+                image,
+                self.status_title(),
+                self.menu_signature(),
+                self._timed_menu
+            )
+            perf.record('tray', time.perf_counter() - applied)
+
+    def _timed_menu(self) -> 'pystray.Menu':
+        """Build the menu and record how long that took."""
+        started = time.perf_counter()
+        menu = self.create_menu()
+        self.perf.record('menu', time.perf_counter() - started)
+        return menu
+
+    def perf_counters(self) -> dict:
+        """Core counters plus the tray updates that were applied."""
+        counters = super().perf_counters()
+        counters['icon_swaps'] = self.view.applied['icon']
+        counters['menu_builds'] = self.view.applied['menu']
+        return counters
 
     def run(self):
         """Start the Ollama Monitor application."""
+        import pystray
+
         self.icon = pystray.Icon(
             "ollama-monitor",
             self.create_icon("Starting..."),
             "Ollama Monitor",
             menu=self.create_menu()
         )
+        self.icon.run(setup=self._on_icon_ready)
+
+    def _on_icon_ready(self, icon):
+        """Show the icon, then start polling; called by pystray once ready."""
+        icon.visible = True
+        self.log_startup_time("icon visible")
 
         update_thread = threading.Thread(target=self.update_status)
         update_thread.daemon = True
         update_thread.start()
 
-        self.icon.run()
-
     def stop(self):
         """Stop the Ollama Monitor application."""
-        self.should_run = False
-        self.logger.info("Stopping Ollama Monitor...")
-        if hasattr(self, 'client') and self.client is not None:
-            try:
-                self.client.close()
-                self.logger.info("HTTP client closed.")
-            except Exception as e:
-                self.logger.error(f"Error closing HTTP client: {str(e)}")
+        super().stop()
+
+        stats = self.view.stats()
+        self.logger.info(
+            f"Tray updates: {stats['applied']} applied, {stats['skipped']} skipped"
+        )
 
         if self.icon:
             self.icon.stop()
             self.logger.info("System tray icon stopped.")
 
+    def start_benchmark(self):
+        """Run the throughput benchmark in the background and notify the result."""
+        if self.benchmark_running:
+            self.notify("Benchmark already running")
+            return
+        self.benchmark_running = True
+        threading.Thread(
+            target=self._benchmark_worker, name='benchmark', daemon=True
+        ).start()
+
+    def _benchmark_worker(self):
+        """Body of the benchmark thread."""
+        try:
+            self.notify("Benchmark started")
+            reports = self.run_benchmark()
+            self.notify('\n'.join(report.short_summary() for report in reports))
+        except Exception as e:
+            self.logger.error(f"Benchmark failed: {str(e)}")
+            self.notify(f"Benchmark failed: {str(e)}")
+        finally:
+            self.benchmark_running = False
+
+    def show_history(self):
+        """Notify a summary of the last week's uptime and model residency."""
+        if self.history is None:
+            self.notify("History is turned off")
+            return
+        from history import format_summary
+        summary = format_summary(self.history, days=7)
+        for line in summary.splitlines():
+            self.logger.info(line)
+        self.notify(summary)
+
+    def show_performance(self):
+        """Notify the monitor's own CPU use and poll times; log all stages."""
+        from profiling import format_report
+        report = format_report(self.perf_snapshot())
+        for line in report.splitlines():
+            self.logger.info(f"Performance: {line}")
+        # The CPU line and the whole-poll line fit in a notification
+        self.notify('\n'.join(report.splitlines()[:2]))
+
+    def toggle_profiler(self):
+        """Start the sampling profiler, or stop it and notify the file."""
+        if not self.start_profiler():
+            path = self.stop_profiler()
+            self.notify(f"Profile written to {path}" if path else "Could not write the profile")
+        if self.icon:
+            self.icon.update_menu()
+
     def show_settings(self):
         """Show the settings window."""
+        from gui import SettingsWindow
         SettingsWindow(self)
 
-    @property
-    def api_url(self) -> str:
-        """Get the API URL from settings."""
-        return self.settings.get(
-            'api_url',
-            f'http://{self.DEFAULT_API_HOST}:{self.DEFAULT_API_PORT}'
+
+def show_history(days: int, transitions: bool):
+    """
+    Print history summaries without starting the monitor.
+
+    Args:
+        days: Length of the period in days
+        transitions: Also print every state change
+    """
+    from datetime import datetime
+    from history import HistoryStore, format_summary
+
+    path = history_path()
+    if not os.path.exists(path):
+        print("No history recorded yet.")
+        return
+    store = HistoryStore(path)
+    try:
+        print(format_summary(store, days))
+        if transitions:
+            print("Transitions:")
+            for ts, host, event, model in store.transitions(
+                time.time() - days * 86400
+            ):
+                when = datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M:%S')
+                print(f"  {when} {host} {event}{' ' + model if model else ''}")
+    finally:
+        store.close()
+
+
+def show_models(refresh: bool, family: Optional[str], quantization: Optional[str]):
+    """
+    Print the installed models from the cached inventory.
+
+    Args:
+        refresh: Refresh the inventory from the server first
+        family: Only models of this family
+        quantization: Only models of this quantization level
+    """
+    monitor = MonitorCore(START_TIME)
+    try:
+        monitor.start_inventory()
+        inventory = monitor.inventory
+        if inventory is None:
+            print("The model inventory is turned off.")
+            return
+        if refresh or inventory.refreshed_at is None:
+            import httpx
+            monitor._init_http_client()
+            try:
+                inventory.refresh(monitor.client, monitor.api_url)
+            except (httpx.HTTPError, ValueError) as e:
+                print(f"Could not refresh the inventory: {str(e)}", file=sys.stderr)
+        for model in inventory.index.select(family, quantization):
+            print(f"{model.family or 'other':<12} {model.describe()}")
+        print(inventory.summary())
+    finally:
+        monitor.stop()
+
+
+def show_perf(as_json: bool):
+    """
+    Print the performance statistics the running monitor last wrote.
+
+    Args:
+        as_json: Print the raw statistics as JSON
+    """
+    import json
+    from monitor_core import perf_path
+    from profiling import format_report, read_snapshot
+
+    snapshot = read_snapshot(perf_path())
+    if snapshot is None:
+        print("No performance statistics written yet.")
+        return
+    if as_json:
+        print(json.dumps(snapshot, indent=2))
+        return
+    age = time.time() - snapshot['time']
+    print(f"Written by pid {snapshot['pid']} {age:.0f} s ago")
+    print(format_report(snapshot))
+
+
+def run_discovery(targets: list, ports: list, add: bool, max_in_flight: int,
+                  connect_timeout: float):
+    """
+    Scan for Ollama servers and print them, optionally adding them.
+
+    Args:
+        targets: CIDR ranges, addresses or host names; the local /24 if empty
+        ports: Ports to probe
+        add: Add the servers found to the monitored endpoints
+        max_in_flight: Upper bound on simultaneous connections
+        connect_timeout: Seconds to wait for each connection
+    """
+    from discovery import local_network, scan
+
+    if not targets:
+        network = local_network()
+        if network is None:
+            sys.exit("No network to scan; name a range such as 192.168.1.0/24")
+        targets = [network]
+    started = time.perf_counter()
+    try:
+        servers = scan(
+            targets, ports, max_in_flight=max_in_flight, connect_timeout=connect_timeout,
+            on_found=lambda server: print(
+                f"{server.url}  Ollama {server.version}  {server.latency * 1000:.0f} ms",
+                flush=True
+            )
         )
+    except ValueError as e:
+        sys.exit(str(e))
+    print(f"Found {len(servers)} Ollama servers in {time.perf_counter() - started:.1f} s")
+    if add and servers:
+        monitor = MonitorCore(START_TIME)
+        try:
+            added = monitor.add_endpoints([server.url for server in servers])
+        finally:
+            monitor.stop()
+        if added:
+            print(f"Added {added} endpoints; restart the monitor to poll them")
+        else:
+            print("All servers found are monitored already")
+
+
+def main():
+    """Parse the command line and start the tray app or the daemon."""
+    parser = argparse.ArgumentParser(
+        description="Monitor Ollama AI models from the system tray."
+    )
+    parser.add_argument(
+        '--headless',
+        action='store_true',
+        help="run the monitoring loop as a daemon without tray or GUI"
+    )
+    parser.add_argument(
+        '--version',
+        action='version',
+        version=f"%(prog)s {__version__}"
+    )
+    subparsers = parser.add_subparsers(dest='command')
+    bench = subparsers.add_parser(
+        'bench', help="measure inference throughput and exit"
+    )
+    bench.add_argument('--model', help="model to benchmark (default: first loaded)")
+    bench.add_argument(
+        '--api', choices=('generate', 'chat'), help="endpoint to send prompts to"
+    )
+    bench.add_argument(
+        '--concurrency', type=int, nargs='+', metavar='N',
+        help="parallel requests; several values run one pass each"
+    )
+    bench.add_argument(
+        '--prompt', action='append', dest='prompts', metavar='TEXT',
+        help="prompt to send, may be repeated"
+    )
+    bench.add_argument(
+        '--prompts-file', metavar='PATH', help="file with one prompt per line"
+    )
+    bench.add_argument(
+        '--rounds', type=int, default=1, help="passes over the prompt set"
+    )
+    bench.add_argument(
+        '--num-predict', type=int, metavar='N', help="maximum tokens per response"
+    )
+    history = subparsers.add_parser(
+        'history', help="show uptime and model residency from the history"
+    )
+    history.add_argument(
+        '--days', type=int, default=7, help="length of the period (default: 7)"
+    )
+    history.add_argument(
+        '--transitions', action='store_true',
+        help="also list every state change in the period"
+    )
+    models = subparsers.add_parser(
+        'models', help="list the installed models from the cached inventory"
+    )
+    models.add_argument(
+        '--refresh', action='store_true', help="refresh the inventory from the server first"
+    )
+    models.add_argument('--family', help="only models of this family, e.g. llama")
+    models.add_argument('--quantization', help="only models of this quantization, e.g. Q4_K_M")
+    discover = subparsers.add_parser(
+        'discover', help="scan a subnet or host list for Ollama servers"
+    )
+    discover.add_argument(
+        'targets', nargs='*', metavar='TARGET',
+        help="CIDR range, address or host name (default: the local /24)"
+    )
+    discover.add_argument(
+        '--port', type=int, nargs='+', dest='ports', default=[11434], metavar='PORT',
+        help="ports to probe (default: 11434)"
+    )
+    discover.add_argument(
+        '--add', action='store_true', help="monitor the servers found as fleet endpoints"
+    )
+    discover.add_argument(
+        '--max-in-flight', type=int, default=128, metavar='N',
+        help="simultaneous connections (default: 128)"
+    )
+    discover.add_argument(
+        '--connect-timeout', type=float, default=0.5, metavar='SECONDS',
+        help="seconds to wait for each connection (default: 0.5)"
+    )
+    perf = subparsers.add_parser(
+        'perf', help="show the monitor's own CPU use and poll stage timings"
+    )
+    perf.add_argument('--json', action='store_true', help="print the raw statistics")
+    status = subparsers.add_parser(
+        'status', help="print the current state as JSON and exit"
+    )
+    status.add_argument('--url', help="server to query instead of the configured one")
+    status.add_argument('--pretty', action='store_true', help="indent the JSON output")
+    watch = subparsers.add_parser(
+        'watch', help="print a JSON line whenever the state changes"
+    )
+    watch.add_argument('--url', help="server to query instead of the configured one")
+    watch.add_argument(
+        '--interval', type=float, metavar='SECONDS',
+        help="seconds between polls (default: poll_interval)"
+    )
+    args = parser.parse_args()
+
+    if args.command == 'status':
+        from status_cli import run_status
+        sys.exit(run_status(args.url, args.pretty))
+
+    if args.command == 'watch':
+        from status_cli import run_watch
+        sys.exit(run_watch(args.url, args.interval))
+
+    if args.command == 'discover':
+        run_discovery(args.targets, args.ports, args.add, args.max_in_flight,
+                      args.connect_timeout)
+        return
+
+    if args.command == 'perf':
+        show_perf(args.json)
+        return
+
+    if args.command == 'models':
+        show_models(args.refresh, args.family, args.quantization)
+        return
+
+    if args.command == 'history':
+        show_history(args.days, args.transitions)
+        return
+
+    if args.command == 'bench':
+        prompts = list(args.prompts or [])
+        if args.prompts_file:
+            with open(args.prompts_file, encoding='utf-8') as f:
+                prompts.extend(line.strip() for line in f if line.strip())
+        monitor = MonitorCore(START_TIME)
+        try:
+            reports = monitor.run_benchmark(
+                args.model, args.concurrency, prompts or None, args.api,
+                args.rounds, args.num_predict
+            )
+        except ValueError as e:
+            parser.exit(1, f"{parser.prog}: {str(e)}\n")
+        finally:
+            monitor.stop()
+        for report in reports:
+            print(report.summary())
+        return
+
+    if args.headless:
+        from headless import HeadlessMonitor
+        HeadlessMonitor(START_TIME).run()
+        return
 
-    def __del__(self):
-        """Cleanup when the object is destroyed."""
-        # self.client.close() is now handled in stop()
-        self.logger.info("Ollama Monitor object being deleted.")
+    monitor = OllamaMonitor(START_TIME)
+    monitor.run()
 
 
 if __name__ == "__main__":
-    monitor = OllamaMonitor()
-    monitor.run()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,316 @@
+"""
+Predictive model preloading for Ollama Monitor.
+
+Learns in which hours of the week each model is needed from the model
+loads seen by the poll loop, and shortly before an hour in which a model
+is likely to be needed, loads it with an empty ``/api/generate`` request
+so the first real request does not pay the load time. Every prediction is
+scored at the end of its hour: it was right if the model was used.
+"""
+
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import httpx
+
+from models import LoadedModel
+from warmer import COLD_LOAD_THRESHOLD, NS_PER_SECOND, normalize_model_name
+
+HOUR = 3600
+WEEK = 7 * 24 * HOUR
+# A load this soon after a preload of the same model was the preload itself
+PRELOAD_ECHO = 600
+
+
+def week_slot(timestamp: float) -> int:
+    """Hour of the week in local time, 0 for Monday 00:00-01:00."""
+    local = time.localtime(timestamp)
+    return local.tm_wday * 24 + local.tm_hour
+
+
+class UsagePattern:
+    """Which models were needed in each hour of the week."""
+
+    def __init__(self, weeks: int = 8):
+        """
+        Args:
+            weeks: Weeks of observations to learn from
+        """
+        self.weeks = weeks
+        # Hour of the week -> start of every hour the server was watched
+        self._observed: Dict[int, Set[int]] = defaultdict(set)
+        # (hour of the week, model) -> start of every hour the model was needed
+        self._demand: Dict[Tuple[int, str], Set[int]] = defaultdict(set)
+
+    def observe(self, timestamp: float):
+        """Note that the server was watched at ``timestamp``."""
+        self._observed[week_slot(timestamp)].add(int(timestamp // HOUR))
+
+    def add_demand(self, timestamp: float, model: str):
+        """Note that ``model`` was needed at ``timestamp``."""
+        slot = week_slot(timestamp)
+        hour = int(timestamp // HOUR)
+        self._observed[slot].add(hour)
+        self._demand[(slot, model)].add(hour)
+
+    def predict(self, timestamp: float, threshold: float = 0.5,
+                min_hours: int = 2) -> List[Tuple[str, float]]:
+        """
+        Models likely to be needed in the hour containing ``timestamp``.
+
+        Args:
+            timestamp: Any time within the hour
+            threshold: Smallest share of watched hours with demand
+            min_hours: Smallest number of hours with demand
+
+        Returns:
+            (model, probability) pairs, most likely first
+        """
+        slot = week_slot(timestamp)
+        observed = len(self._observed.get(slot, ()))
+        if not observed:
+            return []
+        likely = []
+        for (demand_slot, model), hours in self._demand.items():
+            if demand_slot != slot or len(hours) < min_hours:
+                continue
+            probability = len(hours) / observed
+            if probability >= threshold:
+                likely.append((model, probability))
+        return sorted(likely, key=lambda m: -m[1])
+
+    def prune(self, now: float):
+        """Forget observations older than ``weeks``."""
+        oldest = int((now - self.weeks * WEEK) // HOUR)
+        for table in (self._observed, self._demand):
+            for key, hours in list(table.items()):
+                hours.difference_update([h for h in hours if h < oldest])
+                if not hours:
+                    del table[key]
+
+
+class _Prediction:
+    """A model expected to be needed before ``window_end``."""
+
+    __slots__ = ('window_end', 'probability', 'preloaded', 'expiry')
+
+    def __init__(self, window_end: float, probability: float, preloaded: bool):
+        self.window_end = window_end
+        self.probability = probability
+        self.preloaded = preloaded
+        # Expiry set by the preload, None until it answered
+        self.expiry: Optional[float] = None
+
+
+class Preloader:
+    """Load models shortly before the hours they are usually needed in."""
+
+    def __init__(self, lead_time: float = 120.0, threshold: float = 0.5,
+                 vram_budget: Optional[int] = None, dry_run: bool = False,
+                 weeks: int = 8, logger=None,
+                 record_event: Optional[Callable[[float, str, str], None]] = None):
+        """
+        Args:
+            lead_time: Seconds before the hour at which models are loaded
+            threshold: Share of past weeks a model must have been needed in
+                an hour of the week to be preloaded for it
+            vram_budget: Bytes of VRAM preloaded models may hold, None for no limit
+            dry_run: Only log and score predictions, never load a model
+            weeks: Weeks of observations to learn from
+            logger: Logger for predictions and errors
+            record_event: Called with (timestamp, event, model) for preloads
+                and their use, so they can be kept in the history
+        """
+        self.lead_time = lead_time
+        self.threshold = threshold
+        self.vram_budget = vram_budget
+        self.dry_run = dry_run
+        self.logger = logger
+        self.record_event = record_event
+        self.pattern = UsagePattern(weeks)
+        self.requests = 0
+        self.hits = 0
+        self.misses = 0
+        self.unpredicted = 0
+        self.saved_seconds = 0.0
+        # Last known VRAM use and load time of every model seen
+        self.sizes: Dict[str, int] = {}
+        self.load_seconds: Dict[str, float] = {}
+        self._predictions: Dict[str, _Prediction] = {}
+        self._previous: Optional[Set[str]] = None
+        self._planned_hour = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='preloader')
+
+    def seed(self, transitions: list, active_hours: List[int]):
+        """
+        Learn from the persistent history of the monitored server.
+
+        Args:
+            transitions: (timestamp, host, event, model) rows, oldest first
+            active_hours: Start of every hour the server answered
+        """
+        for hour in active_hours:
+            self.pattern.observe(hour)
+        preloaded = {}
+        up_at = None
+        for timestamp, _, event, model in transitions:
+            if event == 'up':
+                up_at = timestamp
+            elif event == 'preloaded':
+                preloaded[model] = timestamp
+            elif event == 'preload_used':
+                self.pattern.add_demand(timestamp, model)
+            elif event == 'loaded' and model:
+                # Models found loaded when the monitor or server started and
+                # models loaded by a preload say nothing about demand
+                if timestamp == up_at:
+                    continue
+                if timestamp - preloaded.get(model, float('-inf')) < PRELOAD_ECHO:
+                    continue
+                self.pattern.add_demand(timestamp, model)
+
+    def check(self, client: httpx.Client, api_url: str,
+              models: List[LoadedModel], now: Optional[float] = None):
+        """
+        Learn from one poll and preload models for the next hour; never blocks.
+
+        Args:
+            client: HTTP client for the preload requests
+            api_url: Base URL of the Ollama server
+            models: Models currently loaded according to ``/api/ps``
+            now: Current ``time.time()``
+        """
+        now = time.time() if now is None else now
+        loaded = {model.name: model for model in models}
+        for model in models:
+            self.sizes[model.name] = model.size_vram
+        self.pattern.observe(now)
+
+        new = set() if self._previous is None else loaded.keys() - self._previous
+        self._previous = set(loaded)
+        for name in new:
+            prediction = self._predictions.get(name)
+            if prediction is None:
+                self.unpredicted += 1
+            elif prediction.preloaded:
+                continue
+            self.pattern.add_demand(now, name)
+        self._score(loaded, new, now)
+
+        next_hour = (now // HOUR + 1) * HOUR
+        if next_hour - now <= self.lead_time and next_hour != self._planned_hour:
+            self._planned_hour = next_hour
+            self.pattern.prune(now)
+            self._plan(client, api_url, loaded, next_hour, now)
+
+    def _score(self, loaded: Dict[str, LoadedModel], new: Set[str], now: float):
+        """Settle predictions whose model was used or whose hour is over."""
+        for name, prediction in list(self._predictions.items()):
+            model = loaded.get(name)
+            if prediction.preloaded:
+                # A request moves expires_at away from what the preload set
+                used = (
+                    model is not None and model.expires_at is not None
+                    and prediction.expiry is not None
+                    and abs(model.expires_at - prediction.expiry) > 1
+                )
+            else:
+                used = name in new
+            if used:
+                del self._predictions[name]
+                self.hits += 1
+                saved = self.load_seconds.get(name, 0.0)
+                self.saved_seconds += saved
+                if prediction.preloaded:
+                    self.pattern.add_demand(now, name)
+                    self._record(now, 'preload_used', name)
+                    self._log(f"Preloaded {name} was used, saving {saved:.1f} s")
+                else:
+                    self._log(f"Predicted {name} was needed")
+            elif now >= prediction.window_end:
+                del self._predictions[name]
+                self.misses += 1
+
+    def _plan(self, client: httpx.Client, api_url: str,
+              loaded: Dict[str, LoadedModel], window_start: float, now: float):
+        """Preload the models predicted for the hour at ``window_start``."""
+        window_end = window_start + HOUR
+        used_vram = 0
+        for name, probability in self.pattern.predict(window_start, self.threshold):
+            if name in loaded or name in self._predictions:
+                continue
+            used_vram += self.sizes.get(name, 0)
+            if self.vram_budget is not None and used_vram > self.vram_budget:
+                self._log(f"Not preloading {name}: predicted models exceed "
+                          f"the VRAM budget")
+                continue
+            hour = time.strftime('%H:%M', time.localtime(window_start))
+            prediction = _Prediction(window_end, probability, not self.dry_run)
+            self._predictions[name] = prediction
+            if self.dry_run:
+                self._log(f"Would preload {name} for {hour} "
+                          f"({probability:.0%} of past weeks)")
+                continue
+            self._log(f"Preloading {name} for {hour} ({probability:.0%} of past weeks)")
+            # Stay loaded until the end of the hour, then Ollama's own
+            # keep_alive of the requests takes over
+            keep_alive = int(window_end - now)
+            self._record(now, 'preloaded', name)
+            self._executor.submit(
+                self._preload, client, api_url, name, keep_alive, prediction
+            )
+
+    def _preload(self, client: httpx.Client, api_url: str, name: str,
+                 keep_alive: int, prediction: _Prediction):
+        """Send the preload request; runs on the preloader thread."""
+        try:
+            response = client.post(
+                f'{api_url}/api/generate',
+                json={'model': name, 'keep_alive': keep_alive, 'stream': False},
+                timeout=httpx.Timeout(300.0, connect=10.0)
+            )
+            self.requests += 1
+            if response.status_code != 200:
+                self._log(f"Preloading {name} failed: HTTP {response.status_code}")
+                return
+            self.record_load(name, response.json().get('load_duration', 0) / NS_PER_SECOND)
+            prediction.expiry = time.time() + keep_alive
+        except httpx.HTTPError as e:
+            self._log(f"Preloading {name} failed: {str(e)}")
+
+    def record_load(self, name: str, seconds: float):
+        """
+        Remember how long loading a model took.
+
+        Args:
+            name: Model name
+            seconds: ``load_duration`` of a response, in seconds
+        """
+        if seconds >= COLD_LOAD_THRESHOLD:
+            self.load_seconds[normalize_model_name(name)] = seconds
+
+    def summary(self) -> str:
+        """One-line description of how good the predictions were."""
+        scored = self.hits + self.misses
+        rate = self.hits / scored * 100 if scored else 0.0
+        text = f"{self.hits} of {scored} predictions right ({rate:.0f}%)"
+        if self.saved_seconds:
+            verb = "would have saved" if self.dry_run else "saved"
+            text += f", {verb} ~{self.saved_seconds:.0f} s load time"
+        if self.unpredicted:
+            text += f", {self.unpredicted} loads not predicted"
+        return text
+
+    def close(self):
+        """Stop the preloader thread without waiting for a pending request."""
+        self._executor.shutdown(wait=False)
+
+    def _record(self, timestamp: float, event: str, model: str):
+        if self.record_event:
+            self.record_event(timestamp, event, model)
+
+    def _log(self, message: str):
+        if self.logger:
+            self.logger.info(message)
@@ -0,0 +1,212 @@
+"""
+Resource sampling of the local Ollama processes.
+
+Finds the ``ollama`` server and its model runner processes, keeps their
+psutil handles across polls and reads each one in a single ``oneshot()``
+batch. Runner processes are matched to the models reported by
+``/api/ps`` so host memory use and CPU offload can be shown per model.
+"""
+
+import os
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+import psutil
+
+from models import LoadedModel
+
+# Executable names of the server and of runners in older Ollama releases
+SERVER_NAMES = {'ollama', 'ollama.exe'}
+RUNNER_NAMES = {'ollama_llama_server', 'ollama_llama_server.exe'}
+
+
+class ProcessSample(NamedTuple):
+    """One reading of an Ollama process."""
+
+    pid: int
+    role: str                  # 'server' or 'runner'
+    cpu_percent: float         # since the previous reading, may exceed 100
+    rss: int                   # resident memory in bytes
+    num_threads: int
+    read_bytes: Optional[int]  # None when I/O counters are unavailable
+    write_bytes: Optional[int]
+    model: Optional[str]       # name of the model a runner serves
+
+
+class HostSample(NamedTuple):
+    """Readings of every Ollama process plus host memory."""
+
+    timestamp: float
+    processes: List[ProcessSample]
+    memory_percent: float      # host memory in use
+    memory_available: int      # bytes
+
+    @property
+    def cpu_percent(self) -> float:
+        """CPU use of all Ollama processes together."""
+        return sum(p.cpu_percent for p in self.processes)
+
+    @property
+    def rss(self) -> int:
+        """Resident memory of all Ollama processes together."""
+        return sum(p.rss for p in self.processes)
+
+    def for_model(self, name: str) -> Optional[ProcessSample]:
+        """Reading of the runner serving ``name``, if one was matched."""
+        for process in self.processes:
+            if process.model == name:
+                return process
+        return None
+
+
+class _Tracked:
+    """Cached handle and static facts of one process."""
+
+    __slots__ = ('process', 'role', 'model_size')
+
+    def __init__(self, process: psutil.Process, role: str, model_size: int):
+        self.process = process
+        self.role = role
+        self.model_size = model_size
+
+
+def _classify(name: str, cmdline: List[str]) -> Optional[str]:
+    """Tell server and runner processes apart, None for anything else."""
+    name = (name or '').lower()
+    if name in RUNNER_NAMES:
+        return 'runner'
+    if name in SERVER_NAMES:
+        # Current releases run models as ``ollama runner --model ...``
+        return 'runner' if 'runner' in cmdline[1:2] else 'server'
+    return None
+
+
+def _model_file_size(cmdline: List[str]) -> int:
+    """Size of the weights file a runner was started with, 0 if unknown."""
+    try:
+        path = cmdline[cmdline.index('--model') + 1]
+        return os.path.getsize(path)
+    except (ValueError, IndexError, OSError):
+        return 0
+
+
+class ProcessSampler:
+    """Sample the Ollama processes on this machine with cached handles."""
+
+    def __init__(self, rescan_interval: float = 30.0):
+        """
+        Args:
+            rescan_interval: Seconds between scans of the process table;
+                a scan also happens when a tracked process exits or the
+                number of loaded models changes
+        """
+        self.rescan_interval = rescan_interval
+        self.scans = 0
+        self._tracked: Dict[int, _Tracked] = {}
+        self._scanned_at = float('-inf')
+        self._model_count = None
+
+    def scan(self):
+        """Find Ollama processes, keeping handles that are still valid."""
+        found = {}
+        for process in psutil.process_iter(['name', 'cmdline']):
+            try:
+                cmdline = process.info['cmdline'] or []
+                role = _classify(process.info['name'], cmdline)
+                if role is None:
+                    continue
+                tracked = self._tracked.get(process.pid)
+                if tracked is None:
+                    size = _model_file_size(cmdline) if role == 'runner' else 0
+                    tracked = _Tracked(process, role, size)
+                    # The first reading only sets the baseline
+                    process.cpu_percent(None)
+                found[process.pid] = tracked
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        self._tracked = found
+        self._scanned_at = time.monotonic()
+        self.scans += 1
+
+    def sample(self, models: List[LoadedModel]) -> HostSample:
+        """
+        Read every tracked process once.
+
+        Args:
+            models: Models currently loaded according to ``/api/ps``
+
+        Returns:
+            HostSample with one reading per process
+        """
+        if (
+            time.monotonic() - self._scanned_at >= self.rescan_interval
+            or len(models) != self._model_count
+        ):
+            self._model_count = len(models)
+            self.scan()
+
+        readings = []
+        vanished = False
+        for pid, tracked in self._tracked.items():
+            process = tracked.process
+            try:
+                with process.oneshot():
+                    cpu = process.cpu_percent(None)
+                    rss = process.memory_info().rss
+                    threads = process.num_threads()
+                    try:
+                        io = process.io_counters()
+                        read_bytes, write_bytes = io.read_bytes, io.write_bytes
+                    except (psutil.AccessDenied, AttributeError):
+                        # Other users' processes on Linux, and macOS
+                        read_bytes = write_bytes = None
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                vanished = True
+                continue
+            readings.append((tracked, ProcessSample(
+                pid, tracked.role, cpu, rss, threads, read_bytes, write_bytes, None
+            )))
+        if vanished:
+            # Pick up a restarted server or new runners on the next poll
+            self._scanned_at = float('-inf')
+
+        memory = psutil.virtual_memory()
+        return HostSample(
+            time.time(),
+            _match_runners(readings, models),
+            memory.percent,
+            memory.available
+        )
+
+
+def _match_runners(readings: list, models: List[LoadedModel]) -> List[ProcessSample]:
+    """
+    Attach model names to runner readings.
+
+    ``/api/ps`` does not say which process serves a model, so each runner
+    is paired with the unmatched model whose size is closest to the
+    runner's weights file. With a single runner and model no sizes are
+    needed.
+
+    Args:
+        readings: (tracked process, ProcessSample) pairs
+        models: Loaded models
+
+    Returns:
+        ProcessSample list with ``model`` set on matched runners
+    """
+    runners = [(t, s) for t, s in readings if t.role == 'runner']
+    unmatched = list(models)
+    names = {}
+    if len(runners) == 1 and len(unmatched) == 1:
+        names[runners[0][1].pid] = unmatched[0].name
+    else:
+        for tracked, reading in sorted(runners, key=lambda r: -r[0].model_size):
+            if not unmatched or not tracked.model_size:
+                continue
+            best = min(unmatched, key=lambda m: abs(m.size - tracked.model_size))
+            unmatched.remove(best)
+            names[reading.pid] = best.name
+    return [
+        reading._replace(model=names.get(reading.pid)) for _, reading in readings
+    ]
@@ -0,0 +1,217 @@
+"""
+Self-profiling for Ollama Monitor.
+
+``PerfStats`` keeps a fixed-bucket latency histogram per stage of a poll
+and a few counters. Recording a sample is a logarithm and an array
+increment, so the statistics cost the same after a month as after a
+minute and never grow. The stages are:
+
+- ``poll``: wall time of one poll, including every helper that runs in it
+- ``poll_cpu``: CPU time of the poll thread during one poll
+- ``request``: the ``/api/ps`` request
+- ``decode``: decoding its JSON body
+- ``icon``: ``create_icon``
+- ``tray``: pushing icon, tooltip and menu to pystray
+- ``menu``: ``create_menu``, when the menu changed
+
+``SamplingProfiler`` is turned on when needed. It samples the stacks of
+all threads from a background thread and writes them as collapsed stacks
+(``thread;outer;...;inner count``), the input of ``flamegraph.pl`` and
+speedscope.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+from sliding import LogHistogram
+
+STAGES = ('poll', 'poll_cpu', 'request', 'decode', 'icon', 'tray', 'menu')
+COUNTERS = ('polls', 'errors')
+# One microsecond; stages shorter than this share the first bucket
+STAGE_FLOOR = 1e-6
+PERCENTILES = (50, 90, 99)
+
+
+class PerfStats:
+    """Latency histograms of the poll stages and event counters."""
+
+    def __init__(self):
+        self.started = time.time()
+        self._wall_started = time.perf_counter()
+        self._cpu_started = time.process_time()
+        self.histograms = {stage: LogHistogram(STAGE_FLOOR) for stage in STAGES}
+        self.totals = dict.fromkeys(STAGES, 0.0)
+        self.maxima = dict.fromkeys(STAGES, 0.0)
+        self.counters = dict.fromkeys(COUNTERS, 0)
+
+    def record(self, stage: str, seconds: float):
+        """Add one duration to a stage's histogram."""
+        self.histograms[stage].add(seconds)
+        self.totals[stage] += seconds
+        if seconds > self.maxima[stage]:
+            self.maxima[stage] = seconds
+
+    def count(self, counter: str, amount: int = 1):
+        """Increase a counter."""
+        self.counters[counter] += amount
+
+    def cpu_percent(self) -> float:
+        """Process CPU time since start, in percent of one core."""
+        wall = time.perf_counter() - self._wall_started
+        if wall <= 0:
+            return 0.0
+        return (time.process_time() - self._cpu_started) / wall * 100
+
+    def snapshot(self, counters: Optional[Dict[str, int]] = None,
+                 cpu_budget: Optional[float] = None) -> dict:
+        """
+        Statistics as a JSON-serializable dictionary.
+
+        Args:
+            counters: Counters kept elsewhere, added to the own ones
+            cpu_budget: Allowed CPU use in percent of one core
+
+        Returns:
+            Dictionary with ``stages`` (count, mean, max and percentiles
+            in seconds), ``counters`` and process CPU use
+        """
+        stages = {}
+        for stage in STAGES:
+            histogram = self.histograms[stage]
+            if not histogram.total:
+                continue
+            stats = {
+                'count': histogram.total,
+                'mean': self.totals[stage] / histogram.total,
+                'max': self.maxima[stage]
+            }
+            for share in PERCENTILES:
+                # A bucket's upper bound can lie above the largest sample
+                stats[f'p{share}'] = min(histogram.percentile(share / 100), stats['max'])
+            stages[stage] = stats
+        return {
+            'time': round(time.time(), 3),
+            'pid': os.getpid(),
+            'started': round(self.started, 3),
+            'cpu_percent': round(self.cpu_percent(), 3),
+            'cpu_budget': cpu_budget,
+            'counters': dict(self.counters, **(counters or {})),
+            'stages': stages
+        }
+
+
+def format_report(snapshot: dict) -> str:
+    """
+    Describe a :meth:`PerfStats.snapshot` in a few lines.
+
+    Args:
+        snapshot: Statistics dictionary
+
+    Returns:
+        Text with process CPU use, one line per stage and the counters
+    """
+    uptime = snapshot['time'] - snapshot['started']
+    cpu = f"CPU {snapshot['cpu_percent']:.2f}% of one core over {uptime / 60:.0f} min"
+    budget = snapshot.get('cpu_budget')
+    if budget is not None:
+        cpu += f" (budget {budget:g}%{', exceeded' if snapshot['cpu_percent'] > budget else ''})"
+    lines = [cpu]
+    for stage, stats in snapshot['stages'].items():
+        percentiles = ', '.join(
+            f"p{share} {stats[f'p{share}'] * 1000:.2f}" for share in PERCENTILES
+        )
+        lines.append(
+            f"{stage}: {stats['count']} x, mean {stats['mean'] * 1000:.2f}, "
+            f"{percentiles}, max {stats['max'] * 1000:.2f} ms"
+        )
+    lines.append(', '.join(f"{name} {value}" for name, value in snapshot['counters'].items()))
+    return '\n'.join(lines)
+
+
+class SamplingProfiler:
+    """Sample the stacks of all threads and write them as collapsed stacks."""
+
+    def __init__(self, interval: float = 0.01):
+        """
+        Args:
+            interval: Seconds between samples
+        """
+        self.interval = interval
+        self.samples = 0
+        # (thread id, code objects from the outermost frame) -> samples
+        self._stacks: Dict[tuple, int] = {}
+        self._names: Dict[int, str] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profiler', daemon=True)
+
+    def start(self):
+        """Start sampling in a background thread."""
+        self._thread.start()
+
+    def _run(self):
+        own = threading.get_ident()
+        stacks = self._stacks
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                codes = []
+                while frame is not None:
+                    codes.append(frame.f_code)
+                    frame = frame.f_back
+                key = (ident, tuple(reversed(codes)))
+                stacks[key] = stacks.get(key, 0) + 1
+                if ident not in self._names:
+                    self._names = {t.ident: t.name for t in threading.enumerate()}
+            self.samples += 1
+
+    def stop(self):
+        """Stop sampling and wait for the sampling thread."""
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def collapsed(self) -> List[str]:
+        """Sampled stacks in collapsed format, most frequent first."""
+        labels = {}
+        lines = []
+        for (ident, codes), count in sorted(self._stacks.items(), key=lambda item: -item[1]):
+            frames = [self._names.get(ident, f'thread-{ident}')]
+            for code in codes:
+                label = labels.get(code)
+                if label is None:
+                    label = labels[code] = (
+                        f"{code.co_name} ({os.path.basename(code.co_filename)}:"
+                        f"{code.co_firstlineno})"
+                    )
+                frames.append(label)
+            lines.append(f"{';'.join(frames)} {count}")
+        return lines
+
+    def write(self, path: str) -> int:
+        """
+        Write the sampled stacks to a file.
+
+        Args:
+            path: Output file, e.g. ``profile.folded``
+
+        Returns:
+            Number of samples written
+        """
+        with open(path, 'w', encoding='utf-8') as f:
+            for line in self.collapsed():
+                f.write(line + '\n')
+        return self.samples
+
+
+def read_snapshot(path: str) -> Optional[dict]:
+    """Statistics written by a running monitor, None if there are none."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
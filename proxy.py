@@ -0,0 +1,565 @@
+"""
+Metering reverse proxy for Ollama Monitor.
+
+Clients talk to the proxy instead of Ollama. Requests and responses are
+passed through as they arrive, without decoding or buffering, over a pool
+of kept-alive ``http.client`` connections; a streamed body goes out with
+its chunk framing as it was read, one write per read. For
+``/api/generate`` and ``/api/chat`` the proxy keeps the last two pieces
+read and takes the timings Ollama reports
+in its final chunk, so real traffic shows up as time to first byte,
+tokens per second and queueing delay without parsing the stream.
+"""
+
+import base64
+import functools
+import http.client
+import itertools
+import json
+import math
+import re
+import select
+import socket
+import ssl
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+
+NS_PER_SECOND = 1e9
+# Headers that describe one connection and are not forwarded
+HOP_BY_HOP = {
+    'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization',
+    'te', 'trailer', 'transfer-encoding', 'upgrade', 'host', 'content-length'
+}
+METERED_PATHS = {'/api/generate', '/api/chat'}
+# Larger request bodies (model uploads) are streamed upstream unread
+MAX_METERED_BODY = 1024 * 1024
+STREAM_CHUNK = 64 * 1024
+# Escaped quotes inside string values cannot match these
+_MODEL = re.compile(rb'"model"\s*:\s*"([^"]*)"')
+_TIMING = re.compile(
+    rb'"(total_duration|load_duration|prompt_eval_count|prompt_eval_duration|'
+    rb'eval_count|eval_duration)"\s*:\s*(\d+)'
+)
+
+
+class RequestMetrics(NamedTuple):
+    """Measurements of one proxied request."""
+
+    timestamp: float
+    path: str
+    model: Optional[str]
+    status: int
+    ttfb: float                  # seconds until the first response byte
+    duration: float              # seconds until the response was passed on
+    load_duration: float         # seconds, as reported by Ollama
+    prompt_eval_count: int
+    prompt_eval_duration: float  # seconds
+    eval_count: int
+    eval_duration: float         # seconds
+    queue: float                 # estimated seconds before Ollama started
+    overhead: float              # CPU seconds spent in the proxy
+
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        """Generation speed reported by Ollama."""
+        if not self.eval_count or not self.eval_duration:
+            return None
+        return self.eval_count / self.eval_duration
+
+
+def read_timings(tail: bytes) -> Dict[str, int]:
+    """
+    Extract Ollama's timing fields from the end of a response.
+
+    Args:
+        tail: Last bytes of the response, holding the final chunk
+
+    Returns:
+        Field name to value; durations in nanoseconds
+    """
+    return {name.decode(): int(value) for name, value in _TIMING.findall(tail)}
+
+
+def _p95(values: List[float]) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(0.95 * len(ordered)) - 1)]
+
+
+class ProxyStats:
+    """Recent request measurements, shared by the proxy threads."""
+
+    def __init__(self, keep: int = 1000):
+        """
+        Args:
+            keep: Number of recent requests kept for the statistics
+        """
+        self.requests = 0
+        self.errors = 0
+        self.recent = deque(maxlen=keep)
+        self._lock = threading.Lock()
+
+    def add(self, metrics: RequestMetrics):
+        """Record one finished request."""
+        with self._lock:
+            self.requests += 1
+            if metrics.status >= 400:
+                self.errors += 1
+            self.recent.append(metrics)
+
+    def summary(self, model: Optional[str] = None) -> str:
+        """
+        One-line statistics over the recent requests.
+
+        Args:
+            model: Only requests for this model, all if None
+        """
+        with self._lock:
+            recent = [m for m in self.recent if model is None or m.model == model]
+        if model is None:
+            text = f"{self.requests} requests"
+            if self.errors:
+                text += f" ({self.errors} failed)"
+        else:
+            text = f"{model}: {len(recent)} requests"
+        metered = [m for m in recent if m.eval_count]
+        if metered:
+            speeds = [m.tokens_per_second for m in metered if m.tokens_per_second]
+            text += (
+                f", TTFB p95 {_p95([m.ttfb for m in metered]) * 1000:.0f} ms"
+                f", {math.fsum(speeds) / len(speeds):.1f} tokens/s"
+                f", queue {math.fsum(m.queue for m in metered) / len(metered) * 1000:.0f} ms"
+            )
+        if recent:
+            overhead = math.fsum(m.overhead for m in recent) / len(recent)
+            text += f", proxy overhead {overhead * 1000:.2f} ms"
+        return text
+
+    def models(self) -> List[str]:
+        """Models seen in the recent requests, most requested first."""
+        with self._lock:
+            counts: Dict[str, int] = {}
+            for m in self.recent:
+                if m.model:
+                    counts[m.model] = counts.get(m.model, 0) + 1
+        return sorted(counts, key=lambda name: -counts[name])
+
+
+class UpstreamPool:
+    """Keep-alive connections to the Ollama server, shared by the proxy threads."""
+
+    def __init__(self, max_connections: int = 32, connect_timeout: float = 2.0,
+                 keepalive_expiry: float = 60.0):
+        """
+        Args:
+            max_connections: Most requests in flight upstream at a time
+            connect_timeout: Seconds to wait for a connection, or for a
+                free one when all are busy
+            keepalive_expiry: Seconds an idle connection is kept
+        """
+        self.connect_timeout = connect_timeout
+        self.keepalive_expiry = keepalive_expiry
+        self.opened = 0
+        self._slots = threading.BoundedSemaphore(max_connections)
+        # (scheme, host, port) -> [(connection, monotonic time it became idle)]
+        self._idle: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, scheme: str, host: str, port: int
+                ) -> Tuple[http.client.HTTPConnection, bool]:
+        """
+        Take a connection, reusing an idle one that is still open.
+
+        Returns:
+            Connection and whether it was reused
+
+        Raises:
+            OSError: If no connection could be made or all stayed busy
+        """
+        if not self._slots.acquire(timeout=self.connect_timeout):
+            raise TimeoutError("All upstream connections are busy")
+        try:
+            now = time.monotonic()
+            with self._lock:
+                idle = self._idle.get((scheme, host, port), [])
+                while idle:
+                    connection, since = idle.pop()
+                    if now - since < self.keepalive_expiry and _still_open(connection.sock):
+                        return connection, True
+                    connection.close()
+            if scheme == 'https':
+                connection = http.client.HTTPSConnection(
+                    host, port, timeout=self.connect_timeout,
+                    # As for the monitor's own client, certificates are not verified
+                    context=ssl._create_unverified_context()
+                )
+            else:
+                connection = http.client.HTTPConnection(host, port, timeout=self.connect_timeout)
+            connection.connect()
+            # Generation can take minutes; only the connect phase is bounded
+            connection.sock.settimeout(None)
+            self.opened += 1
+            return connection, False
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, connection: http.client.HTTPConnection, reusable: bool):
+        """Return a connection taken with :meth:`acquire`."""
+        if reusable and connection.sock is not None:
+            scheme = 'https' if isinstance(connection, http.client.HTTPSConnection) else 'http'
+            key = (scheme, connection.host, connection.port)
+            with self._lock:
+                self._idle.setdefault(key, []).append((connection, time.monotonic()))
+        else:
+            connection.close()
+        self._slots.release()
+
+    def close(self):
+        """Close the idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for connection, _ in connections:
+                connection.close()
+
+
+class MeteringProxy:
+    """Reverse proxy to the Ollama API that measures the requests it passes on."""
+
+    def __init__(self, upstream: Callable[[], str], host: str = '127.0.0.1',
+                 port: int = 11433, max_connections: int = 32,
+                 connect_timeout: float = 2.0, keepalive_expiry: float = 60.0,
+                 logger=None):
+        """
+        Bind the listener; call :meth:`start` to begin serving.
+
+        Args:
+            upstream: Returns the base URL of the Ollama server, so a
+                changed API URL applies to the next request
+            host: Address to listen on
+            port: Port to listen on, 0 picks a free one
+            max_connections: Most requests in flight upstream at a time
+            connect_timeout: Seconds to wait for an upstream connection
+            keepalive_expiry: Seconds an idle upstream connection is kept
+            logger: Logger for upstream errors
+        """
+        self.upstream = upstream
+        self.logger = logger
+        self.stats = ProxyStats()
+        self.pool = UpstreamPool(max_connections, connect_timeout, keepalive_expiry)
+        proxy = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                # Streamed tokens must not wait for Nagle's algorithm
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def do_GET(self):
+                proxy.forward(self)
+
+            do_POST = do_PUT = do_DELETE = do_HEAD = do_GET
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self.httpd.serve_forever, name='metering-proxy', daemon=True
+        )
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """Address the listener is bound to."""
+        return self.httpd.server_address[:2]
+
+    def start(self):
+        """Start serving in a background thread."""
+        self._thread.start()
+
+    def forward(self, handler: BaseHTTPRequestHandler):
+        """
+        Pass one request upstream and stream the response back.
+
+        Response bodies are passed on as they are received, chunk framing
+        included, with one write per read from the upstream socket; only
+        the framing is followed to find the end of the body.
+
+        Args:
+            handler: Request handler of the client connection
+        """
+        cpu_started = time.thread_time()
+        started = time.perf_counter()
+        path = handler.path.split('?', 1)[0]
+        metered = path in METERED_PATHS
+        length = int(handler.headers.get('Content-Length') or 0)
+        chunked = 'chunked' in handler.headers.get('Transfer-Encoding', '').lower()
+        model = None
+        if chunked:
+            content = _buffer_chunked(handler.rfile)
+        elif length <= MAX_METERED_BODY:
+            content = handler.rfile.read(length) if length else b''
+        else:
+            content = _read_body(handler.rfile, length)
+        # Bodies read in full are sent with their length and can be retried
+        buffered = isinstance(content, bytes)
+        if metered and buffered:
+            found = _MODEL.search(content)
+            model = found.group(1).decode() if found else None
+        scheme, host, port, prefix, authorization = _target(self.upstream())
+        headers = [
+            (name, value) for name, value in handler.headers.items()
+            if name.lower() not in HOP_BY_HOP
+        ]
+        if not buffered:
+            if chunked:
+                headers.append(('Transfer-Encoding', 'chunked'))
+            else:
+                headers.append(('Content-Length', str(length)))
+        elif content or handler.command in ('POST', 'PUT'):
+            headers.append(('Content-Length', str(len(content))))
+        if authorization and not any(name.lower() == 'authorization' for name, _ in headers):
+            headers.append(('Authorization', authorization))
+        if not any(name.lower() == 'accept-encoding' for name, _ in headers):
+            # Otherwise Ollama may compress for a client that cannot read it
+            headers.append(('Accept-Encoding', 'identity'))
+
+        ttfb = 0.0
+        tail = last = b''
+        status = 502
+        streamed = False
+        connection = response = None
+        reusable = False
+        try:
+            for attempt in range(2):
+                connection, reused = self.pool.acquire(scheme, host, port)
+                try:
+                    connection.putrequest(
+                        handler.command, prefix + handler.path,
+                        skip_accept_encoding=True
+                    )
+                    for name, value in headers:
+                        connection.putheader(name, value)
+                    connection.endheaders(
+                        content or None, encode_chunked=chunked and not buffered
+                    )
+                    response = connection.getresponse()
+                    break
+                except (ConnectionResetError, BrokenPipeError,
+                        http.client.RemoteDisconnected):
+                    self.pool.release(connection, False)
+                    connection = None
+                    # The server closed a kept-alive connection meanwhile
+                    if not reused or attempt or not buffered:
+                        raise
+        except (OSError, http.client.HTTPException) as e:
+            if connection is not None:
+                self.pool.release(connection, False)
+            if self.logger:
+                self.logger.warning(f"Proxy request to {path} failed: {str(e)}")
+            # Answer like Ollama does, so clients show the reason
+            body = json.dumps({'error': f"Ollama unreachable: {str(e)}"}).encode()
+            try:
+                handler.send_response_only(502)
+                handler.send_header('Content-Type', 'application/json; charset=utf-8')
+                handler.send_header('Content-Length', str(len(body)))
+                handler.end_headers()
+                handler.wfile.write(body)
+            except OSError:
+                pass
+            handler.close_connection = True
+
+        if response is not None:
+            try:
+                status = response.status
+                streamed = 'ndjson' in (response.getheader('Content-Type') or '')
+                handler.send_response_only(status)
+                for name, value in response.getheaders():
+                    if name.lower() not in HOP_BY_HOP:
+                        handler.send_header(name, value)
+                content_length = response.getheader('Content-Length')
+                if content_length is not None:
+                    handler.send_header('Content-Length', content_length)
+                if response.chunked and handler.command != 'HEAD':
+                    handler.send_header('Transfer-Encoding', 'chunked')
+                if response.chunked and response.length is None:
+                    framing = ChunkFraming()
+                    left = None
+                else:
+                    framing = None
+                    left = response.length
+                    if left is None:
+                        # The body ends when the server closes the connection
+                        handler.close_connection = True
+                handler.end_headers()
+                read = response.fp.read1
+                # The unbuffered handler.wfile, without its per-call wrapper
+                write = handler.connection.sendall
+                while left != 0 and not (framing and framing.done):
+                    data = read(STREAM_CHUNK if left is None else min(left, STREAM_CHUNK))
+                    if not data:
+                        if framing or left:
+                            raise http.client.IncompleteRead(b'')
+                        break
+                    if not ttfb:
+                        ttfb = time.perf_counter() - started
+                    write(data)
+                    if framing:
+                        framing.feed(data)
+                    elif left is not None:
+                        left -= len(data)
+                    if metered:
+                        tail, last = last, data
+                reusable = not response.will_close
+            except http.client.IncompleteRead:
+                if self.logger:
+                    self.logger.warning(f"Proxy response for {path} ended early")
+                handler.close_connection = True
+            except (OSError, ValueError):
+                # The client went away mid-response, or the framing was broken
+                handler.close_connection = True
+            finally:
+                response.close()
+                self.pool.release(connection, reusable)
+
+        duration = time.perf_counter() - started
+        timings = read_timings(tail + last) if metered else {}
+        load = timings.get('load_duration', 0) / NS_PER_SECOND
+        prompt_eval = timings.get('prompt_eval_duration', 0) / NS_PER_SECOND
+        eval_count = timings.get('eval_count', 0)
+        eval_duration = timings.get('eval_duration', 0) / NS_PER_SECOND
+        # What is left of the first byte once Ollama's own work is removed:
+        # a stream starts after the first token, a single answer ("stream":
+        # false) only once the whole request is done
+        if not eval_count:
+            queue = 0.0
+        elif streamed:
+            queue = ttfb - load - prompt_eval - eval_duration / eval_count
+        else:
+            queue = ttfb - timings.get('total_duration', 0) / NS_PER_SECOND
+        self.stats.add(RequestMetrics(
+            time.time(), path, model, status, ttfb, duration, load,
+            timings.get('prompt_eval_count', 0), prompt_eval, eval_count,
+            eval_duration, max(0.0, queue), time.thread_time() - cpu_started
+        ))
+
+    def stop(self):
+        """Stop the listener and close the upstream connections."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.pool.close()
+
+
+class ChunkFraming:
+    """Follow the framing of a chunked body that is passed on unchanged."""
+
+    __slots__ = ('done', '_left', '_line', '_trailers')
+
+    def __init__(self):
+        self.done = False
+        self._left = 0          # chunk data and CRLF still to come
+        self._line = b''        # start of a size or trailer line
+        self._trailers = False
+
+    def feed(self, data: bytes):
+        """
+        Take the next bytes of the body.
+
+        Raises:
+            ValueError: If a chunk size cannot be parsed
+        """
+        position, end = 0, len(data)
+        while position < end and not self.done:
+            if self._left:
+                step = min(self._left, end - position)
+                self._left -= step
+                position += step
+                continue
+            newline = data.find(b'\n', position)
+            if newline < 0:
+                self._line += data[position:]
+                return
+            line = self._line + data[position:newline]
+            self._line = b''
+            position = newline + 1
+            if self._trailers:
+                # A blank line after the last chunk ends the body
+                self.done = not line.strip()
+            else:
+                size = int(line.split(b';', 1)[0], 16)
+                self._left = size + 2 if size else 0
+                self._trailers = not size
+
+
+@functools.lru_cache(maxsize=8)
+def _target(url: str) -> Tuple[str, str, int, str, Optional[str]]:
+    """Scheme, host, port, path prefix and Authorization header of a base URL."""
+    parsed = urlsplit(url)
+    scheme = parsed.scheme or 'http'
+    port = parsed.port or (443 if scheme == 'https' else 80)
+    authorization = None
+    if parsed.username:
+        credentials = f"{unquote(parsed.username)}:{unquote(parsed.password or '')}"
+        authorization = 'Basic ' + base64.b64encode(credentials.encode()).decode()
+    return scheme, parsed.hostname, port, parsed.path.rstrip('/'), authorization
+
+
+def _still_open(sock: Optional[socket.socket]) -> bool:
+    """Whether an idle connection can be reused: nothing arrived, not even EOF."""
+    if sock is None:
+        return False
+    try:
+        return not select.select([sock], [], [], 0)[0]
+    except (OSError, ValueError):
+        return False
+
+
+def _read_body(rfile, length: int):
+    """Yield a request body of known length in pieces."""
+    while length > 0:
+        piece = rfile.read(min(STREAM_CHUNK, length))
+        if not piece:
+            return
+        length -= len(piece)
+        yield piece
+
+
+def _buffer_chunked(rfile):
+    """
+    Read a chunked request body into bytes, so its model can be read.
+
+    Returns:
+        The body, or an iterator over its pieces if it is larger than
+        ``MAX_METERED_BODY``
+    """
+    pieces = _read_chunked(rfile)
+    read = []
+    size = 0
+    for piece in pieces:
+        read.append(piece)
+        size += len(piece)
+        if size > MAX_METERED_BODY:
+            return itertools.chain(read, pieces)
+    return b''.join(read)
+
+
+def _read_chunked(rfile):
+    """Yield the pieces of a chunked request body."""
+    while True:
+        size = int(rfile.readline().split(b';', 1)[0], 16)
+        if size == 0:
+            # Skip trailers up to the blank line
+            while rfile.readline() not in (b'\r\n', b'\n', b''):
+                pass
+            return
+        yield rfile.read(size)
+        rfile.readline()
@@ -0,0 +1,92 @@
+"""
+Adaptive poll scheduling for Ollama Monitor.
+
+Polls quickly right after a state change, relaxes towards an idle interval
+while nothing changes, and backs off exponentially with jitter while the
+server is unreachable.
+"""
+
+import random
+from typing import Optional
+
+
+class PollScheduler:
+    """Compute the delay until the next poll from the outcome of the last one."""
+
+    def __init__(self, base_interval: float = 1.0, fast_interval: float = 0.5,
+                 idle_interval: float = 5.0, max_backoff: float = 30.0,
+                 settle_polls: int = 5, rng: Optional[random.Random] = None):
+        """
+        Initialize the scheduler.
+
+        Args:
+            base_interval: Interval once the state has settled
+            fast_interval: Interval used right after a change
+            idle_interval: Upper bound on the interval while nothing changes
+            max_backoff: Upper bound on the interval while unreachable
+            settle_polls: Unchanged polls before the interval starts growing
+            rng: Random source for jitter
+        """
+        self.base_interval = base_interval
+        self.fast_interval = min(fast_interval, base_interval)
+        self.idle_interval = max(idle_interval, base_interval)
+        self.max_backoff = max_backoff
+        self.settle_polls = settle_polls
+        self.rng = rng or random.Random()
+        self.failures = 0
+        self.stable_polls = 0
+
+    def interval(self, changed: bool, reachable: bool) -> float:
+        """
+        Get the full poll interval for the outcome of the last poll.
+
+        Args:
+            changed: Whether the observed state differs from the previous poll
+            reachable: Whether the server answered
+
+        Returns:
+            Interval in seconds, measured from the start of the last poll
+        """
+        if not reachable:
+            self.stable_polls = 0
+            self.failures += 1
+            backoff = min(
+                self.max_backoff,
+                self.base_interval * 2 ** min(self.failures - 1, 16)
+            )
+            # Equal jitter: keeps at least half the backoff so a dead host
+            # is never hammered, but spreads retries across clients.
+            return backoff / 2 + self.rng.uniform(0, backoff / 2)
+
+        self.failures = 0
+        if changed:
+            self.stable_polls = 0
+            return self.fast_interval
+
+        self.stable_polls += 1
+        if self.stable_polls < self.settle_polls:
+            return self.fast_interval
+        steps = self.stable_polls - self.settle_polls
+        return min(self.idle_interval, self.base_interval * 1.5 ** min(steps, 16))
+
+    def next_delay(self, changed: bool, reachable: bool, elapsed: float) -> float:
+        """
+        Get how long to sleep before the next poll.
+
+        Time already spent in the request counts towards the interval, so a
+        slow or timed-out request does not stretch the poll period.
+
+        Args:
+            changed: Whether the observed state differs from the previous poll
+            reachable: Whether the server answered
+            elapsed: Seconds spent performing the last poll
+
+        Returns:
+            Seconds to wait, never negative
+        """
+        return max(0.0, self.interval(changed, reachable) - elapsed)
+
+    def reset(self):
+        """Forget history so the next poll happens at the fast interval."""
+        self.failures = 0
+        self.stable_polls = 0
@@ -0,0 +1,153 @@
+"""
+Sliding-window aggregates with constant work per sample.
+
+Each window keeps only what its statistic needs: event timestamps for
+counts, a running sum for means, a monotonic queue for maxima and a
+fixed-bucket histogram for percentiles. Adding a sample and expiring old
+ones costs amortized O(1), and reading the statistic never rescans the
+window.
+"""
+
+import math
+from array import array
+from collections import deque
+from typing import Optional
+
+# Histogram buckets grow by this factor; percentiles are exact to within it
+BUCKET_GROWTH = 1.1
+# Smallest value with its own bucket; smaller values share the first one
+BUCKET_FLOOR = 1e-4
+BUCKET_COUNT = 256
+
+
+class LogHistogram:
+    """Counts of values in logarithmically spaced buckets."""
+
+    __slots__ = ('counts', 'total', 'floor')
+
+    def __init__(self, floor: float = BUCKET_FLOOR):
+        """
+        Args:
+            floor: Smallest value with its own bucket; the largest is
+                about ``floor * 3.6e10``
+        """
+        self.counts = array('I', bytes(4 * BUCKET_COUNT))
+        self.total = 0
+        self.floor = floor
+
+    def bucket(self, value: float) -> int:
+        """Index of the bucket holding ``value``."""
+        if value <= self.floor:
+            return 0
+        index = int(math.log(value / self.floor, BUCKET_GROWTH)) + 1
+        return min(index, BUCKET_COUNT - 1)
+
+    def add(self, value: float, count: int = 1):
+        """Add (or, with a negative count, remove) a value."""
+        self.counts[self.bucket(value)] += count
+        self.total += count
+
+    def percentile(self, share: float) -> Optional[float]:
+        """
+        Upper bound of the bucket holding the given share of values.
+
+        Args:
+            share: Fraction between 0 and 1, e.g. 0.95
+
+        Returns:
+            Approximate percentile, None when empty
+        """
+        if not self.total:
+            return None
+        rank = math.ceil(share * self.total)
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return self.floor * BUCKET_GROWTH ** index
+        return self.floor * BUCKET_GROWTH ** (BUCKET_COUNT - 1)
+
+
+class SlidingCount:
+    """Number of events within the last ``window`` seconds."""
+
+    __slots__ = ('window', '_times')
+
+    def __init__(self, window: float):
+        self.window = window
+        self._times = deque()
+
+    def add(self, now: float, count: int = 1):
+        """Record ``count`` events at ``now``."""
+        for _ in range(count):
+            self._times.append(now)
+
+    def value(self, now: float) -> int:
+        """Events within the window ending at ``now``."""
+        times, start = self._times, now - self.window
+        while times and times[0] <= start:
+            times.popleft()
+        return len(times)
+
+
+class SlidingStat:
+    """Mean, extreme or percentile of samples within a time window."""
+
+    __slots__ = ('window', 'stat', '_samples', '_sum', '_added', '_max', '_histogram')
+
+    def __init__(self, window: float, stat: str = 'mean'):
+        """
+        Args:
+            window: Length of the window in seconds
+            stat: 'mean', 'max', 'min' or a percentile such as 'p95'
+        """
+        if stat not in ('mean', 'max', 'min') and not (
+            stat.startswith('p') and stat[1:].isdigit() and 0 < int(stat[1:]) < 100
+        ):
+            raise ValueError(f"Unknown statistic: {stat}")
+        self.window = window
+        self.stat = stat
+        self._samples = deque()
+        self._sum = 0.0
+        self._added = 0
+        # (sample number, value) of candidates for the extreme, newest last
+        self._max = deque()
+        self._histogram = LogHistogram() if stat.startswith('p') else None
+
+    def add(self, now: float, value: float):
+        """Add a sample taken at ``now``."""
+        self._expire(now)
+        self._samples.append((now, value))
+        self._sum += value
+        self._added += 1
+        if self.stat in ('max', 'min'):
+            sign = 1 if self.stat == 'max' else -1
+            extremes = self._max
+            while extremes and sign * extremes[-1][1] <= sign * value:
+                extremes.pop()
+            extremes.append((self._added, value))
+        elif self._histogram is not None:
+            self._histogram.add(value)
+
+    def value(self, now: float) -> Optional[float]:
+        """Statistic over the window ending at ``now``, None if empty."""
+        self._expire(now)
+        if not self._samples:
+            return None
+        if self.stat == 'mean':
+            return self._sum / len(self._samples)
+        if self.stat in ('max', 'min'):
+            return self._max[0][1]
+        return self._histogram.percentile(int(self.stat[1:]) / 100)
+
+    def _expire(self, now: float):
+        start = now - self.window
+        samples = self._samples
+        while samples and samples[0][0] <= start:
+            oldest = self._added - len(samples) + 1
+            _, value = samples.popleft()
+            self._sum -= value
+            if self._max and self._max[0][0] == oldest:
+                self._max.popleft()
+            if self._histogram is not None:
+                self._histogram.add(value, -1)
@@ -0,0 +1,184 @@
+"""
+Command-line status for scripts: ``status`` and ``watch``.
+
+Both commands poll through the same code as the tray app but import
+neither the tray nor Tk, and log only warnings, to the log file. When a
+status broker for the same server is running they read its state instead
+of polling Ollama.
+
+``status`` prints the current state as one JSON object and exits with 0
+if Ollama answered, 1 otherwise. ``watch`` prints one JSON line per state
+change until interrupted.
+"""
+
+import json
+import logging
+import os
+import sys
+import time
+from itertools import chain
+from typing import Optional
+
+from models import LoadedModel
+from monitor_core import MonitorCore, setup_logging
+
+
+class StatusMonitor(MonitorCore):
+    """Monitor that reports its state on stdout instead of a tray icon."""
+
+    def __init__(self, api_url: Optional[str] = None):
+        """
+        Args:
+            api_url: Server to query instead of the configured one
+        """
+        # Keep the log file free of start-up messages from frequent runs
+        setup_logging(console=False).setLevel(logging.WARNING)
+        super().__init__()
+        if api_url:
+            self.settings['api_url'] = api_url.rstrip('/')
+            self.settings.pop('endpoints', None)
+
+    def notify(self, message: str, key=None):
+        """Transitions are part of the printed state; nothing to show."""
+
+    def subscribe(self):
+        """Subscription to a broker for this server, None if none runs."""
+        if not self.settings.get('broker', False):
+            return None
+        from broker import DEFAULT_PORT, subscribe
+        return subscribe(
+            '127.0.0.1', self.settings.get('broker_port', DEFAULT_PORT),
+            self.api_url, timeout=1.0
+        )
+
+    def poll_once(self):
+        """Query Ollama directly and update the state."""
+        if self.client is None:
+            self._init_http_client()
+        self.current_model = self.get_running_models()
+
+    def state(self) -> dict:
+        """Current state as a JSON-serializable dictionary."""
+        up = self.last_status_code == 200
+        return {
+            'time': round(time.time(), 3),
+            'api_url': self.api_url,
+            'up': up,
+            'status': self.current_model,
+            'status_code': self.last_status_code,
+            'error': self.last_error,
+            'latency': None if self.last_latency is None else round(self.last_latency, 4),
+            'models': [model_state(m) for m in self.loaded_models.models] if up else []
+        }
+
+
+def model_state(model: LoadedModel) -> dict:
+    """
+    Describe a loaded model for JSON output.
+
+    Args:
+        model: Loaded model record
+
+    Returns:
+        Dictionary with the fields of ``ollama ps`` and sizes in bytes
+    """
+    return {
+        'name': model.name,
+        'digest': model.digest,
+        'parameter_size': model.parameter_size,
+        'quantization': model.quantization,
+        'size': model.size,
+        'size_vram': model.size_vram,
+        'processor': model.processor(),
+        'expires_at': model.expires_at
+    }
+
+
+def _print_if_changed(state: dict, last: Optional[dict]) -> dict:
+    """
+    Print ``state`` as a JSON line unless only its time or latency changed.
+
+    Returns:
+        The state last printed
+    """
+    if last is not None and all(
+        state[key] == last[key] for key in state if key not in ('time', 'latency')
+    ):
+        return last
+    _emit(state)
+    return state
+
+
+def _emit(state: dict, indent: Optional[int] = None):
+    sys.stdout.write(json.dumps(state, indent=indent) + '\n')
+    sys.stdout.flush()
+
+
+def run_status(api_url: Optional[str] = None, pretty: bool = False) -> int:
+    """
+    Print the current state once.
+
+    Args:
+        api_url: Server to query instead of the configured one
+        pretty: Indent the JSON output
+
+    Returns:
+        Exit code: 0 if Ollama answered, 1 otherwise
+    """
+    monitor = StatusMonitor(api_url)
+    try:
+        subscription = monitor.subscribe()
+        if subscription:
+            monitor.apply_broker_state(subscription.state)
+            subscription.close()
+        else:
+            monitor.poll_once()
+        state = monitor.state()
+    finally:
+        monitor.stop()
+    _emit(state, 2 if pretty else None)
+    return 0 if state['up'] else 1
+
+
+def run_watch(api_url: Optional[str] = None, interval: Optional[float] = None) -> int:
+    """
+    Print a JSON line whenever the state changes, until interrupted.
+
+    Args:
+        api_url: Server to query instead of the configured one
+        interval: Seconds between polls, defaults to ``poll_interval``
+
+    Returns:
+        Exit code
+    """
+    monitor = StatusMonitor(api_url)
+    interval = interval or monitor.settings.get('poll_interval', 1.0)
+    last = None
+    try:
+        while True:
+            subscription = monitor.subscribe()
+            if subscription:
+                # The broker pushes changes; follow it until it exits
+                try:
+                    for broker_state in chain([subscription.state], subscription):
+                        monitor.apply_broker_state(broker_state)
+                        last = _print_if_changed(monitor.state(), last)
+                except BrokenPipeError:
+                    raise
+                except (OSError, ValueError):
+                    pass
+                finally:
+                    subscription.close()
+                continue
+            started = time.monotonic()
+            monitor.poll_once()
+            last = _print_if_changed(monitor.state(), last)
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
+    except KeyboardInterrupt:
+        return 0
+    except BrokenPipeError:
+        # The reader went away, e.g. ``watch | head``; silence the final flush
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    finally:
+        monitor.stop()
@@ -0,0 +1,228 @@
+"""
+Inference throughput benchmark for Ollama Monitor.
+
+Streams prompts through ``/api/generate`` or ``/api/chat`` and reports
+time to first token, generation and prompt-evaluation speed and model
+load time, at one or more levels of concurrency.
+"""
+
+import json
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, NamedTuple, Optional
+
+import httpx
+
+DEFAULT_PROMPTS = [
+    "Explain in two sentences why the sky is blue.",
+    "Write a haiku about a lighthouse.",
+    "List five uses for a paperclip.",
+]
+
+NS_PER_SECOND = 1e9
+
+
+class RequestResult(NamedTuple):
+    """Measurements for one streamed request."""
+
+    prompt: str
+    ttft: Optional[float] = None
+    total: float = 0.0
+    eval_count: int = 0
+    eval_duration: int = 0
+    prompt_eval_count: int = 0
+    prompt_eval_duration: int = 0
+    load_duration: int = 0
+    error: Optional[str] = None
+
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        """Generation speed reported by Ollama."""
+        if not self.eval_duration:
+            return None
+        return self.eval_count / (self.eval_duration / NS_PER_SECOND)
+
+    @property
+    def prompt_tokens_per_second(self) -> Optional[float]:
+        """Prompt evaluation speed reported by Ollama."""
+        if not self.prompt_eval_duration:
+            return None
+        return self.prompt_eval_count / (self.prompt_eval_duration / NS_PER_SECOND)
+
+
+def _mean(values: List[float]) -> Optional[float]:
+    return math.fsum(values) / len(values) if values else None
+
+
+def _p95(values: List[float]) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(0.95 * len(ordered)) - 1)]
+
+
+class BenchmarkReport(NamedTuple):
+    """Results of one benchmark run at a fixed concurrency."""
+
+    model: str
+    concurrency: int
+    wall: float
+    results: List[RequestResult]
+
+    @property
+    def succeeded(self) -> List[RequestResult]:
+        """Requests that completed without error."""
+        return [r for r in self.results if r.error is None]
+
+    @property
+    def aggregate_tokens_per_second(self) -> float:
+        """Generated tokens across all requests divided by wall time."""
+        if not self.wall:
+            return 0.0
+        return sum(r.eval_count for r in self.succeeded) / self.wall
+
+    def summary(self) -> str:
+        """Multi-line human-readable report."""
+        ok = self.succeeded
+        ttft = [r.ttft for r in ok if r.ttft is not None]
+        speed = [r.tokens_per_second for r in ok if r.tokens_per_second]
+        prompt_speed = [
+            r.prompt_tokens_per_second for r in ok if r.prompt_tokens_per_second
+        ]
+        load = [r.load_duration / NS_PER_SECOND for r in ok]
+
+        def fmt(value, unit, scale=1.0, digits=1):
+            return "n/a" if value is None else f"{value * scale:.{digits}f} {unit}"
+
+        lines = [
+            f"{self.model} x{self.concurrency}: {len(ok)}/{len(self.results)} ok "
+            f"in {self.wall:.1f} s",
+            f"  time to first token: mean {fmt(_mean(ttft), 'ms', 1000, 0)}, "
+            f"p95 {fmt(_p95(ttft), 'ms', 1000, 0)}",
+            f"  generation: {fmt(_mean(speed), 'tok/s')} per request, "
+            f"{self.aggregate_tokens_per_second:.1f} tok/s aggregate",
+            f"  prompt eval: {fmt(_mean(prompt_speed), 'tok/s')}",
+            f"  load: max {fmt(max(load) if load else None, 's', digits=2)}",
+        ]
+        errors = sorted({r.error for r in self.results if r.error})
+        if errors:
+            lines.append(f"  errors: {'; '.join(errors)}")
+        return '\n'.join(lines)
+
+    def short_summary(self) -> str:
+        """One-line summary for notifications."""
+        ttft = _mean([r.ttft for r in self.succeeded if r.ttft is not None])
+        ttft_text = "n/a" if ttft is None else f"{ttft * 1000:.0f} ms"
+        return (
+            f"{self.model} x{self.concurrency}: "
+            f"{self.aggregate_tokens_per_second:.1f} tok/s, TTFT {ttft_text}"
+        )
+
+
+def stream_request(client: httpx.Client, api_url: str, model: str, prompt: str,
+                   api: str = 'generate', num_predict: Optional[int] = None,
+                   timeout: float = 300.0) -> RequestResult:
+    """
+    Stream one prompt and measure it.
+
+    Args:
+        client: HTTP client to send the request with
+        api_url: Base URL of the Ollama server
+        model: Model name
+        prompt: Prompt text
+        api: ``'generate'`` or ``'chat'``
+        num_predict: Maximum tokens to generate
+        timeout: Read timeout in seconds, long enough for a model load
+
+    Returns:
+        RequestResult for the request
+    """
+    if api == 'chat':
+        payload = {'model': model, 'messages': [{'role': 'user', 'content': prompt}]}
+    else:
+        payload = {'model': model, 'prompt': prompt}
+    payload['stream'] = True
+    if num_predict:
+        payload['options'] = {'num_predict': num_predict}
+
+    started = time.perf_counter()
+    ttft = None
+    final = {}
+    try:
+        with client.stream(
+            'POST', f'{api_url}/api/{api}', json=payload,
+            timeout=httpx.Timeout(timeout, connect=10.0)
+        ) as response:
+            if response.status_code != 200:
+                response.read()
+                return RequestResult(
+                    prompt, total=time.perf_counter() - started,
+                    error=f"HTTP {response.status_code}: {response.text[:200]}"
+                )
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if 'error' in chunk:
+                    return RequestResult(
+                        prompt, total=time.perf_counter() - started,
+                        error=str(chunk['error'])
+                    )
+                text = chunk.get('response') or chunk.get('message', {}).get('content')
+                if ttft is None and text:
+                    ttft = time.perf_counter() - started
+                if chunk.get('done'):
+                    final = chunk
+    except (httpx.HTTPError, ValueError) as e:
+        return RequestResult(
+            prompt, total=time.perf_counter() - started, error=str(e) or type(e).__name__
+        )
+
+    return RequestResult(
+        prompt,
+        ttft=ttft,
+        total=time.perf_counter() - started,
+        eval_count=final.get('eval_count', 0),
+        eval_duration=final.get('eval_duration', 0),
+        prompt_eval_count=final.get('prompt_eval_count', 0),
+        prompt_eval_duration=final.get('prompt_eval_duration', 0),
+        load_duration=final.get('load_duration', 0),
+    )
+
+
+def run_benchmark(client: httpx.Client, api_url: str, model: str,
+                  prompts: Optional[List[str]] = None, api: str = 'generate',
+                  concurrency: int = 1, rounds: int = 1,
+                  num_predict: Optional[int] = None,
+                  timeout: float = 300.0) -> BenchmarkReport:
+    """
+    Run every prompt ``rounds`` times with ``concurrency`` requests in flight.
+
+    Args:
+        client: HTTP client; its pool should allow ``concurrency`` connections
+        api_url: Base URL of the Ollama server
+        model: Model name
+        prompts: Prompt set, ``DEFAULT_PROMPTS`` if None
+        api: ``'generate'`` or ``'chat'``
+        concurrency: Parallel requests
+        rounds: Number of passes over the prompt set
+        num_predict: Maximum tokens to generate per request
+        timeout: Read timeout per request in seconds
+
+    Returns:
+        BenchmarkReport for the run
+    """
+    work = list(prompts or DEFAULT_PROMPTS) * max(1, rounds)
+    # Keep every worker busy even with fewer prompts than workers
+    while len(work) < concurrency:
+        work += work
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(
+            lambda prompt: stream_request(
+                client, api_url, model, prompt, api, num_predict, timeout
+            ),
+            work
+        ))
+    return BenchmarkReport(model, concurrency, time.perf_counter() - started, results)
@@ -0,0 +1,183 @@
+"""
+Fixed-capacity time series of poll samples.
+
+Samples live in parallel typed arrays used as a ring buffer, so memory is
+allocated once and stays constant however long the monitor runs.
+"""
+
+import math
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from typing import NamedTuple, Optional
+
+# Column name -> array type code
+FIELDS = {
+    'timestamp': 'd',     # time.time() of the poll
+    'latency': 'd',       # /api/ps round trip in seconds, NaN without reply
+    'model_count': 'I',   # number of loaded models
+    'size': 'q',          # summed model size in bytes
+    'size_vram': 'q',     # summed VRAM use in bytes
+    'status_code': 'H',   # HTTP status, 0 when the request failed
+    'ollama_cpu': 'd',    # CPU % of the local Ollama processes, NaN if not sampled
+    'ollama_rss': 'q',    # resident memory of the local Ollama processes
+}
+
+
+class WindowStats(NamedTuple):
+    """Aggregates over one column for a time window."""
+
+    count: int
+    min: float
+    max: float
+    mean: float
+    p95: float
+
+
+class SampleRing:
+    """Ring buffer of poll samples backed by typed arrays."""
+
+    def __init__(self, capacity: int = 7200):
+        """
+        Allocate storage for ``capacity`` samples.
+
+        Args:
+            capacity: Maximum number of samples kept
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._columns = {
+            name: array(code, [0]) * capacity for name, code in FIELDS.items()
+        }
+        self._start = 0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, timestamp: float, latency: Optional[float],
+               model_count: int, size: int, size_vram: int, status_code: int,
+               ollama_cpu: Optional[float] = None, ollama_rss: int = 0):
+        """
+        Record one poll, overwriting the oldest sample when full.
+
+        Args:
+            timestamp: ``time.time()`` of the poll
+            latency: Round trip in seconds, None if there was no reply
+            model_count: Number of loaded models
+            size: Summed model size in bytes
+            size_vram: Summed VRAM use in bytes
+            status_code: HTTP status, 0 when the request failed
+            ollama_cpu: CPU % of the local Ollama processes, None if not sampled
+            ollama_rss: Resident memory of the local Ollama processes
+        """
+        with self._lock:
+            if self._count < self.capacity:
+                index = (self._start + self._count) % self.capacity
+                self._count += 1
+            else:
+                index = self._start
+                self._start = (self._start + 1) % self.capacity
+
+            columns = self._columns
+            columns['timestamp'][index] = timestamp
+            columns['latency'][index] = math.nan if latency is None else latency
+            columns['model_count'][index] = model_count
+            columns['size'][index] = size
+            columns['size_vram'][index] = size_vram
+            columns['status_code'][index] = status_code
+            columns['ollama_cpu'][index] = math.nan if ollama_cpu is None else ollama_cpu
+            columns['ollama_rss'][index] = ollama_rss
+
+    def latest(self) -> Optional[dict]:
+        """
+        Get the most recent sample.
+
+        Returns:
+            Dict of column values, or None if nothing was recorded
+        """
+        with self._lock:
+            if not self._count:
+                return None
+            index = (self._start + self._count - 1) % self.capacity
+            return {name: column[index] for name, column in self._columns.items()}
+
+    def column(self, name: str, seconds: Optional[float] = None,
+               now: Optional[float] = None) -> array:
+        """
+        Get one column, oldest first, optionally limited to a time window.
+
+        Args:
+            name: Column name from ``FIELDS``
+            seconds: Only include samples from the last ``seconds``
+            now: Reference time for the window, defaults to ``time.time()``
+
+        Returns:
+            New array holding the selected values
+        """
+        with self._lock:
+            first = 0
+            if seconds is not None:
+                cutoff = (time.time() if now is None else now) - seconds
+                first = bisect_left(_LogicalView(self), cutoff)
+
+            data = self._columns[name]
+            length = self._count - first
+            begin = (self._start + first) % self.capacity
+            if begin + length <= self.capacity:
+                return data[begin:begin + length]
+            # Window wraps around the end of the storage
+            return data[begin:] + data[:begin + length - self.capacity]
+
+    def stats(self, name: str, seconds: Optional[float] = None,
+              now: Optional[float] = None) -> Optional[WindowStats]:
+        """
+        Aggregate one column over a time window.
+
+        NaN values (polls without a reply) are ignored.
+
+        Args:
+            name: Column name from ``FIELDS``
+            seconds: Window length, the whole buffer if None
+            now: Reference time for the window, defaults to ``time.time()``
+
+        Returns:
+            WindowStats, or None if the window holds no values
+        """
+        values = self.column(name, seconds, now)
+        if FIELDS[name] == 'd':
+            values = [v for v in values if v == v]
+        if not len(values):
+            return None
+        ordered = sorted(values)
+        # Nearest-rank percentile
+        p95 = ordered[max(0, math.ceil(0.95 * len(ordered)) - 1)]
+        return WindowStats(
+            len(ordered), ordered[0], ordered[-1],
+            math.fsum(ordered) / len(ordered), p95
+        )
+
+    def clear(self):
+        """Drop every sample without releasing storage."""
+        with self._lock:
+            self._start = 0
+            self._count = 0
+
+
+class _LogicalView:
+    """Sequence view of the timestamps in insertion order, for bisect."""
+
+    __slots__ = ('_ring',)
+
+    def __init__(self, ring: SampleRing):
+        self._ring = ring
+
+    def __len__(self) -> int:
+        return self._ring._count
+
+    def __getitem__(self, i: int) -> float:
+        ring = self._ring
+        return ring._columns['timestamp'][(ring._start + i) % ring.capacity]
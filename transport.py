@@ -0,0 +1,152 @@
+"""
+HTTP transport settings and per-request instrumentation.
+
+Builds httpx client options from the settings, times each phase of a
+request through httpcore's trace hook, and turns transport exceptions
+into short human-readable failure reasons.
+"""
+
+import socket
+import ssl
+import time
+from typing import Optional
+
+import httpx
+
+# Longer than the idle poll interval so steady polling keeps its connection
+DEFAULT_KEEPALIVE_EXPIRY = 60.0
+
+
+def client_options(settings: dict) -> dict:
+    """
+    Build ``httpx.Client`` keyword arguments from the settings.
+
+    Args:
+        settings: Application settings
+
+    Returns:
+        Keyword arguments for httpx.Client
+    """
+    connect_timeout = settings.get('connect_timeout', 2.0)
+    read_timeout = settings.get('read_timeout', 2.0)
+    return {
+        'verify': False,  # Disable SSL verification for proxy support
+        'follow_redirects': True,
+        'timeout': httpx.Timeout(
+            read_timeout, connect=connect_timeout, pool=connect_timeout
+        ),
+        'limits': httpx.Limits(
+            max_connections=settings.get('http_max_connections', 4),
+            max_keepalive_connections=settings.get('http_max_keepalive', 2),
+            keepalive_expiry=settings.get(
+                'http_keepalive_expiry', DEFAULT_KEEPALIVE_EXPIRY
+            ),
+        ),
+    }
+
+
+class PollTimings:
+    """Phase timings of one request, filled in by httpcore trace events."""
+
+    __slots__ = (
+        'started', 'connect', 'tls', 'wait', 'read', 'total', 'reused', '_marks'
+    )
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.connect = 0.0
+        self.tls = 0.0
+        self.wait = 0.0
+        self.read = 0.0
+        self.total = 0.0
+        self.reused = True
+        self._marks = {}
+
+    def trace(self, event_name: str, info: dict):
+        """Record a trace event; pass as ``extensions={'trace': ...}``."""
+        now = time.perf_counter()
+        phase, _, state = event_name.rpartition('.')
+        if state == 'started':
+            self._marks[phase] = now
+            if phase == 'connection.connect_tcp':
+                self.reused = False
+            elif phase.endswith('send_request_headers'):
+                self._marks['request'] = now
+            return
+        if state != 'complete':
+            return
+        duration = now - self._marks.get(phase, now)
+        if phase == 'connection.connect_tcp':
+            self.connect += duration
+        elif phase == 'connection.start_tls':
+            self.tls += duration
+        elif phase.endswith('receive_response_headers'):
+            # Time to first byte, measured from sending the request
+            self.wait = now - self._marks.get('request', now)
+        elif phase.endswith('receive_response_body'):
+            self.read += duration
+
+    def finish(self) -> 'PollTimings':
+        """Stamp the total duration and return self."""
+        self.total = time.perf_counter() - self.started
+        return self
+
+    def summary(self) -> str:
+        """Short one-line description for logs and the tray menu."""
+        parts = []
+        if not self.reused:
+            parts.append(f"connect {_ms(self.connect)}")
+            if self.tls:
+                parts.append(f"TLS {_ms(self.tls)}")
+        parts.append(f"wait {_ms(self.wait)}")
+        parts.append(f"read {_ms(self.read)}")
+        state = "reused" if self.reused else "new connection"
+        return f"{_ms(self.total)} ({', '.join(parts)}; {state})"
+
+
+def _ms(seconds: float) -> str:
+    """Format seconds as milliseconds with two significant digits."""
+    ms = seconds * 1000
+    if ms < 10:
+        return f"{ms:.0f} ms"
+    return f"{float(f'{ms:.2g}'):.0f} ms"
+
+
+def classify_error(exc: Exception) -> str:
+    """
+    Describe why a request failed.
+
+    Args:
+        exc: Exception raised by httpx
+
+    Returns:
+        Short reason such as "connection refused" or "TLS handshake failed"
+    """
+    if isinstance(exc, httpx.ConnectTimeout):
+        return "connect timeout"
+    if isinstance(exc, httpx.PoolTimeout):
+        return "connection pool exhausted"
+    if isinstance(exc, httpx.ReadTimeout):
+        return "slow response (read timeout)"
+    if isinstance(exc, httpx.TimeoutException):
+        return "timed out"
+
+    cause: Optional[BaseException] = exc
+    seen = set()
+    while cause is not None and id(cause) not in seen:
+        seen.add(id(cause))
+        if isinstance(cause, socket.gaierror):
+            return "DNS lookup failed"
+        if isinstance(cause, ssl.SSLError):
+            return "TLS handshake failed"
+        if isinstance(cause, ConnectionRefusedError):
+            return "connection refused"
+        if isinstance(cause, ConnectionResetError):
+            return "connection reset"
+        cause = cause.__cause__ or cause.__context__
+
+    if isinstance(exc, httpx.ConnectError):
+        return "connection failed"
+    if isinstance(exc, httpx.RemoteProtocolError):
+        return "server closed the connection"
+    return str(exc) or type(exc).__name__
@@ -0,0 +1,75 @@
+"""
+Diff-based tray updates for Ollama Monitor.
+
+Every assignment to a pystray icon attribute makes pystray redraw and push
+the change to the OS shell, so the view only touches attributes whose
+value differs from what was last rendered.
+"""
+
+from typing import Any, Callable, Dict, Hashable
+
+
+class TrayView:
+    """Apply status snapshots to a pystray icon, skipping unchanged parts."""
+
+    ATTRIBUTES = ('icon', 'title', 'menu')
+
+    def __init__(self):
+        """Initialize with nothing rendered yet."""
+        self._rendered: Dict[str, Any] = {}
+        self.applied: Dict[str, int] = dict.fromkeys(self.ATTRIBUTES, 0)
+        self.skipped: Dict[str, int] = dict.fromkeys(self.ATTRIBUTES, 0)
+
+    def apply(self, icon, image, title: str, menu_key: Hashable,
+              build_menu: Callable[[], Any]) -> bool:
+        """
+        Update the icon with a new snapshot.
+
+        Args:
+            icon: pystray.Icon to update
+            image: Icon image; compared by identity since images are cached
+            title: Tooltip text
+            menu_key: Hashable summary of the menu contents
+            build_menu: Called to build the menu only when ``menu_key`` changed
+
+        Returns:
+            True if any attribute was updated
+        """
+        changed = False
+        if self._changed('icon', image, lambda a, b: a is b):
+            icon.icon = image
+            changed = True
+        if self._changed('title', title):
+            icon.title = title
+            changed = True
+        if self._changed('menu', menu_key):
+            icon.menu = build_menu()
+            changed = True
+        return changed
+
+    def invalidate(self):
+        """Force the next :meth:`apply` to update every attribute."""
+        self._rendered.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get update counters.
+
+        Returns:
+            Total applied and skipped attribute updates
+        """
+        return {
+            'applied': sum(self.applied.values()),
+            'skipped': sum(self.skipped.values()),
+        }
+
+    def _changed(self, name: str, value, same=None) -> bool:
+        """Record ``value`` for ``name`` and tell whether it differs."""
+        if name in self._rendered:
+            previous = self._rendered[name]
+            if same(previous, value) if same else previous == value:
+                self.skipped[name] += 1
+                return False
+        self._rendered[name] = value
+        self.applied[name] += 1
+        return True
@@ -0,0 +1,187 @@
+"""
+Keep-alive warmer for pinned models.
+
+Watches ``expires_at`` of the models reported by ``/api/ps`` and, shortly
+before a pinned model would be unloaded, sends an empty ``/api/generate``
+request with ``keep_alive`` so the next real request does not pay the
+load time. Pinned models are kept in configuration order until their VRAM
+use exceeds the budget.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Union
+
+import httpx
+
+from models import LoadedModel
+
+# A load_duration above this means the model had to be loaded
+COLD_LOAD_THRESHOLD = 0.5
+NS_PER_SECOND = 1e9
+
+
+def normalize_model_name(name: str) -> str:
+    """Add the implicit ``:latest`` tag, as Ollama does."""
+    return name if ':' in name else f'{name}:latest'
+
+
+class KeepAliveWarmer:
+    """Extend the residency of pinned models before they expire."""
+
+    def __init__(self, pinned: List[str], lead_time: float = 60.0,
+                 keep_alive: Union[str, int] = '10m',
+                 vram_budget: Optional[int] = None, logger=None):
+        """
+        Args:
+            pinned: Model names to keep loaded, most important first
+            lead_time: Seconds before expiry at which a model is refreshed
+            keep_alive: ``keep_alive`` value sent with the refresh
+            vram_budget: Bytes of VRAM pinned models may hold, None for no limit
+            logger: Logger for refreshes and errors
+        """
+        self.pinned = [normalize_model_name(name) for name in pinned]
+        self.lead_time = lead_time
+        self.keep_alive = keep_alive
+        self.vram_budget = vram_budget
+        self.logger = logger
+        self.requests = 0
+        self.prevented = 0
+        self.saved_seconds = 0.0
+        # Observed cold load times, also fed by other requests that load models
+        self.cold_load_seconds: Dict[str, float] = {}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='warmer')
+        self._lock = threading.Lock()
+        self._in_flight = set()
+        # name -> (expiry before the refresh, expiry the refresh set)
+        self._extended: Dict[str, tuple] = {}
+        self._over_budget = set()
+
+    def check(self, client: httpx.Client, api_url: str,
+              models: List[LoadedModel], now: Optional[float] = None):
+        """
+        Refresh pinned models that are about to expire; never blocks.
+
+        Args:
+            client: HTTP client for the refresh requests
+            api_url: Base URL of the Ollama server
+            models: Models currently loaded according to ``/api/ps``
+            now: Current ``time.time()``
+        """
+        now = time.time() if now is None else now
+        loaded = {model.name: model for model in models}
+        self._count_prevented(loaded, now)
+
+        used_vram = 0
+        for name in self.pinned:
+            model = loaded.get(name)
+            if model is None:
+                continue
+            used_vram += model.size_vram
+            if self.vram_budget is not None and used_vram > self.vram_budget:
+                if name not in self._over_budget:
+                    self._over_budget.add(name)
+                    self._log(f"Not keeping {name} loaded: pinned models exceed "
+                              f"the VRAM budget")
+                continue
+            self._over_budget.discard(name)
+            if model.expires_at is None or model.expires_at - now > self.lead_time:
+                continue
+            with self._lock:
+                if name in self._in_flight:
+                    continue
+                self._in_flight.add(name)
+            self._executor.submit(self._refresh, client, api_url, name, model.expires_at)
+
+    def _count_prevented(self, loaded: Dict[str, LoadedModel], now: float):
+        """
+        Count refreshed models that were used after their original expiry.
+
+        A request by someone else moves ``expires_at`` away from the value
+        the refresh set. If that happens after the model would have been
+        unloaded, the refresh saved that request a cold load.
+        """
+        for name, (original, extended) in list(self._extended.items()):
+            model = loaded.get(name)
+            if model is None:
+                del self._extended[name]
+                continue
+            if model.expires_at is None or abs(model.expires_at - extended) <= 1:
+                continue
+            del self._extended[name]
+            if now >= original:
+                self.prevented += 1
+                saved = self.cold_load_seconds.get(name)
+                if saved:
+                    self.saved_seconds += saved
+                self._log(f"Prevented a cold load of {name}")
+
+    def _refresh(self, client: httpx.Client, api_url: str, name: str,
+                 expires_at: float):
+        """Send the keep-alive request; runs on the warmer thread."""
+        try:
+            response = client.post(
+                f'{api_url}/api/generate',
+                json={'model': name, 'keep_alive': self.keep_alive, 'stream': False},
+                timeout=httpx.Timeout(300.0, connect=10.0)
+            )
+            self.requests += 1
+            if response.status_code != 200:
+                self._log(f"Keep-alive for {name} failed: HTTP {response.status_code}")
+                return
+            load = response.json().get('load_duration', 0) / NS_PER_SECOND
+            self.record_load(name, load)
+            if load >= COLD_LOAD_THRESHOLD:
+                # The model was unloaded before the request arrived
+                self._log(f"Reloaded {name} in {load:.1f} s")
+                return
+            # Chained refreshes keep the expiry the model had without them
+            original = self._extended.get(name, (expires_at,))[0]
+            self._extended[name] = (original, self._expiry_after_refresh())
+            self._log(f"Kept {name} loaded")
+        except httpx.HTTPError as e:
+            self._log(f"Keep-alive for {name} failed: {str(e)}")
+        finally:
+            with self._lock:
+                self._in_flight.discard(name)
+
+    def _expiry_after_refresh(self) -> float:
+        """Expiry a refresh sent now sets, as far as it can be computed."""
+        keep_alive = self.keep_alive
+        if isinstance(keep_alive, (int, float)):
+            return time.time() + keep_alive
+        units = {'s': 1, 'm': 60, 'h': 3600}
+        try:
+            return time.time() + float(keep_alive[:-1]) * units[keep_alive[-1]]
+        except (ValueError, KeyError, IndexError):
+            return time.time()
+
+    def record_load(self, name: str, seconds: float):
+        """
+        Remember how long loading a model took.
+
+        Args:
+            name: Model name
+            seconds: ``load_duration`` of a response, in seconds
+        """
+        if seconds >= COLD_LOAD_THRESHOLD:
+            self.cold_load_seconds[normalize_model_name(name)] = seconds
+
+    def summary(self) -> str:
+        """One-line description of what the warmer achieved."""
+        text = (
+            f"{self.requests} keep-alive requests, "
+            f"{self.prevented} cold loads prevented"
+        )
+        if self.saved_seconds:
+            text += f" (~{self.saved_seconds:.0f} s load time saved)"
+        return text
+
+    def close(self):
+        """Stop the warmer thread without waiting for a pending request."""
+        self._executor.shutdown(wait=False)
+
+    def _log(self, message: str):
+        if self.logger:
+            self.logger.info(message)